@@ -0,0 +1,335 @@
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+import can
+import cantools
+
+import dbccache
+from busload import TrafficGenerator
+from canframe import CompiledFrame
+from payloadstore import PayloadStore, PermutationGenerator, open_database
+from scheduler import JitterStats
+
+# 실제 Temp_DBC.dbc 가 없을 때 쓰는 벤치마크용 DBC (BCM_07/BCM_08/ICU_04 와 같은 레이아웃)
+BENCH_DBC = """VERSION ""
+
+BU_: BCM ICU LAMP
+
+BO_ 1011 BCM_07_200ms: 8 BCM
+ SG_ BCM_Crc7Val : 0|8@1+ (1,0) [0|255] "" LAMP
+ SG_ BCM_AlvCnt7Val : 8|4@1+ (1,0) [0|15] "" LAMP
+ SG_ Lamp_DedicatedDrlOnReq : 12|2@1+ (1,0) [0|3] "" LAMP
+ SG_ Lamp_HiPrioHzrdReq : 14|2@1+ (1,0) [0|3] "" LAMP
+ SG_ Lamp_LoPrioHzrdReq : 16|2@1+ (1,0) [0|3] "" LAMP
+ SG_ Lamp_IntTailLmpOnReq : 18|2@1+ (1,0) [0|3] "" LAMP
+ SG_ Lamp_ExtrnlTailLmpOnReq : 20|2@1+ (1,0) [0|3] "" LAMP
+ SG_ Lamp_HdLmpLoOnReq : 22|2@1+ (1,0) [0|3] "" LAMP
+ SG_ Lamp_HdLmpHiOnReq : 24|2@1+ (1,0) [0|3] "" LAMP
+ SG_ Lamp_AvTailLmpSta : 26|2@1+ (1,0) [0|3] "" LAMP
+ SG_ Lamp_ExtrnlLpWlcmSta : 28|2@1+ (1,0) [0|3] "" LAMP
+
+BO_ 1012 BCM_08_200ms: 8 BCM
+ SG_ BCM_Crc8Val : 0|8@1+ (1,0) [0|255] "" LAMP
+ SG_ BCM_AlvCnt8Val : 8|4@1+ (1,0) [0|15] "" LAMP
+ SG_ Lamp_HbaCtrlModTyp : 12|2@1+ (1,0) [0|3] "" LAMP
+ SG_ Lamp_IFSCtrlModTyp : 14|2@1+ (1,0) [0|3] "" LAMP
+ SG_ Lamp_RrFogLmpOnReq : 16|2@1+ (1,0) [0|3] "" LAMP
+ SG_ Lamp_TailLmpWlcmCmd : 18|3@1+ (1,0) [0|7] "" LAMP
+ SG_ Lamp_HdLmpWlcmCmd : 21|3@1+ (1,0) [0|7] "" LAMP
+ SG_ Lamp_PuddleLmpOnReq : 24|2@1+ (1,0) [0|3] "" LAMP
+
+BO_ 1013 ICU_04_200ms: 8 ICU
+ SG_ ExtLamp_TrnSigLmpLftBlnkngSta : 0|2@1+ (1,0) [0|3] "" LAMP
+ SG_ ExtLamp_TrnSigLmpRtBlnkngSta : 2|2@1+ (1,0) [0|3] "" LAMP
+ SG_ ExtLamp_ExtrnlTailLmpSta : 4|2@1+ (1,0) [0|3] "" LAMP
+ SG_ ExtLamp_HzrdSwSta : 6|2@1+ (1,0) [0|3] "" LAMP
+ SG_ ExtLamp_RrFgLmpSta : 8|2@1+ (1,0) [0|3] "" LAMP
+ SG_ IntLamp_InlTailLmpSta : 10|2@1+ (1,0) [0|3] "" LAMP
+ SG_ Lamp_TrnSigLmpLftOnReq : 12|2@1+ (1,0) [0|3] "" LAMP
+ SG_ Lamp_TrnSigLmpRtOnReq : 14|2@1+ (1,0) [0|3] "" LAMP
+"""
+
+class BenchResult(NamedTuple):
+    name: str
+    frames: int
+    elapsed: float
+    rate: float                     # frames/s (RX 측에서 센 값)
+    encode_us: float                # 프레임당 인코딩(+전송 호출) 비용(us), 해당 없으면 0
+    jitter_mean: float              # 주기 메시지 도착 간격 - 주기 (초)
+    jitter_std: float
+    jitter_max: float
+    cpu: float                      # 프로세스 CPU 사용률(%, 코어 1개 = 100)
+    extra: dict = {}
+
+# =========================== 측정 도구 ===========================
+class _Probe(can.Listener):
+    """수신 측 가상 버스에서 프레임 수와 ID 별 도착 간격 지터를 잽니다."""
+    def __init__(self, periods: Dict[int, float] = None):
+        self.periods = periods or {}
+        self.count = 0
+        self.jitter = JitterStats()
+        self._last = {}
+
+    def on_message_received(self, msg: can.Message):
+        self.count += 1
+        period = self.periods.get(msg.arbitration_id)
+        if period is None:
+            return
+        last = self._last.get(msg.arbitration_id)
+        if last is not None:
+            self.jitter.add(msg.timestamp - last - period)
+        self._last[msg.arbitration_id] = msg.timestamp
+
+class _Measure:
+    """벽시계/CPU 시간을 함께 재고 수신 프로브를 붙였다 떼는 컨텍스트"""
+    def __init__(self, channel: str, periods: Dict[int, float] = None):
+        self.bus = can.Bus(interface='virtual', channel=channel, receive_own_messages=False)
+        self.probe = _Probe(periods)
+        self.notifier = can.Notifier(self.bus, [self.probe])
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.wall
+        self.cpu_used = time.process_time() - self.cpu
+        time.sleep(0.05)            # 마지막 프레임이 Notifier 에 도착할 시간
+        self.notifier.stop()
+        self.bus.shutdown()
+
+    def result(self, name: str, encode_us: float = 0.0, frames: int = None, **extra) -> BenchResult:
+        j = self.probe.jitter
+        frames = self.probe.count if frames is None else frames
+        return BenchResult(name, frames, self.elapsed, frames / self.elapsed if self.elapsed else 0.0, encode_us,
+                           j.mean, j.std, j.max if j.count else 0.0,
+                           100.0 * self.cpu_used / self.elapsed if self.elapsed else 0.0, extra)
+
+def _per_call_us(func: Callable[[int], None], n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        func(i)
+    return (time.perf_counter() - start) / n * 1e6
+
+# =========================== 벤치마크 ===========================
+def bench_encode(db, n: int) -> List[BenchResult]:
+    """cantools encode 와 CompiledFrame(일반 / CRC+카운터) 의 프레임당 인코딩 비용"""
+    message = db.get_message_by_name('BCM_07_200ms')
+    signals = {s.name: 0 for s in message.signals}
+    plain = CompiledFrame(message)
+    e2e = CompiledFrame(message, 'BCM_Crc7Val', 'BCM_AlvCnt7Val')
+
+    def cantools_encode(i):
+        signals['Lamp_HdLmpLoOnReq'] = i & 3
+        message.encode(signals)
+
+    def compiled(i):
+        plain.set_raw('Lamp_HdLmpLoOnReq', i & 3)
+        plain.build()
+
+    def compiled_e2e(i):
+        e2e.set_raw('Lamp_HdLmpLoOnReq', i & 3)
+        e2e.build()
+        e2e.advance_counter()
+
+    results = []
+    for name, func in (('encode.cantools', cantools_encode), ('encode.compiled', compiled),
+                       ('encode.compiled_e2e', compiled_e2e)):
+        cpu = time.process_time()
+        start = time.perf_counter()
+        us = _per_call_us(func, n)
+        elapsed = time.perf_counter() - start
+        results.append(BenchResult(name, n, elapsed, n / elapsed, us, 0.0, 0.0, 0.0,
+                                   100.0 * (time.process_time() - cpu) / elapsed))
+    return results
+
+def bench_headlight_sender(dbc_path: str, n: int, duration: float, period: float) -> List[BenchResult]:
+    from headlightcontrol import CANMessageSender
+    results = []
+    with CANMessageSender(dbc_path, 'virtual', 'bench_hl', 500000) as sender:
+        with _Measure('bench_hl') as m:
+            for i in range(n):
+                sender.send_message('ICU_04_200ms', {'Lamp_TrnSigLmpRtOnReq': i & 3})
+        results.append(m.result('headlightcontrol.send_message', 1e6 * m.elapsed / n))
+
+        ids = {sender.db.get_message_by_name(name).frame_id: period
+               for name in ('BCM_07_200ms', 'ICU_04_200ms', 'BCM_08_200ms')}
+        with _Measure('bench_hl', ids) as m:
+            sender.start_cyclic('BCM_07_200ms', period, 'BCM_Crc7Val', 'BCM_AlvCnt7Val')
+            sender.start_cyclic('ICU_04_200ms', period)
+            sender.start_cyclic('BCM_08_200ms', period, 'BCM_Crc8Val', 'BCM_AlvCnt8Val')
+            time.sleep(duration)
+            modes = sender.cyclic.modes()   # stop() 뒤에는 등록된 작업이 비어 있으므로 먼저 가져옵니다.
+            sender.cyclic.stop()
+        results.append(m.result('headlightcontrol.cyclic', modes=modes))
+    return results
+
+def bench_bench_controller(n: int, duration: float) -> List[BenchResult]:
+    import lightcandemo
+    controller = lightcandemo.BenchController('virtual', 'bench_lc', 500000)
+    results = []
+    try:
+        signals = {'CF_Gway_IGNSw': 2, 'CF_Gway_HeadLampLow': 1, 'CF_Gway_HeadLampHigh': 0,
+                   'CF_Gway_TurnSigLh': 0, 'CF_Gway_TurnSigRh': 0}
+        with _Measure('bench_lc') as m:
+            for i in range(n):
+                signals['CF_Gway_HeadLampHigh'] = i & 1
+                controller._send_control_message(signals)
+            while controller.tx.depth:
+                time.sleep(0.001)
+        results.append(m.result('lightcandemo.control', 1e6 * m.elapsed / n))
+
+        wakeup = controller.db.get_message_by_name(lightcandemo.MESSAGE_NAME).frame_id
+        with _Measure('bench_lc', {wakeup: 0.1}) as m:
+            time.sleep(duration)
+        results.append(m.result('lightcandemo.wakeup'))
+    finally:
+        controller.shutdown()
+    return results
+
+def bench_nonifs2_loop(dbc_path: str, duration: float, period: float) -> List[BenchResult]:
+    """nonifs2 GUI 의 전송 루프(manage_sending_loop)와 같은 세 주기 메시지 + 깜빡임 modifier"""
+    import nonifs2
+    engine = nonifs2.LampEngine(log=lambda text: None)
+    engine.turn_signal_state = 'right_blink'
+    engine.is_low_beam_on = engine.is_ifs_on = True
+    engine.connect(dbc_path, 'virtual', 'bench_nf', 500000)
+    sender = engine.sender
+    try:
+        ids = {sender.db.get_message_by_name(name).frame_id: period
+               for name in ('BCM_07_200ms', 'ICU_04_200ms', 'BCM_08_200ms')}
+        with _Measure('bench_nf', ids) as m:
+            modes = engine.start_sending(period)
+            time.sleep(duration)
+            engine.stop_sending()
+        return [m.result('nonifs2.sending_loop', modes=modes,
+                         tx_latency_max=sender.tx.stats.latency.max if sender.tx.stats.latency.count else 0.0)]
+    finally:
+        engine.close()
+
+def bench_generators(duration: float, n: int) -> List[BenchResult]:
+    """canmacro/canfdmacro 의 TrafficGenerator 와 canfdmacrowdb 의 중복 없는 페이로드 생성기"""
+    results = []
+    for name, kwargs in (('busload.generator_max', dict(bitrate=10**9, target_load=1.0)),
+                         ('busload.generator_60pct', dict(bitrate=500000, target_load=0.6)),
+                         ('busload.generator_fd', dict(bitrate=500000, data_bitrate=2000000, target_load=0.6,
+                                                       is_fd=True, lengths=(64,)))):
+        bus = can.Bus(interface='virtual', channel='bench_gen', receive_own_messages=False)
+        try:
+            generator = TrafficGenerator(bus, seed=1, **kwargs)
+            encode_us = _per_call_us(lambda i: generator.make_batch(), 20) / generator.batch
+            with _Measure('bench_gen') as m:
+                stats = generator.run(duration)
+            results.append(m.result(name, encode_us, load=stats.load))
+        finally:
+            bus.shutdown()
+
+    conn = open_database(':memory:')
+    try:
+        store = PayloadStore(conn)
+        cpu, start = time.process_time(), time.perf_counter()
+        us = _per_call_us(lambda i: store.add(os.urandom(64)), n)
+        store.close()
+        elapsed = time.perf_counter() - start
+        results.append(BenchResult('payloadstore.add', n, elapsed, n / elapsed, us, 0.0, 0.0, 0.0,
+                                   100.0 * (time.process_time() - cpu) / elapsed))
+        generator = PermutationGenerator(conn, 64, 'bench')
+        cpu, start = time.process_time(), time.perf_counter()
+        us = _per_call_us(lambda i: generator.next(), n)
+        generator.close()
+        elapsed = time.perf_counter() - start
+        results.append(BenchResult('payloadstore.permutation', n, elapsed, n / elapsed, us, 0.0, 0.0, 0.0,
+                                   100.0 * (time.process_time() - cpu) / elapsed))
+    finally:
+        conn.close()
+    return results
+
+# =========================== 결과 저장/비교 ===========================
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def save_results(path: str, results: List[BenchResult]):
+    """실행 한 번을 JSON 한 줄로 덧붙입니다. (커밋, 환경 정보 포함)"""
+    record = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'python_can': can.__version__,
+        'cantools': cantools.__version__,
+        'platform': platform.platform(),
+        'results': [r._asdict() for r in results],
+    }
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+def load_previous(path: str) -> Dict[str, dict]:
+    if not os.path.exists(path):
+        return {}
+    last = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                last = line
+    return {r['name']: r for r in json.loads(last)['results']} if last else {}
+
+def report(results: List[BenchResult], previous: Dict[str, dict], threshold: float):
+    print(f"{'benchmark':32} {'frames/s':>11} {'encode us':>10} {'jitter mean':>12} {'jitter max':>11} {'cpu %':>7}")
+    for r in results:
+        line = (f"{r.name:32} {r.rate:11.0f} {r.encode_us:10.2f} {r.jitter_mean * 1e3:10.3f}ms "
+                f"{r.jitter_max * 1e3:9.3f}ms {r.cpu:7.1f}")
+        old = previous.get(r.name)
+        if old and old['rate'] > 0:
+            change = r.rate / old['rate'] - 1.0
+            line += f"  ({change:+.1%})"
+            if change < -threshold:
+                line += " ⚠️ 처리량 저하"
+            if old['jitter_max'] > 0 and r.jitter_max > old['jitter_max'] * (1 + threshold) + 1e-4:
+                line += " ⚠️ 지터 증가"
+        print(line)
+
+def main():
+    # ============================ 사용자 설정 ============================
+    DBC_FILE_PATH = None            # None 이면 내장 BENCH_DBC 사용
+    RESULTS_FILE = "bench_results.jsonl"
+    DURATION = 2.0                  # 주기/부하 벤치마크 시간(초)
+    PERIOD = 0.01                   # 주기 전송 벤치마크 주기(초). 실제 200ms 보다 짧게 잡아 표본을 늘립니다.
+    BURST = 20000                   # 처리량/인코딩 벤치마크 프레임 수
+    REGRESSION_THRESHOLD = 0.10     # 직전 실행보다 10% 이상 나빠지면 경고
+    # =================================================================
+
+    tmpdir = None
+    dbc_path = DBC_FILE_PATH
+    if dbc_path is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        dbc_path = os.path.join(tmpdir.name, 'bench.dbc')
+        with open(dbc_path, 'w', encoding='utf-8') as f:
+            f.write(BENCH_DBC)
+    try:
+        db = dbccache.load_file(dbc_path)
+        results = []
+        results += bench_encode(db, BURST)
+        results += bench_headlight_sender(dbc_path, BURST, DURATION, PERIOD)
+        results += bench_bench_controller(BURST, DURATION)
+        results += bench_nonifs2_loop(dbc_path, DURATION, PERIOD)
+        results += bench_generators(DURATION, BURST)
+    finally:
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    report(results, load_previous(RESULTS_FILE), REGRESSION_THRESHOLD)
+    save_results(RESULTS_FILE, results)
+    print(f"\n✅ 결과를 {RESULTS_FILE} 에 저장했습니다.")
+
+if __name__ == "__main__":
+    main()
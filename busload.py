@@ -0,0 +1,308 @@
+import math
+import os
+import queue
+import threading
+import time
+from typing import NamedTuple, Optional
+
+import can
+import numpy as np
+
+from crcengine import make_table
+
+DLC_TO_BYTES = [0, 1, 2, 3, 4, 5, 6, 7, 8, 12, 16, 20, 24, 32, 48, 64]
+FD_LENGTHS = np.array(DLC_TO_BYTES, dtype=np.int64)
+
+# CRC 구분자, ACK 슬롯, ACK 구분자, EOF(7), IFS(3): 스터핑 없이 nominal 비트레이트로 전송
+TRAILER_BITS = 13
+
+def len_to_dlc(length: int) -> int:
+    for dlc, size in enumerate(DLC_TO_BYTES):
+        if size >= length:
+            return dlc
+    raise ValueError(f"payload too long for CAN FD: {length} bytes")
+
+# =========================== 비트 스터핑 상태 머신 ===========================
+# 상태 s = 마지막 비트 * 5 + (같은 비트 연속 길이 - 1). 같은 비트가 5 개 이어지면 반대 비트를 하나 넣고,
+# 그 스터프 비트가 새 연속의 첫 비트가 됩니다.
+def _bit_tables():
+    nxt = np.zeros((10, 2), dtype=np.int64)
+    stuff = np.zeros((10, 2), dtype=np.int64)
+    for s in range(10):
+        last, run = divmod(s, 5)
+        run += 1
+        for b in (0, 1):
+            if b != last:
+                nxt[s, b] = b * 5
+            elif run + 1 >= 5:
+                nxt[s, b] = (1 - b) * 5
+                stuff[s, b] = 1
+            else:
+                nxt[s, b] = b * 5 + run
+    return nxt, stuff
+
+_BIT_NEXT, _BIT_STUFF = _bit_tables()
+
+def _byte_tables():
+    """8 비트(MSB 먼저)를 한 번에 넘기는 상태 전이/스터프 비트 수 테이블"""
+    nxt = np.zeros((10, 256), dtype=np.int64)
+    stuff = np.zeros((10, 256), dtype=np.int64)
+    for s0 in range(10):
+        for byte in range(256):
+            s, count = s0, 0
+            for i in range(7, -1, -1):
+                b = (byte >> i) & 1
+                count += _BIT_STUFF[s, b]
+                s = _BIT_NEXT[s, b]
+            nxt[s0, byte] = s
+            stuff[s0, byte] = count
+    return nxt, stuff
+
+_BYTE_NEXT, _BYTE_STUFF = _byte_tables()
+_CRC15_TABLE = np.array(make_table(15, 0x4599, False), dtype=np.int64)
+_IDLE = 1 * 5      # 버스 idle(recessive) 상태: SOF(dominant) 가 새 연속을 시작합니다.
+
+def _header_bits(ids: np.ndarray, dlcs: np.ndarray, is_extended: bool, is_fd: bool, brs: bool):
+    """스터핑 대상 헤더 비트 열(SOF ~ DLC)과 그중 arbitration phase 비트 수를 돌려줍니다."""
+    n = len(ids)
+    cols = []
+    def field(values, width):
+        for i in range(width - 1, -1, -1):
+            cols.append((values >> i) & 1)
+    def const(bit):
+        cols.append(np.full(n, bit, dtype=np.int64))
+
+    const(0)                                    # SOF
+    if is_extended:
+        field(ids >> 18, 11)
+        const(1)                                # SRR
+        const(1)                                # IDE
+        field(ids & 0x3FFFF, 18)
+    else:
+        field(ids, 11)
+    if is_fd:
+        const(0)                                # RRS
+        if not is_extended:
+            const(0)                            # IDE
+        const(1)                                # FDF
+        const(0)                                # res
+        const(1 if brs else 0)                  # BRS
+        arbitration = len(cols)
+        const(0)                                # ESI
+    else:
+        const(0)                                # RTR
+        if is_extended:
+            const(0)                            # r1
+        else:
+            const(0)                            # IDE
+        const(0)                                # r0
+        arbitration = None
+    field(dlcs, 4)
+    return np.stack(cols, axis=1), arbitration
+
+# =========================== 프레임 on-wire 시간 ===========================
+def frame_bits(ids, payloads, lengths, is_extended: bool = False, is_fd: bool = False, brs: bool = True):
+    """프레임마다 (nominal 비트 수, data phase 비트 수) 를 계산합니다. (비트 스터핑 포함)
+
+    ids: (N,), payloads: (N, L) uint8, lengths: (N,) 실제 데이터 길이.
+    클래식 CAN 은 CRC-15 까지 실제로 계산해서 CRC 필드의 스터프 비트도 셉니다.
+    CAN FD 는 SOF~데이터 끝까지 동적 스터핑, stuff count + CRC 필드는 4 비트마다 고정 스터프 비트입니다.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    payloads = np.asarray(payloads, dtype=np.uint8)
+    n = len(ids)
+    if is_fd:
+        dlcs = np.searchsorted(FD_LENGTHS, lengths)
+        lengths = FD_LENGTHS[dlcs]
+    else:
+        dlcs = lengths
+    header, arbitration = _header_bits(ids, dlcs, is_extended, is_fd, brs)
+
+    state = np.full(n, _IDLE, dtype=np.int64)
+    stuff = np.zeros(n, dtype=np.int64)
+    stuff_arbitration = None
+    crc = np.zeros(n, dtype=np.int64)
+    for i in range(header.shape[1]):
+        if i == arbitration:
+            stuff_arbitration = stuff.copy()
+        b = header[:, i]
+        stuff += _BIT_STUFF[state, b]
+        state = _BIT_NEXT[state, b]
+        if not is_fd:
+            top = ((crc >> 14) & 1) ^ b
+            crc = ((crc << 1) & 0x7FFF) ^ (top * 0x4599)
+
+    data = payloads.astype(np.int64)
+    for j in range(data.shape[1]):
+        active = lengths > j
+        byte = data[:, j]
+        stuff += np.where(active, _BYTE_STUFF[state, byte], 0)
+        state = np.where(active, _BYTE_NEXT[state, byte], state)
+        if not is_fd:
+            crc = np.where(active, ((crc << 8) & 0x7FFF) ^ _CRC15_TABLE[((crc >> 7) ^ byte) & 0xFF], crc)
+
+    header_len = header.shape[1]
+    if not is_fd:
+        for i in range(14, -1, -1):
+            b = (crc >> i) & 1
+            stuff += _BIT_STUFF[state, b]
+            state = _BIT_NEXT[state, b]
+        nominal = header_len + lengths * 8 + 15 + stuff + TRAILER_BITS
+        return nominal, np.zeros(n, dtype=np.int64)
+
+    crc_len = np.where(lengths <= 16, 17, 21)
+    crc_field = 4 + crc_len + np.ceil((4 + crc_len) / 4).astype(np.int64)
+    data_phase = (header_len - arbitration) + lengths * 8 + (stuff - stuff_arbitration) + crc_field
+    nominal = arbitration + stuff_arbitration + TRAILER_BITS
+    if not brs:
+        return nominal + data_phase, np.zeros(n, dtype=np.int64)
+    return nominal, data_phase
+
+def frame_times(ids, payloads, lengths, bitrate: int, data_bitrate: int = None, is_extended: bool = False,
+                is_fd: bool = False, brs: bool = True) -> np.ndarray:
+    """프레임마다 버스를 점유하는 시간(초)"""
+    nominal, data_phase = frame_bits(ids, payloads, lengths, is_extended, is_fd, brs)
+    return nominal / bitrate + data_phase / (data_bitrate or bitrate)
+
+def frame_time(msg: can.Message, bitrate: int, data_bitrate: int = None) -> float:
+    payload = np.frombuffer(bytes(msg.data), dtype=np.uint8).reshape(1, -1)
+    return float(frame_times([msg.arbitration_id], payload, [len(msg.data)], bitrate, data_bitrate,
+                             msg.is_extended_id, msg.is_fd, msg.bitrate_switch)[0])
+
+# =========================== 백그라운드 로거 ===========================
+class FrameLogger:
+    """전송 스레드가 넘긴 배치를 별도 스레드에서 candump -L 형식으로 기록합니다. (전송 경로에서 print 하지 않음)"""
+    def __init__(self, path: Optional[str] = None, channel: str = "can0", maxsize: int = 256):
+        self.path = path
+        self.channel = channel
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, timestamps, ids, lengths, payloads, is_fd: bool, brs: bool = False):
+        try:
+            self._queue.put_nowait((timestamps, ids, lengths, payloads, is_fd, brs))
+        except queue.Full:
+            self.dropped += 1   # 로깅이 밀려도 전송 속도는 떨어뜨리지 않습니다.
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        out = open(self.path, 'w') if self.path else None
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                if out is None:
+                    continue
+                timestamps, ids, lengths, payloads, is_fd, brs = item
+                # FD 프레임은 '##<플래그>' 로 쓰고 플래그의 0x1 비트가 BRS 입니다.
+                sep = ('##1' if brs else '##0') if is_fd else '#'
+                lines = [f"({t:.6f}) {self.channel} {int(i):03X}{sep}{bytes(p[:n]).hex().upper()}\n"
+                         for t, i, n, p in zip(timestamps, ids, lengths, payloads)]
+                out.writelines(lines)
+        finally:
+            if out is not None:
+                out.close()
+
+# =========================== 부하 목표 트래픽 생성기 ===========================
+class LoadStats(NamedTuple):
+    frames: int
+    errors: int
+    elapsed: float
+    busy: float             # 전송한 프레임들의 on-wire 시간 합(초)
+
+    @property
+    def load(self) -> float:
+        return self.busy / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+class TrafficGenerator:
+    """랜덤 프레임을 배치로 만들어 목표 버스 부하(0~1)에 맞춰 전송합니다.
+
+    프레임 i 의 on-wire 시간이 t_i 이면 다음 프레임은 t_i / target_load 뒤에 보내도록
+    절대 목표 시각을 누적합니다. 목표 시각 직전까지 잠들고 마지막 spin 구간만 바쁜 대기합니다.
+    payload 는 os.urandom 으로 한 번에 만들고 can.Message 는 미리 만들어 둔 것을 재사용합니다.
+    """
+    def __init__(self, bus, bitrate: int, target_load: float = 0.3, data_bitrate: int = None,
+                 is_fd: bool = False, brs: bool = True, id_range=(0x000, 0x7FF), lengths=None,
+                 batch: int = 256, spin: float = 0.0005, logger: FrameLogger = None, seed=None):
+        if not 0 < target_load <= 1:
+            raise ValueError(f"target_load must be in (0, 1] (got {target_load})")
+        self.bus = bus
+        self.bitrate = bitrate
+        self.data_bitrate = data_bitrate
+        self.target_load = target_load
+        self.is_fd = is_fd
+        self.brs = brs and is_fd
+        self.id_range = id_range
+        if lengths is None:
+            lengths = DLC_TO_BYTES if is_fd else range(9)
+        self.lengths = np.asarray(list(lengths), dtype=np.int64)
+        self.max_len = int(self.lengths.max())
+        self.batch = batch
+        self.spin = spin
+        self.logger = logger
+        self.rng = np.random.default_rng(seed)
+        self._pool = [can.Message(is_extended_id=False, is_fd=is_fd, bitrate_switch=self.brs)
+                      for _ in range(batch)]
+
+    def make_batch(self):
+        """(ids, lengths, payloads, on-wire 시간) 배치를 만듭니다."""
+        n = self.batch
+        ids = self.rng.integers(self.id_range[0], self.id_range[1] + 1, n)
+        lengths = self.rng.choice(self.lengths, n)
+        payloads = np.frombuffer(os.urandom(n * self.max_len), dtype=np.uint8).reshape(n, self.max_len)
+        times = frame_times(ids, payloads, lengths, self.bitrate, self.data_bitrate,
+                            is_fd=self.is_fd, brs=self.brs)
+        return ids, lengths, payloads, times
+
+    def run(self, duration: float = None, stop: threading.Event = None, report=None,
+            report_interval: float = 1.0) -> LoadStats:
+        """duration 초 동안(또는 stop 이 설정될 때까지) 전송합니다. report(LoadStats) 는 주기적으로 호출됩니다."""
+        clock = time.perf_counter
+        frames = errors = 0
+        busy = 0.0
+        start = deadline = clock()
+        wall_offset = time.time() - start
+        next_report = start + report_interval
+        end = start + duration if duration else math.inf
+        while (stop is None or not stop.is_set()) and clock() < end:
+            ids, lengths, payloads, times = self.make_batch()
+            gaps = (times / self.target_load).tolist()
+            sent_at = []
+            for msg, frame_id, length, row, gap, wire in zip(self._pool, ids.tolist(), lengths.tolist(),
+                                                             payloads, gaps, times.tolist()):
+                remaining = deadline - clock()
+                if remaining > self.spin:
+                    time.sleep(remaining - self.spin)
+                while clock() < deadline:
+                    pass
+                msg.arbitration_id = frame_id
+                msg.dlc = length    # python-can 의 dlc 는 바이트 수입니다. (DLC 코드 변환은 인터페이스가 합니다)
+                msg.data = bytearray(row[:length].tobytes())
+                sent_at.append(clock() + wall_offset)
+                try:
+                    self.bus.send(msg)
+                    frames += 1
+                    busy += wire
+                except can.CanError:
+                    errors += 1
+                deadline += gap
+            now = clock()
+            if deadline < now - 0.1:
+                deadline = now      # 송신 버퍼가 막혀 크게 밀렸으면 몰아서 보내지 않고 다시 맞춥니다.
+            if self.logger is not None:
+                self.logger.put(sent_at, ids, lengths, payloads, self.is_fd, self.brs)
+            if report is not None and now >= next_report:
+                report(LoadStats(frames, errors, now - start, busy))
+                next_report = now + report_interval
+        return LoadStats(frames, errors, clock() - start, busy)
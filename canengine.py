@@ -0,0 +1,247 @@
+import multiprocessing.spawn
+import os
+import pickle
+import queue
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Connection, answer_challenge, deliver_challenge
+from typing import Callable, List, Tuple
+
+# 이벤트 종류 (엔진 -> GUI)
+LOG = 'log'         # (LOG, 문자열)
+RESULT = 'result'   # (RESULT, 요청 번호, 메서드 이름, 반환값)  call() 로 보낸 요청만
+ERROR = 'error'     # (ERROR, 요청 번호, 메서드 이름, 예외 문자열)
+STATS = 'stats'     # (STATS, handler.stats() 스냅숏)
+EXITED = 'exited'   # (EXITED, None) 엔진 프로세스가 끝나기 직전
+
+_AUTHKEY_ENV = 'CANENGINE_AUTHKEY'
+ENGINE_STOPPED = "엔진 프로세스가 종료되었습니다"
+
+# =========================== 엔진 프로세스 쪽 ===========================
+class _Events:
+    """엔진 -> GUI 이벤트 큐. GUI 가 멈춰 큐가 가득 차면 기다리지 않고 버리고 개수만 셉니다.
+    (큐 쓰기가 막혀서 전송 스레드까지 멈추는 일이 없도록)
+
+    큐는 엔진 프로세스 안에 있고 전달 스레드가 하나씩 꺼내 연결로 보냅니다.
+    """
+    def __init__(self, conn, max_events: int):
+        self._conn = conn
+        self._q = queue.Queue(max_events)
+        self.dropped = 0
+        self.detached = False   # GUI 가 닫힌 뒤에는 아무도 읽지 않으므로 보내지 않습니다.
+        self._thread = threading.Thread(target=self._run, name='engine-events', daemon=True)
+        self._thread.start()
+
+    def put(self, event: tuple):
+        if self.detached:
+            return
+        try:
+            self._q.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def log(self, text: str):
+        self.put((LOG, text))
+
+    def _run(self):
+        while True:
+            event = self._q.get()
+            if event is None:
+                return
+            try:
+                self._conn.send(event)
+            except (OSError, EOFError, ValueError):
+                self.detached = True
+
+    def close(self, timeout: float = 1.0):
+        """남은 이벤트를 보낼 때까지 잠깐 기다립니다."""
+        try:
+            self._q.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+def _serve(factory, conn, events: _Events, stats_interval: float, keep_alive: bool):
+    """엔진 프로세스 본체: 명령을 읽어 handler 메서드를 부르고, stats_interval 마다 통계를 보냅니다.
+
+    handler = factory(log) 로 만들며 log(text) 로 GUI 로그에 남길 수 있습니다.
+    handler 에 stats() 가 있으면 주기적으로, close() 가 있으면 종료할 때 부릅니다.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)    # Ctrl+C 는 GUI 프로세스가 처리하고 shutdown 을 보냅니다.
+    handler = factory(events.log)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    next_stats = time.monotonic() + stats_interval
+    try:
+        while not stop.is_set():
+            timeout = max(0.0, next_stats - time.monotonic())
+            if events.detached:
+                stop.wait(timeout)
+            elif conn.poll(timeout):
+                try:
+                    seq, method, args, kwargs, reply = conn.recv()
+                except (EOFError, OSError):
+                    # GUI 프로세스가 닫혔거나 죽었습니다.
+                    if not keep_alive:
+                        break
+                    events.detached = True
+                    print("⚠️ GUI 와의 연결이 끊겼지만 엔진은 계속 전송합니다. (종료: SIGTERM)")
+                    continue
+                if method is None:      # shutdown
+                    break
+                try:
+                    result = getattr(handler, method)(*args, **kwargs)
+                    if reply:
+                        events.put((RESULT, seq, method, result))
+                except Exception as e:
+                    events.put((ERROR, seq, method, f"{type(e).__name__}: {e}"))
+            if time.monotonic() >= next_stats:
+                next_stats += stats_interval
+                if hasattr(handler, 'stats'):
+                    try:
+                        events.put((STATS, handler.stats()))
+                    except Exception as e:
+                        events.log(f"⚠️ 통계 수집 실패: {e}")
+    finally:
+        if hasattr(handler, 'close'):
+            handler.close()
+        if events.dropped:
+            print(f"⚠️ GUI 가 읽지 않아 버린 엔진 이벤트: {events.dropped}개")
+        events.put((EXITED, None))
+        events.close()
+
+def _child_main(address: str):
+    """python canengine.py <port> 로 실행된 엔진 프로세스의 시작점"""
+    conn = Client(('127.0.0.1', int(address)), authkey=bytes.fromhex(os.environ.pop(_AUTHKEY_ENV)))
+    # GUI 의 sys.path / 작업 디렉터리 / __main__ 모듈을 맞춘 뒤에 factory 를 풉니다. (spawn 과 같은 방식)
+    multiprocessing.spawn.prepare(conn.recv())
+    factory, stats_interval, keep_alive, max_events = pickle.loads(conn.recv_bytes())
+    _serve(factory, conn, _Events(conn, max_events), stats_interval, keep_alive)
+
+# =========================== GUI 프로세스 쪽 ===========================
+class EngineProcess:
+    """CAN 송수신 엔진(handler)을 별도 프로세스에서 돌리고 로컬 소켓 연결로 명령과 로그/결과/통계를 주고받습니다.
+
+    GUI 의 redraw, 로그 출력, GIL 경쟁이 전송 타이밍에 끼어들지 않도록 버스와 전송 스레드는 모두 엔진 프로세스에 있습니다.
+    call() 은 결과를 기다리지 않고 요청 번호만 돌려주며, 결과는 poll() 로 받은 RESULT/ERROR 이벤트로 옵니다.
+    결과가 필요 없는 명령(프레임 전송 등)은 post() 로 보내면 RESULT 없이 실패했을 때만 ERROR 가 옵니다.
+    (명령마다 RESULT 가 쌓여 이벤트 큐가 차고 STATS 가 버려지지 않도록)
+    keep_alive=True 이면 엔진을 GUI 와 독립된 프로세스(Windows: DETACHED_PROCESS, 그 밖: 새 세션)로 띄우므로
+    GUI 가 멈추거나 죽어도 엔진은 마지막 상태 그대로 계속 전송합니다.
+
+    엔진은 subprocess 로 새 인터프리터에서 시작하므로(Tk 와 스레드가 있는 프로세스를 fork 하지 않습니다)
+    factory 는 pickle 할 수 있는 모듈 최상위 클래스/함수여야 합니다.
+    """
+    def __init__(self, factory: Callable, stats_interval: float = 1.0, keep_alive: bool = False,
+                 max_events: int = 1000, timeout: float = 10.0):
+        authkey = os.urandom(16)
+        server = socket.create_server(('127.0.0.1', 0))
+        kwargs = {}
+        if keep_alive:
+            if sys.platform == 'win32':
+                kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+            else:
+                kwargs['start_new_session'] = True
+        env = dict(os.environ, **{_AUTHKEY_ENV: authkey.hex()})
+        with server:
+            self.process = subprocess.Popen([sys.executable, os.path.abspath(__file__),
+                                             str(server.getsockname()[1])], env=env, **kwargs)
+            self._conn = self._accept(server, authkey, timeout)
+        prep = multiprocessing.spawn.get_preparation_data('can-engine')
+        prep.pop('authkey', None)   # multiprocessing 인증 키는 pickle 할 수 없고 엔진에 필요하지도 않습니다.
+        self._conn.send(prep)
+        self._conn.send_bytes(pickle.dumps((factory, stats_interval, keep_alive, max_events)))
+        self._seq = 0
+        self._pending: List[Tuple] = []     # call() 이 직접 만든 이벤트 (엔진이 죽었을 때)
+        self._stopped = False
+        self.keep_alive = keep_alive
+
+    def _accept(self, server, authkey: bytes, timeout: float) -> Connection:
+        server.settimeout(0.1)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                sock, _ = server.accept()
+                break
+            except socket.timeout:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.process.kill()
+                    raise RuntimeError(f"CAN 엔진 프로세스가 연결하지 않았습니다 (exit code {self.process.poll()})")
+        sock.settimeout(None)
+        conn = Connection(sock.detach())
+        deliver_challenge(conn, authkey)
+        answer_challenge(conn, authkey)
+        return conn
+
+    @property
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def call(self, method: str, *args, **kwargs) -> int:
+        """엔진의 handler.method(*args, **kwargs) 를 요청합니다. 요청 번호를 돌려줍니다."""
+        return self._send(method, args, kwargs, True)
+
+    def post(self, method: str, *args, **kwargs) -> int:
+        """call() 과 같지만 결과를 돌려받지 않습니다. 실패하면 ERROR 이벤트만 옵니다."""
+        return self._send(method, args, kwargs, False)
+
+    def _send(self, method, args, kwargs, reply: bool) -> int:
+        self._seq += 1
+        if self._stopped:
+            return self._seq
+        try:
+            self._conn.send((self._seq, method, args, kwargs, reply))
+        except (OSError, EOFError, ValueError):
+            # 엔진이 이미 죽었습니다. 버튼마다 traceback 을 내지 않고 poll() 로 한 번만 알립니다.
+            self._stopped = True
+            self._pending.append((ERROR, self._seq, method, ENGINE_STOPPED))
+        return self._seq
+
+    def poll(self, limit: int = 200) -> List[Tuple]:
+        """쌓인 이벤트를 최대 limit 개까지 기다리지 않고 꺼냅니다. (Tk after() 콜백에서 주기적으로 부르세요)"""
+        out, self._pending = self._pending, []
+        try:
+            while len(out) < limit and self._conn.poll(0):
+                out.append(self._conn.recv())
+        except (OSError, EOFError):
+            pass
+        return out
+
+    def shutdown(self, timeout: float = 2.0) -> List[Tuple]:
+        """엔진에 종료를 요청하고 handler.close() 가 끝날 때까지 기다립니다. 그동안 받은 이벤트를 돌려줍니다."""
+        events = []
+        if self.is_alive:
+            try:
+                self._conn.send((0, None, (), {}, False))
+            except (OSError, EOFError, ValueError):
+                pass
+            # 이벤트를 계속 읽어 줘야 엔진의 전달 스레드가 막히지 않고 끝납니다.
+            deadline = time.monotonic() + timeout
+            while self.is_alive and time.monotonic() < deadline:
+                events += self.poll()
+                time.sleep(0.05)
+            if self.is_alive:
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+        events += self.poll()
+        self._conn.close()
+        return events
+
+    def detach(self):
+        """엔진을 그대로 둔 채 GUI 쪽 연결만 닫습니다. (keep_alive=True 일 때 GUI 종료용)
+
+        엔진은 독립 프로세스로 띄웠으므로 GUI 프로세스가 끝나도 함께 종료되거나 회수되지 않습니다.
+        """
+        if not self.keep_alive:
+            raise RuntimeError("keep_alive=False 인 엔진은 detach 할 수 없습니다. shutdown() 을 쓰세요.")
+        self._conn.close()
+
+if __name__ == "__main__":
+    _child_main(sys.argv[1])
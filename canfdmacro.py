@@ -2,9 +2,17 @@ import can
 import time
 import random
 import serial
+from busload import TrafficGenerator, FrameLogger
 
 def main():
     """메인 실행 함수"""
+    # ============================ 사용자 설정 ============================
+    BITRATE = 500000        # Nominal Bitrate
+    DATA_BITRATE = 2000000  # Data Bitrate
+    TARGET_LOAD = None      # 0.3 / 0.6 / 0.9 등으로 두면 목표 버스 부하 생성기 모드 (None: 기존 랜덤 전송)
+    LOG_FILE = None         # 생성기 모드에서 보낸 프레임을 candump 형식으로 기록할 파일 (None: 기록 안 함)
+    # =================================================================
+
     bus = None
     com_port = 'COM14' # 장치 관리자에서 확인한 COM 포트 번호
 
@@ -13,10 +21,20 @@ def main():
             interface='slcan',
             channel=com_port,
             fd=True,            # CAN FD 모드 활성화 시도
-            bitrate=500000,     # Nominal Bitrate
-            data_bitrate=2000000 # Data Bitrate
+            bitrate=BITRATE,
+            data_bitrate=DATA_BITRATE
         )
         print(f"CANable 버스가 'slcan' 방식을 통해 {com_port}에서 CAN FD 모드로 초기화되었습니다.")
+
+        if TARGET_LOAD:
+            logger = FrameLogger(LOG_FILE)
+            generator = TrafficGenerator(bus, BITRATE, TARGET_LOAD, data_bitrate=DATA_BITRATE, is_fd=True, logger=logger)
+            print(f"버스 부하 {TARGET_LOAD:.0%} 목표로 랜덤 프레임을 생성합니다.")
+            try:
+                generator.run(report=lambda s: print(f"\r전송 {s.frames}개 | {s.rate:.0f} fps | 부하 {s.load:.1%} | 오류 {s.errors}", end=""))
+            finally:
+                logger.close()
+            return
         print("랜덤 CAN FD 메시지 전송을 시작합니다. (Ctrl+C를 눌러 중지)")
 
         DLC_TO_BYTES = [0, 1, 2, 3, 4, 5, 6, 7, 8, 12, 16, 20, 24, 32, 48, 64]
@@ -2,29 +2,30 @@ import can
 import time
 import random
 import serial
-import sqlite3
-
-def setup_database(db_name="sent_data.db"):
-    conn = sqlite3.connect(db_name)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS sent_payloads (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            payload BLOB NOT NULL UNIQUE,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    conn.commit()
-    return conn, cursor
+import os
+from payloadstore import open_database, PayloadStore, PermutationGenerator
 
 def main():
+    # ============================ 사용자 설정 ============================
+    DB_NAME = "sent_data.db"
+    MODE = "store"          # "store": 랜덤 + 메모리 중복 검사 / "permutation": 키 기반 순열로 구성상 중복 없음
+    BLOOM_CAPACITY = None   # store 모드에서 Bloom 필터를 쓸 예상 최대 개수 (None: 정확한 집합)
+    SEND_INTERVAL = 0.1     # 프레임 간격(초), 0 이면 버스가 허용하는 만큼 빠르게
+    # =================================================================
+
     bus = None
     db_conn = None
+    source = None
     com_port = 'COM14'
 
     try:
-        db_conn, cursor = setup_database()
-        print("데이터베이스 'sent_data.db'에 연결되었습니다.")
+        db_conn = open_database(DB_NAME)
+        if MODE == "permutation":
+            source = PermutationGenerator(db_conn)
+            print(f"데이터베이스 '{DB_NAME}'에 연결되었습니다. (순열 생성기, 카운터 {source.counter}부터 재개)")
+        else:
+            source = PayloadStore(db_conn, bloom_capacity=BLOOM_CAPACITY)
+            print(f"데이터베이스 '{DB_NAME}'에 연결되었습니다. (기존 payload {source.loaded}개 로드)")
 
         bus = can.interface.Bus(
             interface='slcan',
@@ -37,22 +38,13 @@ def main():
         print("DLC=15 고정, 중복되지 않는 랜덤 데이터를 전송합니다. (Ctrl+C로 중지)")
 
         while True:
-            unique_data_found = False
-            random_data_list = None
-            
-            while not unique_data_found:
-                data_list = [random.randint(0, 255) for _ in range(64)]
-                data_blob = bytes(data_list)
-
-                try:
-                    cursor.execute("INSERT INTO sent_payloads (payload) VALUES (?)", (data_blob,))
-                    db_conn.commit()
-                    
-                    random_data_list = data_list
-                    unique_data_found = True
-
-                except sqlite3.IntegrityError:
-                    time.sleep(0.01)
+            if MODE == "permutation":
+                random_data = source.next()
+            else:
+                # 중복 검사는 메모리에서 하고, DB 기록은 모아서 한 번에 커밋합니다.
+                random_data = os.urandom(64)
+                while not source.add(random_data):
+                    random_data = os.urandom(64)
 
             random_id = random.randint(0x000, 0x7FF)
             dlc = 15
@@ -62,7 +54,7 @@ def main():
                 is_extended_id=False,
                 is_fd=True,
                 dlc=dlc,
-                data=random_data_list
+                data=random_data
             )
 
             try:
@@ -72,7 +64,8 @@ def main():
             except can.CanError as e:
                 print(f"메시지 전송 실패: {e}")
 
-            time.sleep(0.1)
+            if SEND_INTERVAL:
+                time.sleep(SEND_INTERVAL)
 
     except (can.CanError, serial.SerialException) as e:
         print(f"CAN 버스 초기화 실패: {e}")
@@ -82,6 +75,8 @@ def main():
         if bus:
             bus.shutdown()
             print("CAN 버스가 종료되었습니다.")
+        if source:
+            source.close()
         if db_conn:
             db_conn.close()
             print("데이터베이스 연결이 종료되었습니다.")
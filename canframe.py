@@ -0,0 +1,120 @@
+import can
+
+from e2e import E2EMessage, to_raw
+
+# =========================== 사전 컴파일된 프레임 템플릿 ===========================
+class CompiledFrame:
+    """DBC 메시지를 한 번만 해석해 두고, 바뀐 신호의 비트만 shift/mask 로 패치하는 전송용 템플릿
+
+    - little endian 신호는 페이로드를 little endian 정수로 봤을 때 연속된 비트이고,
+    - big endian 신호는 big endian 정수로 봤을 때 연속된 비트이므로
+    신호마다 (shift, mask) 한 쌍만으로 값을 넣고 뺄 수 있습니다.
+    can.Message 와 data 버퍼는 미리 만들어 두고 build() 때마다 재사용합니다.
+    crc_signal 을 주면 CRC/Alive Counter 는 e2e.E2EMessage 로 함께 계산합니다.
+    CRC 없이 counter_signal 만 주면 카운터는 다른 신호처럼 shift/mask 로 증가시킵니다.
+    """
+    def __init__(self, message, crc_signal: str = None, counter_signal: str = None,
+                 is_extended_id: bool = None, crc_func=None):
+        if message.is_multiplexed():
+            raise ValueError(f"{message.name}: multiplexed messages are not supported")
+        self.name = message.name
+        self.frame_id = message.frame_id
+        self.length = message.length
+        self._signals = {s.name: s for s in message.signals}
+        self._layout = {}
+        for s in message.signals:
+            mask = (1 << s.length) - 1
+            if s.byte_order == 'little_endian':
+                self._layout[s.name] = (False, s.start, mask)
+            else:
+                msb = (self.length - 1 - s.start // 8) * 8 + s.start % 8
+                self._layout[s.name] = (True, msb - s.length + 1, mask)
+        self._raw = {s.name: 0 for s in message.signals}
+        self._le = 0
+        self._be = 0
+        self._e2e = None
+        self._counter = None        # CRC 없는 메시지의 Alive Counter 신호
+        if crc_signal:
+            kwargs = {'crc_func': crc_func} if crc_func else {}
+            self._e2e = E2EMessage(message, crc_signal, counter_signal, **kwargs)
+        elif counter_signal:
+            if counter_signal not in self._layout:
+                raise ValueError(f"{message.name}: '{counter_signal}' 신호가 없습니다")
+            self._counter = counter_signal
+
+        if is_extended_id is None:
+            is_extended_id = message.is_extended_frame
+        self.message = can.Message(arbitration_id=self.frame_id, is_extended_id=is_extended_id,
+                                   is_fd=message.is_fd, data=bytearray(self.length))
+
+    def set_raw(self, name: str, raw: int):
+        if self._e2e is not None:
+            self._e2e.set_raw(name, raw)
+            return
+        old = self._raw[name]
+        if old == raw:
+            return
+        self._raw[name] = raw
+        is_big, shift, mask = self._layout[name]
+        delta = ((old ^ raw) & mask) << shift
+        if is_big:
+            self._be ^= delta
+        else:
+            self._le ^= delta
+
+    def set(self, name: str, value):
+        self.set_raw(name, to_raw(self._signals[name], value))
+
+    def update(self, signal_values: dict):
+        for name, value in signal_values.items():
+            self.set(name, value)
+
+    def payload(self) -> bytes:
+        if self._e2e is not None:
+            return self._e2e.payload()
+        value = self._le
+        if self._be:
+            value |= int.from_bytes(self._be.to_bytes(self.length, 'big'), 'little')
+        return value.to_bytes(self.length, 'little')
+
+    @property
+    def has_counter(self) -> bool:
+        if self._e2e is not None:
+            return bool(self._e2e.counter_signal)
+        return self._counter is not None
+
+    @property
+    def counter_modulus(self) -> int:
+        """Alive Counter 가 한 바퀴 도는 데 걸리는 주기 수 (카운터가 없으면 1)"""
+        if self._e2e is not None:
+            return self._e2e.counter_modulus
+        if self._counter is None:
+            return 1
+        return self._layout[self._counter][2] + 1
+
+    def advance_counter(self) -> int:
+        """Alive Counter 를 1 증가시키고 새 값을 돌려줍니다."""
+        if self._e2e is not None:
+            return self._e2e.advance_counter()
+        value = (self._raw[self._counter] + 1) & self._layout[self._counter][2]
+        self.set_raw(self._counter, value)
+        return value
+
+    def cycle_messages(self) -> list:
+        """Alive Counter 한 바퀴 분량의 프레임을 CRC 까지 채워 순서대로 돌려줍니다.
+
+        드라이버 주기 전송(send_periodic)에 시퀀스로 넘기기 위한 것으로, 끝나면 카운터는 제자리로 돌아옵니다.
+        """
+        count = self.counter_modulus
+        messages = []
+        for _ in range(count):
+            messages.append(can.Message(arbitration_id=self.frame_id, is_extended_id=self.message.is_extended_id,
+                                        is_fd=self.message.is_fd, data=self.payload()))
+            if self.has_counter:
+                self.advance_counter()
+        return messages
+
+    def build(self) -> can.Message:
+        """현재 신호 값으로 미리 만들어 둔 can.Message 의 data 를 패치해서 돌려줍니다."""
+        self.message.data[:] = self.payload()
+        return self.message
@@ -0,0 +1,160 @@
+import mmap
+import os
+import re
+import base64
+from typing import NamedTuple, Optional
+
+# =========================== 로그 프레임 ===========================
+class LogFrame(NamedTuple):
+    timestamp: float
+    arbitration_id: int
+    data: bytes
+    is_extended_id: bool = False
+    is_fd: bool = False
+    channel: str = ''
+    is_rx: bool = True
+    bitrate_switch: bool = False    # CAN FD BRS 플래그
+
+# candump -L / -l: (1436509052.249713) can0 413#1880000000000000 [R|T] , FD: 413##1<data>
+_CANDUMP_LOG = re.compile(rb'^\s*\((\d+\.\d+)\)\s+(\S+)\s+([0-9A-Fa-f]+)#(#[0-9A-Fa-f])?([0-9A-Fa-f]*|R\d*)(?:\s+([RT]))?\s*$')
+# candump (기본 출력, -t 옵션 포함): (0.000100)  can0  413   [8]  18 80 00 00 00 00 00 00
+_CANDUMP_TEXT = re.compile(rb'^\s*(?:\((\d+\.\d+)\)\s+)?(\S+)\s+([0-9A-Fa-f]+)\s+\[(\d+)\]\s+((?:[0-9A-Fa-f]{2}\s*)*)$')
+# Vector ASC (Classic CAN): 0.123456 1  413  Rx   d 8 18 80 00 00 00 00 00 00
+_ASC_CAN = re.compile(rb'^\s*(\d+\.\d+)\s+(\d+)\s+([0-9A-Fa-f]+)(x?)\s+(Rx|Tx)\s+d\s+([0-9A-Fa-f]+)\s+((?:[0-9A-Fa-f]{2}\s*)*)')
+
+# =========================== 포맷별 파서 ===========================
+def _mapped_lines(path: str):
+    """파일을 메모리 매핑해서 한 줄씩 돌려줍니다. (파일 크기와 무관하게 일정한 메모리 사용)"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b''):
+                yield line
+
+def _parse_candump(path: str):
+    for line in _mapped_lines(path):
+        m = _CANDUMP_LOG.match(line)
+        if m:
+            ts, channel, can_id, fd_flags, data, direction = m.groups()
+            if data.startswith(b'R'):
+                continue  # 리모트 프레임은 페이로드가 없습니다.
+            # FD 플래그 nibble: 0x1 = BRS, 0x2 = ESI
+            yield LogFrame(float(ts), int(can_id, 16), bytes.fromhex(data.decode()),
+                           len(can_id) > 3, fd_flags is not None, channel.decode(), direction != b'T',
+                           fd_flags is not None and bool(int(fd_flags[1:], 16) & 0x1))
+            continue
+        m = _CANDUMP_TEXT.match(line)
+        if m:
+            ts, channel, can_id, _, data = m.groups()
+            yield LogFrame(float(ts) if ts else 0.0, int(can_id, 16), bytes.fromhex(data.decode()),
+                           len(can_id) > 3, False, channel.decode())
+
+def _parse_asc(path: str):
+    for line in _mapped_lines(path):
+        m = _ASC_CAN.match(line)
+        if m:
+            ts, channel, can_id, ext, direction, _, data = m.groups()
+            yield LogFrame(float(ts), int(can_id, 16), bytes.fromhex(data.decode()),
+                           bool(ext), False, channel.decode(), direction == b'Rx')
+            continue
+        tokens = line.split()
+        # CAN FD: <time> CANFD <ch> <Rx|Tx> <id>[x] [<name>] <brs> <esi> <dlc> <len> <data...>
+        if len(tokens) > 9 and tokens[1] == b'CANFD':
+            try:
+                rest = tokens[5:]
+                if rest[0] not in (b'0', b'1'):
+                    rest = rest[1:]  # 심볼 이름
+                length = int(rest[3])
+                can_id = tokens[4]
+                yield LogFrame(float(tokens[0]), int(can_id.rstrip(b'x'), 16),
+                               bytes.fromhex(b''.join(rest[4:4 + length]).decode()),
+                               can_id.endswith(b'x'), True, tokens[2].decode(), tokens[3] == b'Rx',
+                               rest[0] == b'1')
+            except (ValueError, IndexError):
+                continue
+
+def _parse_csv(path: str):
+    lines = _mapped_lines(path)
+    header = next(lines, b'').decode().strip().lower().split(',')
+    # python-can CSVWriter 포맷은 data 를 base64 로 저장합니다.
+    python_can = 'remote' in header and 'extended' in header
+    ts_col = header.index('timestamp') if 'timestamp' in header else None
+    id_col = header.index('arbitration_id') if 'arbitration_id' in header else header.index('id')
+    data_col = header.index('data')
+    ext_col = header.index('extended') if 'extended' in header else None
+    for line in lines:
+        cols = line.decode().strip().split(',')
+        if len(cols) <= max(id_col, data_col):
+            continue
+        try:
+            data = base64.b64decode(cols[data_col]) if python_can else bytes.fromhex(cols[data_col])
+            yield LogFrame(float(cols[ts_col]) if ts_col is not None else 0.0, int(cols[id_col], 16), data,
+                           ext_col is not None and cols[ext_col] in ('1', 'True', 'true'))
+        except ValueError:
+            continue
+
+def _parse_blf(path: str):
+    # BLF 는 zlib 압축 컨테이너라 mmap 대신 python-can 의 스트리밍 리더를 사용합니다.
+    import can
+    for msg in can.BLFReader(path):
+        if msg.is_error_frame or msg.is_remote_frame:
+            continue
+        yield LogFrame(msg.timestamp, msg.arbitration_id, bytes(msg.data), msg.is_extended_id,
+                       msg.is_fd, str(msg.channel) if msg.channel is not None else '', msg.is_rx,
+                       msg.bitrate_switch)
+
+PARSERS = {
+    'candump': _parse_candump,
+    'asc': _parse_asc,
+    'csv': _parse_csv,
+    'blf': _parse_blf,
+}
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    return {'.asc': 'asc', '.csv': 'csv', '.blf': 'blf'}.get(ext, 'candump')
+
+def iter_frames(path: str, fmt: Optional[str] = None, ids=None):
+    """로그 파일의 프레임을 스트리밍으로 하나씩 돌려줍니다. ids 를 주면 해당 ID 만 돌려줍니다."""
+    parser = PARSERS[fmt or detect_format(path)]
+    if ids is None:
+        yield from parser(path)
+        return
+    ids = set(ids)
+    for frame in parser(path):
+        if frame.arbitration_id in ids:
+            yield frame
+
+# =========================== ID 별 그룹화 ===========================
+def collect_payloads(path: str, fmt: Optional[str] = None, ids=None, max_per_id: Optional[int] = 4096):
+    """ID 별 중복 없는 페이로드를 첫 등장 순서대로 모읍니다.
+
+    ID 마다 최대 max_per_id 개까지만 보관하므로 로그 크기와 무관하게 메모리가 제한됩니다.
+    """
+    groups = {}
+    seen = {}
+    for frame in iter_frames(path, fmt, ids):
+        payloads = groups.get(frame.arbitration_id)
+        if payloads is None:
+            payloads = groups[frame.arbitration_id] = []
+            seen[frame.arbitration_id] = set()
+        if max_per_id is not None and len(payloads) >= max_per_id:
+            continue
+        known = seen[frame.arbitration_id]
+        if frame.data not in known:
+            known.add(frame.data)
+            payloads.append(frame.data)
+    return groups
+
+def crc_samples(path: str, can_id: int, fmt: Optional[str] = None, max_samples: Optional[int] = 64):
+    """findcrc.search_crc / crcsolver.solve_crc 에 바로 넘길 수 있는 (can_id, data) 목록을 만듭니다."""
+    payloads = collect_payloads(path, fmt, ids=(can_id,), max_per_id=max_samples).get(can_id, [])
+    # 가장 흔한 길이(DLC) 만 사용합니다.
+    lengths = {}
+    for data in payloads:
+        lengths[len(data)] = lengths.get(len(data), 0) + 1
+    if not lengths:
+        return []
+    length = max(lengths, key=lengths.get)
+    return [(can_id, data) for data in payloads if len(data) == length]
@@ -2,8 +2,15 @@ import can
 import time
 import random
 import os
+from busload import TrafficGenerator, FrameLogger
 
 def main():
+    # ============================ 사용자 설정 ============================
+    BITRATE = 500000        # 클래식 CAN 통신 속도 (500kbit/s)
+    TARGET_LOAD = None      # 0.3 / 0.6 / 0.9 등으로 두면 목표 버스 부하 생성기 모드 (None: 기존 랜덤 전송)
+    LOG_FILE = None         # 생성기 모드에서 보낸 프레임을 candump 형식으로 기록할 파일 (None: 기록 안 함)
+    # =================================================================
+
     bus = None
     try:
         # 클래식 CAN 모드로 PCAN-USB 버스 초기화 ---
@@ -12,9 +19,19 @@ def main():
             channel='PCAN_USBBUS1',
             state=can.BusState.ACTIVE,
             # fd=True 와 data_bitrate 옵션 제거
-            bitrate=500000  # 클래식 CAN 통신 속도 (500kbit/s)
+            bitrate=BITRATE
         )
         print("PCAN 버스가 python-can을 통해 클래식 CAN 모드로 초기화되었습니다.")
+
+        if TARGET_LOAD:
+            logger = FrameLogger(LOG_FILE)
+            generator = TrafficGenerator(bus, BITRATE, TARGET_LOAD, logger=logger)
+            print(f"버스 부하 {TARGET_LOAD:.0%} 목표로 랜덤 프레임을 생성합니다.")
+            try:
+                generator.run(report=lambda s: print(f"\r전송 {s.frames}개 | {s.rate:.0f} fps | 부하 {s.load:.1%} | 오류 {s.errors}", end=""))
+            finally:
+                logger.close()
+            return
         print("랜덤 CAN 메시지 전송을 시작합니다. (Ctrl+C를 눌러 중지)")
 
         while True:
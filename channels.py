@@ -0,0 +1,462 @@
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+import can
+
+import canengine
+import dbccache
+from busload import TrafficGenerator
+from canframe import CompiledFrame
+from cyclic import CyclicManager
+from e2e import GV80_CRC8
+from txqueue import TxWorker
+
+# =========================== 버스 열기 ===========================
+def open_bus(interface: str, channel, bitrate: int = 500000, **bus_kwargs):
+    """인터페이스별 채널 표기 차이를 맞춰 버스를 엽니다.
+
+    gs_usb 는 채널이 USB 장치 인덱스(정수)여야 하므로 "0" 같은 문자열을 정수로 바꿉니다.
+    CAN FD 는 bus_kwargs 로 fd=True, data_bitrate=... 를 넘기세요.
+    """
+    if interface == 'gs_usb':
+        try:
+            channel = int(channel)
+        except ValueError:
+            print(f"Warning: gs_usb channel '{channel}' is not an integer. Defaulting to 0.")
+            channel = 0
+    return can.interface.Bus(channel=channel, interface=interface, bitrate=bitrate, **bus_kwargs)
+
+# =========================== 설정 ===========================
+class ChannelConfig(NamedTuple):
+    name: str
+    interface: str
+    channel: str
+    bitrate: int = 500000
+    nodes: tuple = ()               # 이 채널로 보낼 DBC 송신 노드 (BO_ 의 transmitter)
+    ids: tuple = ()                 # 이 채널로 보낼 ID 또는 (시작, 끝) 범위. nodes 보다 우선합니다.
+    bus_kwargs: dict = {}           # fd, data_bitrate, receive_own_messages 등 python-can 옵션
+
+class ChannelStats(NamedTuple):
+    name: str
+    tx: int
+    tx_errors: int
+    rx: int
+    tx_rate: float                  # 직전 통계 이후 초당 프레임 수
+    rx_rate: float
+    max_depth: int                  # TX 큐 최대 깊이
+    load: float                     # 부하 생성기가 낸 버스 부하 (생성기를 안 쓰면 0)
+
+def _parse_id(value) -> int:
+    return int(value, 0) if isinstance(value, str) else int(value)
+
+def _parse_ids(items) -> tuple:
+    """[0x3F3, "0x400-0x4FF", [0x500, 0x5FF]] -> (0x3F3, (0x400, 0x4FF), (0x500, 0x5FF))"""
+    out = []
+    for item in items or ():
+        if isinstance(item, str) and '-' in item:
+            start, end = item.split('-', 1)
+            out.append((_parse_id(start), _parse_id(end)))
+        elif isinstance(item, (list, tuple)):
+            out.append((_parse_id(item[0]), _parse_id(item[1])))
+        else:
+            out.append(_parse_id(item))
+    return tuple(out)
+
+def load_config(path: str) -> dict:
+    """JSON/YAML 채널 설정을 읽습니다.
+
+    {"dbc": "Temp_DBC.dbc", "default": "body",
+     "channels": [{"name": "body", "interface": "gs_usb", "channel": 0, "nodes": ["BCM"]},
+                  {"name": "chassis", "interface": "pcan", "channel": "PCAN_USBBUS1", "ids": ["0x100-0x1FF"]},
+                  {"name": "fd", "interface": "slcan", "channel": "COM14", "fd": true, "data_bitrate": 2000000}]}
+    name/interface/channel/bitrate/nodes/ids 밖의 키는 그대로 python-can 버스 옵션으로 넘깁니다.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            if yaml is None:
+                raise ImportError("YAML 설정을 읽으려면 PyYAML 이 필요합니다 (pip install pyyaml)")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    if data.get('dbc') and not os.path.isabs(data['dbc']):
+        data['dbc'] = os.path.join(base, data['dbc'])
+    data['channels'] = [parse_channel(item) for item in data['channels']]
+    return data
+
+def parse_channel(item: dict) -> ChannelConfig:
+    item = dict(item)
+    known = {key: item.pop(key) for key in ('name', 'interface', 'channel', 'bitrate', 'nodes', 'ids') if key in item}
+    return ChannelConfig(known['name'], known['interface'], known['channel'], int(known.get('bitrate', 500000)),
+                         tuple(known.get('nodes', ())), _parse_ids(known.get('ids')), item)
+
+# =========================== 채널 워커 (자식 프로세스) ===========================
+class _TxBus:
+    """TrafficGenerator 가 bus.send 대신 TxWorker 큐로 보내게 하는 얇은 어댑터 (버스는 TxWorker 만 씁니다)"""
+    def __init__(self, tx: TxWorker):
+        self.tx = tx
+
+    def send(self, msg, timeout=None):
+        self.tx.submit(msg, copy=True)
+
+class ChannelWorker:
+    """채널 하나의 버스, TX 워커, 주기 전송, RX 카운터를 가진 엔진 (canengine.EngineProcess 로 채널마다 한 프로세스)
+
+    버스는 open() 에서 엽니다. 생성자에서 열면 실패가 ERROR 이벤트가 아니라 프로세스 종료로만 보이기 때문입니다.
+    """
+    def __init__(self, config: ChannelConfig, dbc_path: Optional[str] = None, log=print):
+        self.config = config
+        self.dbc_path = dbc_path
+        self.log = log
+        self.bus = None
+        self.db = None
+        self.tx = None
+        self.cyclic = None
+        self.notifier = None
+        self.rx = 0
+        self._frames: Dict[str, CompiledFrame] = {}
+        self._load_stop = None
+        self._load_thread = None
+        self._load_stats = None         # 부하 생성기의 마지막 busload.LoadStats
+        self._last = (time.perf_counter(), 0, 0)
+
+    def open(self) -> str:
+        cfg = self.config
+        self.db = dbccache.load_file(self.dbc_path) if self.dbc_path else None
+        self.bus = open_bus(cfg.interface, cfg.channel, cfg.bitrate, **cfg.bus_kwargs)
+        self.tx = TxWorker(self.bus, on_error=lambda msg, e: self.log(f"❌ 0x{msg.arbitration_id:X} 전송 실패: {e}"))
+        self.tx.start()
+        self.cyclic = CyclicManager(self.bus, on_error=lambda name, e: self.log(f"❌ {name} 주기 전송 오류: {e}"),
+                                    send=lambda msg: self.tx.submit(msg, copy=True))
+        self.notifier = can.Notifier(self.bus, [self._on_rx])
+        return self.bus.channel_info
+
+    def _on_rx(self, msg: can.Message):
+        self.rx += 1
+
+    def _compile(self, message_name: str, crc_signal: str = None, counter_signal: str = None) -> CompiledFrame:
+        key = (message_name, crc_signal, counter_signal)
+        frame = self._frames.get(key)
+        if frame is None:
+            message = self.db.get_message_by_name(message_name)
+            frame = self._frames[key] = CompiledFrame(message, crc_signal, counter_signal,
+                                                      is_extended_id=message.is_extended_frame, crc_func=GV80_CRC8)
+        return frame
+
+    # --- 전송 명령 ---
+    def send(self, frame_id: int, data: bytes, is_extended_id: bool = False, is_fd: bool = False):
+        self.tx.submit(can.Message(arbitration_id=frame_id, data=data, is_extended_id=is_extended_id, is_fd=is_fd))
+
+    def send_batch(self, frames: list):
+        """[(frame_id, data), ...] 또는 [(frame_id, data, is_extended_id, is_fd), ...] 를 한 번의 명령으로 받아 보냅니다.
+        (프로세스 사이 왕복을 프레임마다 하지 않도록)
+
+        플래그를 주지 않은 프레임은 DBC 에 있는 ID 면 DBC 메시지의 확장 ID / FD 설정을, 없으면 send() 와 같은 기본값을 씁니다.
+        """
+        for frame_id, data, *flags in frames:
+            if flags:
+                is_extended_id, is_fd = flags
+            else:
+                is_extended_id, is_fd = self._frame_flags(frame_id)
+            self.tx.submit(can.Message(arbitration_id=frame_id, data=data, is_extended_id=is_extended_id, is_fd=is_fd))
+
+    def _frame_flags(self, frame_id: int) -> tuple:
+        if self.db is not None:
+            try:
+                message = self.db.get_message_by_frame_id(frame_id)
+            except KeyError:
+                pass
+            else:
+                return message.is_extended_frame, message.is_fd
+        return False, False
+
+    def send_message(self, message_name: str, signal_values: dict):
+        frame = self._compile(message_name)
+        frame.update(signal_values)
+        self.tx.submit(frame.build(), copy=True)
+
+    def start_cyclic(self, message_name: str, period: float, crc_signal: str = None, counter_signal: str = None,
+                     signal_values: dict = None) -> str:
+        frame = self._compile(message_name, crc_signal, counter_signal)
+        if signal_values:
+            frame.update(signal_values)
+        return self.cyclic.add(message_name, frame, period).mode
+
+    def update_cyclic(self, message_name: str, signal_values: dict):
+        self.cyclic.update(message_name, signal_values)
+
+    def stop_cyclic(self, message_name: str):
+        self.cyclic.remove(message_name)
+
+    def start_load(self, target_load: float, **kwargs):
+        """busload.TrafficGenerator 로 이 채널에 목표 부하의 랜덤 트래픽을 보냅니다. kwargs 는 생성기 옵션입니다."""
+        self.stop_load()
+        cfg = self.config
+        generator = TrafficGenerator(_TxBus(self.tx), cfg.bitrate, target_load,
+                                     data_bitrate=cfg.bus_kwargs.get('data_bitrate'),
+                                     is_fd=cfg.bus_kwargs.get('fd', False), **kwargs)
+        self._load_stop = threading.Event()
+        self._load_stats = None
+        self._load_thread = threading.Thread(target=generator.run, name=f"load-{cfg.name}", daemon=True,
+                                             kwargs={'stop': self._load_stop, 'report': self._on_load})
+        self._load_thread.start()
+
+    def _on_load(self, stats):
+        self._load_stats = stats
+
+    def stop_load(self):
+        if self._load_thread is not None:
+            self._load_stop.set()
+            self._load_thread.join(1.0)
+            self._load_thread = None
+
+    def stats(self) -> ChannelStats:
+        now = time.perf_counter()
+        tx = self.tx.stats.sent if self.tx else 0
+        last_time, last_tx, last_rx = self._last
+        elapsed = max(now - last_time, 1e-9)
+        self._last = (now, tx, self.rx)
+        load = self._load_stats.load if self._load_thread is not None and self._load_stats is not None else 0.0
+        return ChannelStats(self.config.name, tx, self.tx.stats.errors if self.tx else 0, self.rx,
+                            (tx - last_tx) / elapsed, (self.rx - last_rx) / elapsed,
+                            self.tx.stats.max_depth if self.tx else 0, load)
+
+    def close(self):
+        self.stop_load()
+        if self.cyclic is not None:
+            self.cyclic.stop()
+        if self.tx is not None:
+            self.tx.stop()
+        if self.notifier is not None:
+            self.notifier.stop()
+        if self.bus is not None:
+            self.bus.shutdown()
+            self.bus = None
+
+# =========================== 채널 관리자 (메인 프로세스) ===========================
+class ChannelManager:
+    """여러 어댑터(slcan/pcan/gs_usb/virtual 등)를 한 설정으로 열고 채널마다 워커 프로세스를 하나씩 둡니다.
+
+    채널마다 버스, TxWorker, 주기 전송, 부하 생성기가 자기 프로세스(자기 GIL)에서 돌므로 채널 수만큼 코어를 씁니다.
+    메시지는 route() 규칙(ids -> DBC 송신 노드 -> default 채널)으로 채널을 고르고,
+    통계는 각 워커가 stats_interval 마다 보내는 ChannelStats 를 poll() 로 모아 aggregate() 로 합칩니다.
+    """
+    def __init__(self, configs: List[ChannelConfig], dbc_path: Optional[str] = None, default: Optional[str] = None,
+                 stats_interval: float = 1.0, on_log: Callable[[str, str], None] = None):
+        names = [cfg.name for cfg in configs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"채널 이름이 중복되었습니다: {names}")
+        self.configs = {cfg.name: cfg for cfg in configs}
+        self.dbc_path = dbc_path
+        self.default = default
+        self.stats_interval = stats_interval
+        self.on_log = on_log or (lambda name, text: print(f"[{name}] {text}"))
+        self.db = dbccache.load_file(dbc_path) if dbc_path else None
+        self.engines: Dict[str, canengine.EngineProcess] = {}
+        self.stats: Dict[str, ChannelStats] = {}
+        self._results: Dict[tuple, tuple] = {}
+        self._waiting = set()          # 결과를 받을 (채널, 요청 번호). 나머지 결과/오류는 보관하지 않습니다.
+        self._routes: Dict[int, Optional[str]] = {}
+        self._ranges = []
+        self._node_channel = {}
+        for cfg in configs:
+            for item in cfg.ids:
+                if isinstance(item, tuple):
+                    self._ranges.append((item[0], item[1], cfg.name))
+                else:
+                    self._routes[item] = cfg.name
+            for node in cfg.nodes:
+                self._node_channel[node] = cfg.name
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> 'ChannelManager':
+        config = load_config(path)
+        return cls(config['channels'], config.get('dbc'), config.get('default'), **kwargs)
+
+    # --- 시작/종료 ---
+    def start(self, timeout: float = 10.0):
+        """채널마다 워커 프로세스를 띄우고 버스를 엽니다. 하나라도 실패하면 모두 닫고 RuntimeError 를 냅니다."""
+        pending = {}
+        for name, cfg in self.configs.items():
+            engine = canengine.EngineProcess(functools.partial(ChannelWorker, cfg, self.dbc_path), self.stats_interval)
+            self.engines[name] = engine
+            pending[name] = self.call(name, 'open')
+        failures = []
+        for name, seq in pending.items():
+            ok, value = self.wait(name, seq, timeout)
+            if ok:
+                self.on_log(name, f"✅ 연결: {value}")
+            else:
+                failures.append(f"{name}: {value}")
+        if failures:
+            self.close()
+            raise RuntimeError(f"채널 열기 실패 - {'; '.join(failures)}")
+
+    def close(self):
+        for name, engine in self.engines.items():
+            self._handle(name, engine.shutdown())
+        self.engines.clear()
+        self._waiting.clear()
+        self._results.clear()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- 이벤트/결과 ---
+    def _handle(self, name: str, events):
+        for event in events:
+            kind = event[0]
+            if kind == canengine.LOG:
+                self.on_log(name, event[1])
+            elif kind == canengine.STATS:
+                self.stats[name] = event[1]
+            elif kind == canengine.RESULT:
+                if (name, event[1]) in self._waiting:
+                    self._results[(name, event[1])] = (True, event[3])
+            elif kind == canengine.ERROR:
+                if (name, event[1]) in self._waiting:
+                    self._results[(name, event[1])] = (False, event[3])
+                self.on_log(name, f"❌ {event[2]} 실패: {event[3]}")
+
+    def poll(self):
+        """모든 워커의 로그/결과/통계를 가져옵니다. 주기적으로 불러 주세요."""
+        for name, engine in self.engines.items():
+            self._handle(name, engine.poll())
+
+    def wait(self, name: str, seq: int, timeout: float = 5.0) -> tuple:
+        """call 의 결과를 기다려 (성공 여부, 반환값 또는 오류 문자열) 을 돌려줍니다."""
+        key = (name, seq)
+        deadline = time.monotonic() + timeout
+        engine = self.engines[name]
+        while key not in self._results:
+            if time.monotonic() > deadline:
+                self._waiting.discard(key)      # 늦게 오는 결과는 보관하지 않습니다.
+                return False, "응답 시간 초과"
+            if not engine.is_alive:
+                self._handle(name, engine.poll())
+                if key in self._results:
+                    break
+                self._waiting.discard(key)
+                return False, "워커 프로세스가 종료되었습니다"
+            self.poll()
+            time.sleep(0.01)
+        self._waiting.discard(key)
+        return self._results.pop(key)
+
+    # --- 라우팅 ---
+    def route(self, frame_id: int) -> str:
+        """ID 를 보낼 채널 이름. 설정의 ids, DBC 송신 노드, default 순으로 찾습니다."""
+        name = self._routes.get(frame_id)
+        if name is None and frame_id not in self._routes:
+            name = next((ch for start, end, ch in self._ranges if start <= frame_id <= end), None)
+            if name is None and self.db is not None:
+                try:
+                    senders = self.db.get_message_by_frame_id(frame_id).senders
+                except KeyError:
+                    senders = []
+                name = next((self._node_channel[n] for n in senders if n in self._node_channel), None)
+            if name is None:
+                name = self.default
+            self._routes[frame_id] = name
+        if name is None:
+            raise KeyError(f"0x{frame_id:X} 를 보낼 채널이 없습니다 (ids/nodes/default 설정 확인)")
+        return name
+
+    def route_message(self, message_name: str) -> str:
+        return self.route(self.db.get_message_by_name(message_name).frame_id)
+
+    # --- 전송 (채널 워커로 위임) ---
+    def call(self, name: str, method: str, *args, **kwargs) -> int:
+        """결과가 필요한 명령. 돌려준 요청 번호로 wait() 해서 결과를 꺼내세요."""
+        seq = self.engines[name].call(method, *args, **kwargs)
+        self._waiting.add((name, seq))
+        return seq
+
+    def post(self, name: str, method: str, *args, **kwargs):
+        """결과를 받지 않는 명령. 실패하면 로그에만 남습니다."""
+        self.engines[name].post(method, *args, **kwargs)
+
+    def send(self, frame_id: int, data: bytes, channel: str = None, **kwargs):
+        self.post(channel or self.route(frame_id), 'send', frame_id, bytes(data), **kwargs)
+
+    def send_batch(self, frames):
+        """[(frame_id, data), ...] 또는 [(frame_id, data, is_extended_id, is_fd), ...] 를 채널별로 나눠
+        채널당 명령 한 번으로 보냅니다."""
+        batches: Dict[str, list] = {}
+        for frame_id, data, *flags in frames:
+            batches.setdefault(self.route(frame_id), []).append((frame_id, bytes(data), *flags))
+        for name, batch in batches.items():
+            self.post(name, 'send_batch', batch)
+
+    def send_message(self, message_name: str, signal_values: dict, channel: str = None):
+        self.post(channel or self.route_message(message_name), 'send_message', message_name, signal_values)
+
+    def start_cyclic(self, message_name: str, period: float, crc_signal: str = None, counter_signal: str = None,
+                     signal_values: dict = None, channel: str = None) -> int:
+        return self.call(channel or self.route_message(message_name), 'start_cyclic', message_name, period,
+                         crc_signal, counter_signal, signal_values)
+
+    def update_cyclic(self, message_name: str, signal_values: dict, channel: str = None):
+        self.post(channel or self.route_message(message_name), 'update_cyclic', message_name, signal_values)
+
+    def start_load(self, target_load: float, channels=None, **kwargs):
+        """지정한 채널(생략 시 전체)에 목표 부하의 랜덤 트래픽을 각 워커 프로세스에서 보냅니다."""
+        for name in channels or self.engines:
+            self.post(name, 'start_load', target_load, **kwargs)
+
+    def stop_load(self, channels=None):
+        for name in channels or self.engines:
+            self.post(name, 'stop_load')
+
+    # --- 통계 ---
+    def aggregate(self) -> ChannelStats:
+        """채널 통계 합계 (load 는 채널 평균, max_depth 는 최댓값)"""
+        items = list(self.stats.values())
+        if not items:
+            return ChannelStats('total', 0, 0, 0, 0.0, 0.0, 0, 0.0)
+        return ChannelStats('total', sum(s.tx for s in items), sum(s.tx_errors for s in items),
+                            sum(s.rx for s in items), sum(s.tx_rate for s in items), sum(s.rx_rate for s in items),
+                            max(s.max_depth for s in items), sum(s.load for s in items) / len(items))
+
+def format_stats(stats: ChannelStats) -> str:
+    return (f"{stats.name:>10}: TX {stats.tx:>8} ({stats.tx_rate:7.1f}/s, 오류 {stats.tx_errors}) "
+            f"RX {stats.rx:>8} ({stats.rx_rate:7.1f}/s) 큐 최대 {stats.max_depth} 부하 {stats.load * 100:5.1f}%")
+
+def main():
+    """설정 파일의 모든 채널을 열고 각 채널에 목표 부하 트래픽을 보내며 채널별/전체 통계를 출력합니다."""
+    # ============================ 사용자 설정 ============================
+    CONFIG_FILE = None              # None 이면 아래 가상 채널 3개로 시험합니다.
+    TARGET_LOAD = 0.5               # 채널마다 목표 버스 부하
+    DURATION = 10.0
+    # =================================================================
+
+    if CONFIG_FILE:
+        manager = ChannelManager.from_file(CONFIG_FILE)
+    else:
+        manager = ChannelManager([ChannelConfig(f"vcan{i}", 'virtual', f"channels_demo_{i}") for i in range(3)])
+    with manager:
+        manager.start_load(TARGET_LOAD)
+        end = time.monotonic() + DURATION
+        while time.monotonic() < end:
+            time.sleep(1.0)
+            manager.poll()
+            for stats in manager.stats.values():
+                print(format_stats(stats))
+            print(format_stats(manager.aggregate()) + "\n")
+        manager.stop_load()
+
+if __name__ == "__main__":
+    main()
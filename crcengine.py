@@ -0,0 +1,206 @@
+import functools
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# =========================== CRC 공용 엔진 ===========================
+# 파라미터 표기는 Rocksoft 모델을 따릅니다.
+#   width      : CRC 비트 수 (8 이상)
+#   poly       : 최상위 비트를 제외한 정규(MSB-first) 다항식 (예: CRC-8 0x1D)
+#   init       : 시프트 레지스터 초기값
+#   xor_out    : 최종 XOR 값
+#   reflect_in : 입력 바이트를 LSB-first 로 처리할지 여부
+#   reflect_out: 최종 레지스터를 비트 반전해서 출력할지 여부
+
+def reflect(value: int, width: int) -> int:
+    """value 의 하위 width 비트를 좌우 반전합니다."""
+    result = 0
+    for _ in range(width):
+        result = (result << 1) | (value & 1)
+        value >>= 1
+    return result
+
+@functools.lru_cache(maxsize=None)
+def make_table(width: int, poly: int, reflect_in: bool) -> tuple:
+    """바이트 단위 처리를 위한 256 엔트리 룩업 테이블을 만듭니다."""
+    if width < 8:
+        raise ValueError(f"width must be >= 8 (got {width})")
+    mask = (1 << width) - 1
+    table = []
+    if reflect_in:
+        rpoly = reflect(poly & mask, width)
+        for i in range(256):
+            crc = i
+            for _ in range(8):
+                crc = (crc >> 1) ^ rpoly if crc & 1 else crc >> 1
+            table.append(crc)
+    else:
+        top = 1 << (width - 1)
+        for i in range(256):
+            crc = i << (width - 8)
+            for _ in range(8):
+                crc = ((crc << 1) ^ poly) if crc & top else (crc << 1)
+                crc &= mask
+            table.append(crc)
+    return tuple(table)
+
+class CrcEngine:
+    def __init__(self, width: int, poly: int, init: int = 0, xor_out: int = 0,
+                 reflect_in: bool = False, reflect_out: bool = None):
+        if reflect_out is None:
+            reflect_out = reflect_in
+        self.width = width
+        self.mask = (1 << width) - 1
+        self.poly = poly & self.mask
+        self.init = init & self.mask
+        self.xor_out = xor_out & self.mask
+        self.reflect_in = bool(reflect_in)
+        self.reflect_out = bool(reflect_out)
+        self.table = make_table(width, self.poly, self.reflect_in)
+        # 레지스터는 입력 방향 기준으로 보관하므로 초기값도 같은 방향으로 맞춥니다.
+        self._reg_init = reflect(self.init, width) if self.reflect_in else self.init
+        # 입력 방향과 출력 방향이 다를 때만 최종 반전이 필요합니다.
+        self._flip_out = self.reflect_in != self.reflect_out
+        self._np_table = None
+
+    @classmethod
+    def from_crcmod(cls, poly: int, init_crc: int = ~0, rev: bool = True, xor_out: int = 0):
+        """crcmod.mkCrcFun 과 같은 인자로 동일한 결과를 내는 엔진을 만듭니다.
+
+        crcmod 의 initCrc 는 '레지스터 초기값 ^ xorOut' 이므로 여기서 되돌려 줍니다.
+        rev=True 이면 crcmod 의 레지스터는 이미 반사된 방향이므로, 생성자가 다시 반사하는 것을 상쇄하도록
+        정규 방향 값으로 바꿔 넘깁니다.
+        """
+        width = poly.bit_length() - 1
+        mask = (1 << width) - 1
+        init = (init_crc ^ xor_out) & mask
+        if rev:
+            init = reflect(init, width)
+        return cls(width, poly & mask, init, xor_out, rev, rev)
+
+    def __call__(self, data) -> int:
+        return self.compute(data)
+
+    def __repr__(self):
+        return (f"CrcEngine(width={self.width}, poly=0x{self.poly:X}, init=0x{self.init:X}, "
+                f"xor_out=0x{self.xor_out:X}, reflect_in={self.reflect_in}, reflect_out={self.reflect_out})")
+
+    def _finish(self, reg: int) -> int:
+        if self._flip_out:
+            reg = reflect(reg, self.width)
+        return reg ^ self.xor_out
+
+    def compute(self, data) -> int:
+        """bytes / bytearray / int 시퀀스의 CRC 를 계산합니다."""
+        table = self.table
+        reg = self._reg_init
+        if self.reflect_in:
+            for byte in data:
+                reg = table[(reg ^ byte) & 0xFF] ^ (reg >> 8)
+        elif self.width == 8:
+            for byte in data:
+                reg = table[reg ^ byte]
+        else:
+            shift = self.width - 8
+            mask = self.mask
+            for byte in data:
+                reg = table[((reg >> shift) ^ byte) & 0xFF] ^ ((reg << 8) & mask)
+        return self._finish(reg)
+
+    def compute_batch(self, payloads):
+        """같은 길이의 페이로드 N 개에 대한 CRC 를 한 번에 계산합니다.
+
+        payloads 는 (N, L) 모양의 uint8 배열이나 같은 길이의 bytes 리스트입니다.
+        바이트 열(L) 방향으로만 반복하고 N 방향은 NumPy 로 벡터화하므로
+        수백만 개의 페이로드도 L 번의 배열 연산으로 끝납니다.
+        """
+        if np is None:
+            raise RuntimeError("numpy is not installed. compute_batch is unavailable.")
+        arr = as_payload_array(payloads)
+        if self._np_table is None:
+            self._np_table = np.array(self.table, dtype=np.uint64)
+        table = self._np_table
+        reg = np.full(arr.shape[0], self._reg_init, dtype=np.uint64)
+        mask = np.uint64(self.mask)
+        eight = np.uint64(8)
+        shift = np.uint64(self.width - 8)
+        for col in range(arr.shape[1]):
+            byte = arr[:, col].astype(np.uint64)
+            if self.reflect_in:
+                reg = table[(reg ^ byte) & np.uint64(0xFF)] ^ (reg >> eight)
+            else:
+                reg = table[((reg >> shift) ^ byte) & np.uint64(0xFF)] ^ ((reg << eight) & mask)
+        if self._flip_out:
+            reg = reflect_array(reg, self.width)
+        reg ^= np.uint64(self.xor_out)
+        return reg.astype(_result_dtype(self.width))
+
+@functools.lru_cache(maxsize=4096)
+def get_engine(width: int, poly: int, init: int = 0, xor_out: int = 0,
+               reflect_in: bool = False, reflect_out: bool = None) -> CrcEngine:
+    """같은 파라미터의 엔진을 재사용하기 위한 캐시된 생성 함수입니다."""
+    return CrcEngine(width, poly, init, xor_out, reflect_in, reflect_out)
+
+def as_payload_array(payloads):
+    """bytes 리스트 또는 2차원 배열을 (N, L) uint8 배열로 변환합니다."""
+    if isinstance(payloads, np.ndarray):
+        arr = payloads
+        if arr.ndim == 1:
+            arr = arr.reshape(1, -1)
+        return arr.astype(np.uint8, copy=False)
+    payloads = [bytes(p) for p in payloads]
+    if not payloads:
+        return np.zeros((0, 0), dtype=np.uint8)
+    length = len(payloads[0])
+    if any(len(p) != length for p in payloads):
+        raise ValueError("compute_batch requires payloads of equal length")
+    return np.frombuffer(b"".join(payloads), dtype=np.uint8).reshape(len(payloads), length)
+
+def reflect_array(reg, width: int):
+    """uint64 배열의 각 원소에 대해 reflect() 를 적용합니다."""
+    result = np.zeros_like(reg)
+    one = np.uint64(1)
+    for _ in range(width):
+        result = (result << one) | (reg & one)
+        reg = reg >> one
+    return result
+
+def _result_dtype(width: int):
+    if width <= 8:
+        return np.uint8
+    if width <= 16:
+        return np.uint16
+    if width <= 32:
+        return np.uint32
+    return np.uint64
+
+def main():
+    """from_crcmod 결과를 crcmod.mkCrcFun 과 비교합니다. (대칭이 아닌 init 값 포함, crcmod 필요)"""
+    import os
+    import sys
+    try:
+        import crcmod
+    except ImportError:
+        print("❌ crcmod 가 설치되어 있지 않습니다 (pip install crcmod)")
+        sys.exit(1)
+    cases = [(0x11D, 0xFF, True, 0xFF), (0x11D, 0x34, True, 0x00), (0x11D, 0x34, False, 0x5A),
+             (0x107, 0x01, True, 0x55), (0x11021, 0x1234, True, 0x0000), (0x11021, 0x1234, False, 0xFFFF),
+             (0x104C11DB7, 0x12345678, True, 0xFFFFFFFF), (0x104C11DB7, 0x12345678, False, 0x0)]
+    payloads = [b'', b'\x00', b'123456789', os.urandom(64)]
+    failures = 0
+    for poly, init_crc, rev, xor_out in cases:
+        expected = crcmod.mkCrcFun(poly, initCrc=init_crc, rev=rev, xorOut=xor_out)
+        engine = CrcEngine.from_crcmod(poly, init_crc, rev, xor_out)
+        for data in payloads:
+            if engine(data) != expected(data):
+                failures += 1
+                print(f"❌ poly=0x{poly:X} init=0x{init_crc:X} rev={rev} xor=0x{xor_out:X} data={data.hex()}: "
+                      f"crcmod=0x{expected(data):X} engine=0x{engine(data):X}")
+    if failures:
+        sys.exit(1)
+    print(f"✅ crcmod 와 일치: {len(cases)}개 파라미터 x {len(payloads)}개 페이로드")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+from typing import NamedTuple, Optional
+
+from crcengine import get_engine, reflect
+from findcrc import InputVariant, normalize_samples, split_crc_field, samples
+
+# =========================== GF(2) 다항식 연산 ===========================
+# 다항식은 파이썬 정수로 표현합니다. (bit i == x^i 의 계수)
+
+def pdeg(a: int) -> int:
+    return a.bit_length() - 1
+
+def pmod(a: int, m: int) -> int:
+    dm = pdeg(m)
+    while a and pdeg(a) >= dm:
+        a ^= m << (pdeg(a) - dm)
+    return a
+
+def pdivmod(a: int, m: int):
+    q = 0
+    dm = pdeg(m)
+    while a and pdeg(a) >= dm:
+        shift = pdeg(a) - dm
+        q |= 1 << shift
+        a ^= m << shift
+    return q, a
+
+def pgcd(a: int, b: int) -> int:
+    while b:
+        a, b = b, pmod(a, b)
+    return a
+
+def pmulmod(a: int, b: int, m: int) -> int:
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        b >>= 1
+        a = pmod(a << 1, m)
+    return pmod(result, m)
+
+# =========================== GF(2) 선형 방정식 ===========================
+def solve_gf2(rows, n_vars: int):
+    """rows: (계수 비트마스크, 우변 비트) 목록. (해 하나, 자유 변수 수) 또는 (None, 0) 을 돌려줍니다."""
+    pivots = {}  # pivot bit -> (coeffs, rhs)
+    for coeffs, rhs in rows:
+        for bit, (p_coeffs, p_rhs) in pivots.items():
+            if coeffs >> bit & 1:
+                coeffs ^= p_coeffs
+                rhs ^= p_rhs
+        if coeffs == 0:
+            if rhs:
+                return None, 0  # 모순 (0 == 1)
+            continue
+        bit = pdeg(coeffs)
+        # 기존 pivot 행에서 새 pivot 비트를 제거해 기약 행 사다리꼴을 유지합니다.
+        for other, (o_coeffs, o_rhs) in list(pivots.items()):
+            if o_coeffs >> bit & 1:
+                pivots[other] = (o_coeffs ^ coeffs, o_rhs ^ rhs)
+        pivots[bit] = (coeffs, rhs)
+    # 자유 변수는 0 으로 두고 pivot 변수를 결정합니다.
+    solution = 0
+    for bit, (_, rhs) in pivots.items():
+        if rhs:
+            solution |= 1 << bit
+    return solution, n_vars - len(pivots)
+
+# =========================== CRC 솔버 ===========================
+class CrcSolution(NamedTuple):
+    width: int
+    poly: int
+    reflect_in: bool
+    reflect_out: bool
+    init: int
+    xor_out: int
+    free_bits: int      # Init/XorOut 중 샘플로 결정되지 않은 비트 수 (0 이면 유일)
+
+class SolveReport(NamedTuple):
+    width: int
+    reflect_in: bool
+    reflect_out: bool
+    gcd_degree: int                 # 모든 차이 다항식의 GCD 차수 (-1: 정보 없음)
+    solutions: list
+    extra_samples_needed: int       # 다항식을 유일하게 정하기 위해 더 필요한 샘플 수 (추정)
+    note: str
+
+def _normalized(frames, width, reflect_in, reflect_out, crc_pos, byteorder, variant):
+    """반사(reflect) CRC 를 일반(MSB-first) CRC 문제로 바꿔 (입력, 목표) 목록을 만듭니다."""
+    result = []
+    for can_id, data in frames:
+        target, payload = split_crc_field(data, crc_pos, width, byteorder)
+        message = variant.build(can_id, payload) if variant else payload
+        if reflect_in:
+            message = bytes(reflect(b, 8) for b in message)
+        if reflect_out:
+            target = reflect(target, width)
+        result.append((message, target))
+    return result
+
+def _diff_poly(a: bytes, b: bytes, width: int, crc_a: int, crc_b: int) -> int:
+    """P(x) 가 반드시 나누어야 하는 다항식 D(x)*x^w + c(x) 를 만듭니다."""
+    diff = int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')
+    return (diff << width) ^ crc_a ^ crc_b
+
+def _candidate_polys(g: int, width: int, max_ambiguity_bits: int):
+    """g 의 약수 중 차수가 정확히 width 인 다항식을 모두 찾습니다."""
+    extra = pdeg(g) - width
+    if extra < 0:
+        return []
+    if extra == 0:
+        return [g]
+    if extra > max_ambiguity_bits:
+        return None
+    found = []
+    for q in range(1 << extra, 1 << (extra + 1)):
+        p, rem = pdivmod(g, q)
+        if rem == 0 and pdeg(p) == width:
+            found.append(p)
+    return found
+
+def _solve_offsets(poly_full: int, width: int, groups):
+    """길이별 오프셋 offset_L = Init*x^(8L) mod P ^ XorOut 를 풀어 (Init, XorOut, 자유 비트) 를 구합니다."""
+    rows = []
+    for length, offset in groups.items():
+        shift = pmod(1 << (8 * length), poly_full)
+        # 변수 배치: bit 0..w-1 = Init, bit w..2w-1 = XorOut
+        columns = [pmulmod(1 << i, shift, poly_full) for i in range(width)]
+        for bit in range(width):
+            coeffs = 1 << (width + bit)
+            for i, col in enumerate(columns):
+                if col >> bit & 1:
+                    coeffs |= 1 << i
+            rows.append((coeffs, offset >> bit & 1))
+    solution, free_bits = solve_gf2(rows, 2 * width)
+    if solution is None:
+        return None
+    mask = (1 << width) - 1
+    init, xor_out = solution & mask, solution >> width
+    if free_bits:
+        # 해가 여러 개면 흔히 쓰는 Init (0, 전부 1) 으로 설명되는 해를 우선합니다.
+        for init_try in (0, mask):
+            xors = {offset ^ pmulmod(init_try, pmod(1 << (8 * length), poly_full), poly_full)
+                    for length, offset in groups.items()}
+            if len(xors) == 1:
+                init, xor_out = init_try, xors.pop()
+                break
+    return init, xor_out, free_bits
+
+def solve_crc(raw_samples, width: int, can_id: int = 0, crc_pos: int = 0, byteorder: str = 'big',
+              variant: Optional[InputVariant] = None, max_ambiguity_bits: int = 16):
+    """샘플 차이로 GF(2) 연립식을 세워 다항식과 Init/XorOut 을 직접 구합니다.
+
+    다항식 공간을 전수 탐색하지 않으므로 CRC-32 까지 바로 풀립니다.
+    RefIn/RefOut 4 가지 조합 각각에 대한 SolveReport 목록을 돌려줍니다.
+    """
+    frames = normalize_samples(raw_samples, can_id)
+    reports = []
+    for reflect_in in (False, True):
+        for reflect_out in (False, True):
+            reports.append(_solve_one(frames, width, reflect_in, reflect_out, crc_pos, byteorder,
+                                      variant, max_ambiguity_bits))
+    return reports
+
+def _solve_one(frames, width, reflect_in, reflect_out, crc_pos, byteorder, variant, max_ambiguity_bits):
+    items = _normalized(frames, width, reflect_in, reflect_out, crc_pos, byteorder, variant)
+    by_length = {}
+    for message, target in items:
+        by_length.setdefault(len(message), []).append((message, target))
+
+    # 같은 길이끼리의 차이만 Init/XorOut 이 상쇄됩니다.
+    g = 0
+    pairs = 0
+    for group in by_length.values():
+        base_msg, base_crc = group[0]
+        for message, target in group[1:]:
+            if message == base_msg:
+                continue
+            g = pgcd(g, _diff_poly(base_msg, message, width, base_crc, target))
+            pairs += 1
+
+    def report(degree, solutions, needed, note):
+        return SolveReport(width, reflect_in, reflect_out, degree, solutions, needed, note)
+
+    if pairs == 0:
+        distinct = max(len({message for message, _ in group}) for group in by_length.values())
+        return report(-1, [], 2 - distinct,
+                      "need at least two distinct samples of the same length")
+    degree = pdeg(g)
+    polys = _candidate_polys(g, width, max_ambiguity_bits)
+    if polys is None:
+        # 남은 모호성(deg G - w 비트)을 샘플 하나가 대략 w 비트씩 줄여 줍니다.
+        needed = max(1, -(-(degree - width) // width))
+        return report(degree, [], needed,
+                      f"underdetermined: gcd degree {degree} > {width}, add about {needed} more distinct sample(s)")
+    if not polys:
+        return report(degree, [], 0, f"inconsistent: no CRC-{width} with this reflection fits the samples")
+
+    mask = (1 << width) - 1
+    solutions = []
+    for poly_full in polys:
+        poly = poly_full & mask
+        engine = get_engine(width, poly, 0, 0, False, False)
+        groups = {}
+        consistent = True
+        for length, group in by_length.items():
+            offsets = {target ^ engine.compute(message) for message, target in group}
+            if len(offsets) != 1:
+                consistent = False
+                break
+            groups[length] = offsets.pop()
+        if not consistent:
+            continue
+        solved = _solve_offsets(poly_full, width, groups)
+        if solved is None:
+            continue
+        init, xor_out, free_bits = solved
+        # 정규화 과정에서 반사했던 XorOut 을 원래 방향으로 되돌립니다.
+        if reflect_out:
+            xor_out = reflect(xor_out, width)
+        solutions.append(CrcSolution(width, poly, reflect_in, reflect_out, init, xor_out, free_bits))
+
+    if not solutions:
+        return report(degree, [], 0, f"inconsistent: no CRC-{width} with this reflection fits the samples")
+    needed = 0 if len(solutions) == 1 else max(1, -(-(degree - width) // width))
+    notes = []
+    if len(solutions) > 1:
+        notes.append(f"{len(solutions)} polynomials fit, add about {needed} more distinct sample(s)")
+    if any(s.free_bits for s in solutions):
+        free = max(s.free_bits for s in solutions)
+        notes.append(f"Init/XorOut not fully determined ({free} free bits, add a sample with a different "
+                     f"length); the solution shown is one of the equivalent ones")
+    return report(degree, solutions, needed, "; ".join(notes) or "unique solution")
+
+def main():
+    # ============================ 사용자 설정 ============================
+    CAN_ID = 0x413
+    WIDTHS = (8, 16, 32)
+    CRC_POS = 0
+    LOG_FILE = None       # 예: "bench.log" / "drive.asc" (None 이면 findcrc.samples 사용)
+    # =================================================================
+
+    print(f"Solving CRC parameters for CAN ID 0x{CAN_ID:X} (GF(2) solver)...")
+    print("-" * 60)
+    frames = [(CAN_ID, bytes(sample)) for sample in samples]
+    if LOG_FILE:
+        from canlog import collect_payloads
+        # 길이가 다른 샘플도 Init/XorOut 분리에 도움이 되므로 모두 사용합니다.
+        frames = [(CAN_ID, data) for data in collect_payloads(LOG_FILE, ids=(CAN_ID,), max_per_id=256).get(CAN_ID, [])]
+        print(f"{LOG_FILE}: {len(frames)} distinct payloads for 0x{CAN_ID:X}")
+    for width in WIDTHS:
+        if not frames or CRC_POS + width // 8 > min(len(data) for _, data in frames):
+            continue
+        for rep in solve_crc(frames, width, CAN_ID, CRC_POS):
+            print(f"CRC-{width} RefIn={rep.reflect_in} RefOut={rep.reflect_out}: {rep.note}")
+            for s in rep.solutions:
+                digits = width // 4
+                print(f"  Poly=0x{s.poly:0{digits}X} Init=0x{s.init:0{digits}X} XorOut=0x{s.xor_out:0{digits}X}"
+                      f" (free bits: {s.free_bits})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import threading
+import time
+from typing import Callable, Dict
+
+import can
+
+from canframe import CompiledFrame
+from scheduler import PeriodicScheduler
+
+# 드라이버/커널이 한 번에 돌려 줄 수 있는 최대 시퀀스 길이 (SocketCAN BCM 기준)
+MAX_OFFLOAD_FRAMES = 256
+
+def supports_offload(bus) -> bool:
+    """인터페이스가 자체 주기 전송(SocketCAN BCM, IXXAT 등)을 구현했는지 확인합니다.
+
+    BusABC 기본 구현은 python-can 내부 스레드로 보내는 것이라 오프로드로 치지 않습니다.
+    """
+    return type(bus)._send_periodic_internal is not can.BusABC._send_periodic_internal
+
+class CyclicTask:
+    def __init__(self, name: str, frame: CompiledFrame, period: float, modifier=None,
+                 on_change: bool = False, min_gap: float = 0.0):
+        self.name = name
+        self.frame = frame
+        self.period = period
+        self.modifier = modifier
+        self.on_change = on_change
+        self.min_gap = min_gap  # 같은 메시지 프레임 사이 최소 간격(초)
+        self.last_sent = -float('inf')
+        self.mode = None        # 'offload' / 'scheduler'
+        self.handle = None      # can.CyclicSendTaskABC 또는 PeriodicTask
+
+# =========================== 주기 전송 관리자 ===========================
+class CyclicManager:
+    """cyclic 메시지를 드라이버 주기 전송에 맡기고, 지원하지 않으면 PeriodicScheduler 로 보냅니다.
+
+    - 오프로드: Alive Counter 한 바퀴 분량의 프레임(CRC 포함)을 미리 만들어 send_periodic 에 시퀀스로 넘기므로
+      주기마다 파이썬 코드가 돌지 않습니다. 신호가 바뀌면 modify_data 로 시퀀스만 교체합니다.
+    - 스케줄러: 주기마다 modifier(frame) 을 호출한 뒤 전송하고 카운터를 진행합니다. (CRC 는 build 때 갱신)
+    주기마다 값이 달라지는 modifier 가 있는 메시지는 시퀀스로 표현할 수 없으므로 항상 스케줄러로 보냅니다.
+    on_change=True 인 메시지(cyclic + on-change)도 스케줄러로 보내며, trigger() 로 즉시 한 프레임을 보내고
+    주기 위상을 그 시각에 다시 맞춥니다. (드라이버 시퀀스는 지금 몇 번째 카운터인지 알 수 없으므로)
+    """
+    def __init__(self, bus, offload: bool = None, on_error: Callable[[str, Exception], None] = None,
+                 send: Callable[[can.Message], None] = None):
+        self.bus = bus
+        # 스케줄러 경로의 전송 함수 (TxWorker 를 쓰면 lambda m: tx.submit(m, copy=True))
+        self.send = send or bus.send
+        self.offload = supports_offload(bus) if offload is None else offload
+        self.on_error = on_error
+        self.scheduler = None
+        self._tasks: Dict[str, CyclicTask] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, frame: CompiledFrame, period: float,
+            modifier: Callable[[CompiledFrame], None] = None, on_change: bool = False,
+            min_gap: float = 0.0) -> CyclicTask:
+        """frame 을 period 초마다 전송합니다. 돌려준 작업의 mode 로 실제 전송 방식을 알 수 있습니다."""
+        self.remove(name)
+        task = CyclicTask(name, frame, period, modifier, on_change, min_gap)
+        messages = None
+        if self.offload and modifier is None and not on_change:
+            with self._lock:
+                messages = frame.cycle_messages()
+        if messages is not None and len(messages) <= MAX_OFFLOAD_FRAMES:
+            task.mode = 'offload'
+            task.handle = self.bus.send_periodic(messages, period, store_task=False)
+        else:
+            task.mode = 'scheduler'
+            if self.scheduler is None or not self.scheduler.is_running:
+                self.scheduler = PeriodicScheduler(on_error=self.on_error)
+            task.handle = self.scheduler.add(name, period, lambda: self._tick(task))
+            self.scheduler.start()
+        self._tasks[name] = task
+        return task
+
+    def _tick(self, task: CyclicTask):
+        with self._lock:
+            if time.perf_counter() - task.last_sent < task.min_gap:
+                return      # 방금 trigger 로 보냈고 위상은 이미 다시 맞춰져 있습니다.
+            self._send_now(task)
+
+    def _send_now(self, task: CyclicTask):
+        if task.modifier is not None:
+            task.modifier(task.frame)
+        self.send(task.frame.build())
+        task.last_sent = time.perf_counter()
+        if task.frame.has_counter:
+            task.frame.advance_counter()
+
+    def trigger(self, name: str, signal_values: dict = None) -> float:
+        """신호를 바꾸고 다음 주기를 기다리지 않고 바로 한 프레임을 보냅니다. (카운터/CRC 는 이어서 진행)
+
+        다음 주기 전송은 이 시각부터 period 뒤로 다시 맞춥니다. 직전 전송 후 min_gap 이 지나지 않았으면
+        그 시각까지 미뤄서 보냅니다. 실제 전송까지 남은 시간(초)을 돌려줍니다.
+        """
+        task = self._tasks[name]
+        if task.mode == 'offload':
+            self.update(name, signal_values or {})
+            return task.period
+        with self._lock:
+            if signal_values:
+                task.frame.update(signal_values)
+            wait = task.last_sent + task.min_gap - time.perf_counter()
+            if wait > 0:
+                self.scheduler.reschedule(name, wait)
+                return wait
+            self._send_now(task)
+            self.scheduler.reschedule(name, task.period)
+        return 0.0
+
+    def update(self, name: str, signal_values: dict):
+        """주기 전송 중인 메시지의 신호 값을 바꿉니다. 카운터 연속성과 전송 타이밍은 그대로 유지됩니다."""
+        task = self._tasks[name]
+        with self._lock:
+            task.frame.update(signal_values)
+            if task.mode == 'offload':
+                task.handle.modify_data(task.frame.cycle_messages())
+
+    def remove(self, name: str):
+        task = self._tasks.pop(name, None)
+        if task is None:
+            return
+        if task.mode == 'offload':
+            task.handle.stop()
+        else:
+            self.scheduler.remove(name)
+
+    def stats(self) -> dict:
+        """스케줄러로 보내는 작업의 지터 통계 (오프로드 작업은 드라이버가 타이밍을 책임집니다)"""
+        return self.scheduler.stats() if self.scheduler is not None else {}
+
+    def modes(self) -> Dict[str, str]:
+        return {name: task.mode for name, task in self._tasks.items()}
+
+    def stop(self):
+        """모든 주기 전송을 멈춥니다. 스케줄러 지터 통계는 stats() 로 계속 볼 수 있습니다."""
+        if self.scheduler is not None:
+            self.scheduler.stop()
+        for task in self._tasks.values():
+            if task.mode == 'offload':
+                task.handle.stop()
+        self._tasks.clear()
@@ -0,0 +1,189 @@
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import threading
+from typing import Dict, Optional
+
+import cantools
+
+# 캐시 파일 형식: MAGIC + 헤더 길이(u64) + pickle(헤더) + 메시지별 pickle 블록
+#   헤더 = {'messages': [(이름, frame_id, 오프셋, 길이), ...], 'shell': 메시지를 뺀 Database pickle}
+# 키(파일 이름)에 DBC 내용 해시와 cantools 버전이 들어가므로 둘 중 하나라도 바뀌면 자동으로 다시 파싱합니다.
+MAGIC = b'DBCC\x01'
+CACHE_DIRNAME = '__dbccache__'
+_HEADER = struct.Struct('<Q')
+
+_loaded: Dict[str, object] = {}     # 같은 프로세스에서 재연결할 때는 파일도 다시 읽지 않습니다.
+_lock = threading.Lock()
+
+def cache_key(content: bytes) -> str:
+    h = hashlib.blake2b(content, digest_size=16)
+    h.update(cantools.__version__.encode())
+    h.update(str(pickle.HIGHEST_PROTOCOL).encode())
+    return h.hexdigest()
+
+def write_cache(db, path: str):
+    """파싱된 Database 를 메시지 단위로 나눠 캐시 파일에 씁니다. (임시 파일 -> rename 으로 원자적 교체)"""
+    blobs = [pickle.dumps(m, pickle.HIGHEST_PROTOCOL) for m in db.messages]
+    messages = db._messages
+    db._messages = []           # 노드/버전/속성 정의만 담긴 껍데기를 따로 저장합니다.
+    try:
+        shell = pickle.dumps(db, pickle.HIGHEST_PROTOCOL)
+    finally:
+        db._messages = messages
+    index, offset = [], 0
+    for message, blob in zip(messages, blobs):
+        index.append((message.name, message.frame_id, offset, len(blob)))
+        offset += len(blob)
+    header = pickle.dumps({'messages': index, 'shell': shell}, pickle.HIGHEST_PROTOCOL)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC + _HEADER.pack(len(header)) + header)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp, path)
+
+# =========================== 지연 로딩 DB ===========================
+class LazyDatabase:
+    """캐시 파일을 mmap 으로 열어 두고, 요청된 메시지만 그때 역직렬화합니다.
+
+    get_message_by_name / get_message_by_frame_id 는 해당 메시지 하나만 읽고, messages 나
+    그 밖의 cantools Database 속성에 접근하면 그때 전체를 읽어 실제 Database 를 만듭니다.
+    모든 메시지를 읽고 나면 mmap 을 스스로 닫습니다. (Windows 에서 다른 프로세스가 캐시 파일을 지울 수 있도록)
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path}: DBC 캐시 파일 형식이 아닙니다")
+        start = len(MAGIC) + _HEADER.size
+        (length,) = _HEADER.unpack_from(self._mm, len(MAGIC))
+        header = pickle.loads(self._mm[start:start + length])
+        self._base = start + length
+        self._shell = header['shell']
+        self._index = header['messages']
+        self._by_name = {name: i for i, (name, _, _, _) in enumerate(self._index)}
+        self._by_id = {frame_id: i for i, (_, frame_id, _, _) in enumerate(self._index)}
+        self._cache: Dict[int, object] = {}
+        self._database = None
+        self._lock = threading.Lock()
+
+    def _load(self, i: int):
+        message = self._cache.get(i)
+        if message is None:
+            with self._lock:
+                message = self._cache.get(i)
+                if message is None:
+                    if self._mm is None:
+                        raise ValueError(f"{self.path}: 닫힌 DBC 캐시에서 메시지를 읽을 수 없습니다")
+                    _, _, offset, length = self._index[i]
+                    start = self._base + offset
+                    message = self._cache[i] = pickle.loads(self._mm[start:start + length])
+                    if len(self._cache) == len(self._index):
+                        self._unmap()
+        return message
+
+    def _unmap(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def close(self):
+        """캐시 파일 mmap 을 닫습니다. 이미 읽은 메시지는 계속 쓸 수 있습니다."""
+        with self._lock:
+            self._unmap()
+
+    @property
+    def message_names(self) -> list:
+        return [name for name, _, _, _ in self._index]
+
+    def get_message_by_name(self, name: str):
+        return self._load(self._by_name[name])
+
+    def get_message_by_frame_id(self, frame_id: int):
+        return self._load(self._by_id[frame_id])
+
+    def decode_message(self, frame_id_or_name, data, **kwargs):
+        if isinstance(frame_id_or_name, str):
+            return self.get_message_by_name(frame_id_or_name).decode(data, **kwargs)
+        return self.get_message_by_frame_id(frame_id_or_name).decode(data, **kwargs)
+
+    def encode_message(self, frame_id_or_name, data, **kwargs):
+        if isinstance(frame_id_or_name, str):
+            return self.get_message_by_name(frame_id_or_name).encode(data, **kwargs)
+        return self.get_message_by_frame_id(frame_id_or_name).encode(data, **kwargs)
+
+    @property
+    def database(self):
+        """전체 메시지를 읽어 만든 cantools Database (처음 접근할 때 한 번만 만듭니다)"""
+        if self._database is None:
+            db = pickle.loads(self._shell)
+            db._messages = [self._load(i) for i in range(len(self._index))]
+            db.refresh()
+            self._database = db
+        return self._database
+
+    @property
+    def messages(self) -> list:
+        return self.database.messages
+
+    def __getattr__(self, name):
+        return getattr(self.database, name)
+
+    def __repr__(self):
+        return f"LazyDatabase({self.path!r}, {len(self._cache)}/{len(self._index)} messages loaded)"
+
+# =========================== 캐시 로더 ===========================
+def _load_cached(content: bytes, cache_dir: str, label: str, parse):
+    key = cache_key(content)
+    with _lock:
+        db = _loaded.get(key)
+        if db is not None:
+            return db
+        path = os.path.join(cache_dir, f"{label}.{key}.dbcc")
+        if os.path.exists(path):
+            try:
+                db = _loaded[key] = LazyDatabase(path)
+                return db
+            except (ValueError, pickle.UnpicklingError, EOFError, struct.error) as e:
+                print(f"⚠️ DBC 캐시가 손상되어 다시 파싱합니다 ({path}): {e}")
+        parsed = _loaded[key] = parse()
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            write_cache(parsed, path)
+        except OSError as e:
+            print(f"⚠️ DBC 캐시를 저장하지 못했습니다 ({cache_dir}): {e}")
+            return parsed
+        # 같은 DBC 의 예전 캐시는 지웁니다. 다른 프로세스가 아직 매핑하고 있으면(Windows) 지우지 못하므로
+        # 파일마다 따로 시도하고, 남은 파일은 다음 번에 다시 지웁니다.
+        prefix, old_len = f"{label}.", len(label) + len(key) + len('..dbcc')
+        for name in os.listdir(cache_dir):
+            if (name.startswith(prefix) and name.endswith('.dbcc') and len(name) == old_len
+                    and name != os.path.basename(path)):
+                try:
+                    os.remove(os.path.join(cache_dir, name))
+                except OSError:
+                    pass
+        return parsed
+
+def load_file(path: str, cache_dir: Optional[str] = None):
+    """cantools.database.load_file 대신 쓰는 캐시 로더. 캐시가 있으면 LazyDatabase 를, 없으면 파싱한 Database 를 돌려줍니다.
+
+    cache_dir 를 생략하면 DBC 파일 옆의 __dbccache__ 폴더를 씁니다.
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRNAME)
+    label = os.path.splitext(os.path.basename(path))[0]
+    return _load_cached(content, cache_dir, label, lambda: cantools.database.load_file(path))
+
+def load_string(text: str, cache_dir: Optional[str] = None, label: str = 'inline'):
+    """cantools.database.load_string(DBC 문자열) 대신 쓰는 캐시 로더. cache_dir 생략 시 현재 폴더의 __dbccache__"""
+    if cache_dir is None:
+        cache_dir = os.path.join(os.getcwd(), CACHE_DIRNAME)
+    return _load_cached(text.encode('utf-8'), cache_dir, label, lambda: cantools.database.load_string(text))
@@ -0,0 +1,154 @@
+import math
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from fieldscan import collect_frames, bit_matrix, flip_rates, find_counters, find_checksums
+
+# =========================== 추정 결과 ===========================
+class InferredSignal(NamedTuple):
+    name: str
+    start: int              # DBC 시작 비트 (little endian: LSB, big endian: MSB)
+    length: int
+    byte_order: str         # 'little_endian' / 'big_endian'
+    minimum: int
+    maximum: int
+    choices: dict           # 값이 몇 개뿐인 신호의 후보 값 테이블 {raw: 설명}
+    kind: str = 'data'      # 'data' / 'counter' / 'checksum'
+
+class InferredMessage(NamedTuple):
+    frame_id: int
+    name: str
+    length: int
+    frames: int
+    signals: list
+
+# =========================== 비트 순서 ===========================
+def intel_sequence(length: int):
+    """LSB -> MSB 방향으로 little endian 신호가 놓이는 비트 순서"""
+    return list(range(length * 8))
+
+def motorola_sequence(length: int):
+    """MSB -> LSB 방향으로 big endian 신호가 놓이는 비트 순서 (DBC sawtooth 번호)"""
+    return [byte * 8 + bit for byte in range(length) for bit in range(7, -1, -1)]
+
+def _magnitude(rate: float) -> int:
+    return math.floor(math.log10(rate)) if rate > 0 else -99
+
+def segment(rates: np.ndarray, sequence, reserved, increasing: bool):
+    """비트 변화율 크기(10 의 지수)가 신호 내부에서 단조라는 성질로 경계를 찾습니다.
+
+    little endian 순서(LSB -> MSB)에서는 변화율이 줄어들어야 하고,
+    big endian 순서(MSB -> LSB)에서는 늘어나야 합니다. 그 반대 방향으로
+    크기가 바뀌거나 상수/예약 비트를 만나면 새 신호를 시작합니다.
+    """
+    segments = []
+    current = []
+    previous = None
+    for pos in sequence:
+        if pos in reserved or rates[pos] == 0:
+            if current:
+                segments.append(current)
+            current, previous = [], None
+            continue
+        mag = _magnitude(rates[pos])
+        if previous is not None and ((mag < previous) if increasing else (mag > previous)):
+            segments.append(current)
+            current = []
+        current.append(pos)
+        previous = mag
+    if current:
+        segments.append(current)
+    return segments
+
+def sequence_values(bits: np.ndarray, positions, msb_first: bool) -> np.ndarray:
+    cols = bits[:, positions].astype(np.int64)
+    length = len(positions)
+    shifts = np.arange(length - 1, -1, -1) if msb_first else np.arange(length)
+    return cols @ (1 << shifts)
+
+# =========================== 메시지 단위 추정 ===========================
+def infer_message(frame_id: int, payloads: np.ndarray, max_choices: int = 16) -> InferredMessage:
+    n, length = payloads.shape
+    bits = bit_matrix(payloads)
+    rates = flip_rates(bits)
+    counters = find_counters(bits, rates)
+    checksums = find_checksums(payloads, counters)
+
+    name = f"ID_{frame_id:03X}"
+    signals = []
+    reserved = set()
+    for i, c in enumerate(counters):
+        reserved.update(range(c.start_bit, c.start_bit + c.length))
+        signals.append(InferredSignal(f"{name}_AlvCnt{i}", c.start_bit, c.length, 'little_endian',
+                                      0, (1 << c.length) - 1, {}, 'counter'))
+    for i, c in enumerate(checksums):
+        reserved.update(range(c.byte * 8, c.byte * 8 + 8))
+        signals.append(InferredSignal(f"{name}_Crc{i}", c.byte * 8, 8, 'little_endian', 0, 255, {}, 'checksum'))
+
+    # 두 비트 순서로 나눠 보고 더 적은 신호로 설명되는 쪽을 고릅니다. (동률이면 little endian)
+    little = segment(rates, intel_sequence(length), reserved, increasing=False)
+    big = segment(rates, motorola_sequence(length), reserved, increasing=True)
+    use_big = len(big) < len(little)
+    for i, positions in enumerate(big if use_big else little):
+        values = sequence_values(bits, positions, msb_first=use_big)
+        distinct = np.unique(values)
+        choices = {}
+        if len(distinct) <= max_choices and len(positions) <= 8:
+            choices = {int(v): f"Val_{int(v)}" for v in distinct}
+        signals.append(InferredSignal(f"{name}_Sig{i}", positions[0], len(positions),
+                                      'big_endian' if use_big else 'little_endian',
+                                      int(distinct.min()), int(distinct.max()), choices))
+    return InferredMessage(frame_id, name, length, n, signals)
+
+def infer_log(path: str, fmt: Optional[str] = None, ids=None, max_frames: int = 20000, min_frames: int = 10):
+    """로그 전체에서 ID 별 메시지/신호 구조를 추정합니다."""
+    messages = []
+    for frame_id, payloads in sorted(collect_frames(path, fmt, ids, max_frames).items()):
+        if payloads.shape[0] >= min_frames:
+            messages.append(infer_message(frame_id, payloads))
+    return messages
+
+# =========================== DBC 출력 ===========================
+def to_dbc_string(messages, node: str = "Vector__XXX") -> str:
+    lines = ['VERSION ""', '', 'NS_ :', '', 'BS_:', '', f'BU_: {node}', '']
+    for msg in messages:
+        dbc_id = msg.frame_id | 0x80000000 if msg.frame_id > 0x7FF else msg.frame_id
+        lines.append(f"BO_ {dbc_id} {msg.name}: {msg.length} {node}")
+        for sig in msg.signals:
+            order = 1 if sig.byte_order == 'little_endian' else 0
+            lines.append(f' SG_ {sig.name} : {sig.start}|{sig.length}@{order}+ (1,0) '
+                         f'[{sig.minimum}|{sig.maximum}] "" {node}')
+        lines.append('')
+    for msg in messages:
+        dbc_id = msg.frame_id | 0x80000000 if msg.frame_id > 0x7FF else msg.frame_id
+        for sig in msg.signals:
+            if sig.choices:
+                values = ' '.join(f'{raw} "{text}"' for raw, text in sorted(sig.choices.items(), reverse=True))
+                lines.append(f"VAL_ {dbc_id} {sig.name} {values};")
+    return '\n'.join(lines) + '\n'
+
+def write_dbc(messages, out_path: str) -> str:
+    text = to_dbc_string(messages)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return text
+
+def main():
+    # ============================ 사용자 설정 ============================
+    LOG_FILE = "bench.log"
+    OUT_DBC = "inferred.dbc"
+    # =================================================================
+
+    messages = infer_log(LOG_FILE)
+    text = write_dbc(messages, OUT_DBC)
+    print(f"✅ {len(messages)}개 메시지, {sum(len(m.signals) for m in messages)}개 신호를 {OUT_DBC} 에 저장했습니다.")
+    try:
+        import cantools
+        cantools.database.load_string(text)
+        print("✅ cantools 로드 검증 성공")
+    except ImportError:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import re
+
+from crcengine import CrcEngine
+
+# =========================== E2E (CRC + Alive Counter) 헬퍼 ===========================
+# GV80 BCM 메시지의 CRC-8 (crcmod.mkCrcFun(0x11D, initCrc=0xFF, rev=True, xorOut=0xFF) 과 동일)
+GV80_CRC8 = CrcEngine.from_crcmod(0x11D, init_crc=0xFF, rev=True, xor_out=0xFF)
+
+CRC_PATTERN = re.compile(r'Crc\d*Val$')
+COUNTER_PATTERN = re.compile(r'AlvCnt\d*Val$')
+
+def e2e_signals(message):
+    """메시지에서 CRC / Alive Counter 신호 이름을 찾습니다. (BCM_Crc7Val, BCM_AlvCnt7Val 등)"""
+    crc = next((s.name for s in message.signals if CRC_PATTERN.search(s.name)), None)
+    counter = next((s.name for s in message.signals if COUNTER_PATTERN.search(s.name)), None)
+    return crc, counter
+
+def to_raw(signal, value) -> int:
+    """물리 값(또는 VAL_ 이름)을 DBC 신호의 raw 정수 값으로 바꿉니다."""
+    if isinstance(value, str):
+        return int(signal.conversion.choice_to_number(value))
+    if hasattr(value, 'value') and not isinstance(value, (int, float)):
+        return int(value.value)  # cantools NamedSignalValue
+    return int(round((value - signal.offset) / signal.scale))
+
+class _SignalLayout:
+    """신호 raw 값 -> (페이로드 비트, CRC 선형 기여분) 을 8비트 단위 테이블로 미리 계산해 둡니다."""
+    def __init__(self, signal, bit_masks, bit_crcs):
+        self.name = signal.name
+        self.length = signal.length
+        self.value_mask = (1 << signal.length) - 1
+        self.chunks = []
+        for lo in range(0, signal.length, 8):
+            width = min(8, signal.length - lo)
+            place = [0] * (1 << width)
+            crc = [0] * (1 << width)
+            for v in range(1, 1 << width):
+                low = (v & -v).bit_length() - 1   # 가장 낮은 1 비트
+                place[v] = place[v & (v - 1)] ^ bit_masks[lo + low]
+                crc[v] = crc[v & (v - 1)] ^ bit_crcs[lo + low]
+            self.chunks.append((lo, (1 << width) - 1, place, crc))
+
+    def lookup(self, raw: int):
+        raw &= self.value_mask
+        place = 0
+        crc = 0
+        for lo, mask, place_table, crc_table in self.chunks:
+            v = (raw >> lo) & mask
+            place ^= place_table[v]
+            crc ^= crc_table[v]
+        return place, crc
+
+class E2EMessage:
+    """CRC 의 선형성을 이용해 신호가 바뀐 만큼만 CRC 를 갱신하는 DBC 메시지 인코더
+
+    CRC(data) = CRC(0) ^ XOR(신호별 기여분) 이므로 신호별 기여분 테이블을 한 번 만들어 두면
+    encode 없이 O(바뀐 신호 수) 의 테이블 조회로 페이로드와 CRC 를 동시에 갱신할 수 있습니다.
+    CRC 는 CRC 신호를 0 으로 둔 페이로드 전체에 대해 계산합니다. (canframe.CompiledFrame 과 같은 방식)
+    """
+    def __init__(self, message, crc_signal: str, counter_signal: str = None, crc_func=GV80_CRC8):
+        if message.is_multiplexed():
+            raise ValueError(f"{message.name}: multiplexed messages are not supported")
+        self.message = message
+        self.frame_id = message.frame_id
+        self.length = message.length
+        self.crc_signal = crc_signal
+        self.counter_signal = counter_signal
+        self._signals = {s.name: s for s in message.signals}
+
+        zero_raw = {s.name: 0 for s in message.signals}
+        zero = message.encode(zero_raw, scaling=False, strict=False)
+        base_crc = crc_func(zero)
+        self._crc_const = base_crc
+        self._layouts = {}
+        for signal in message.signals:
+            bit_masks = []
+            bit_crcs = []
+            for bit in range(signal.length):
+                raw = 1 << bit
+                if signal.is_signed and bit == signal.length - 1:
+                    raw = -raw
+                data = message.encode(dict(zero_raw, **{signal.name: raw}), scaling=False, strict=False)
+                bit_masks.append(int.from_bytes(data, 'little'))
+                bit_crcs.append(crc_func(data) ^ base_crc)
+            self._layouts[signal.name] = _SignalLayout(signal, bit_masks, bit_crcs)
+
+        self._raw = dict(zero_raw)
+        self._payload = 0          # CRC 신호를 뺀 나머지 신호의 페이로드 비트
+        self._crc_acc = 0          # CRC 선형 기여분 누적값
+
+    # --- 신호 갱신 ---
+    def set_raw(self, name: str, raw: int):
+        old = self._raw[name]
+        if old == raw:
+            return
+        layout = self._layouts[name]
+        self._raw[name] = raw
+        if name == self.crc_signal:
+            return
+        old_place, old_crc = layout.lookup(old)
+        new_place, new_crc = layout.lookup(raw)
+        self._payload ^= old_place ^ new_place
+        self._crc_acc ^= old_crc ^ new_crc
+
+    def set(self, name: str, value):
+        self.set_raw(name, to_raw(self._signals[name], value))
+
+    def update(self, signal_values: dict):
+        for name, value in signal_values.items():
+            if name != self.crc_signal:
+                self.set(name, value)
+
+    def advance_counter(self) -> int:
+        """Alive Counter 를 1 증가시키고 새 값을 돌려줍니다."""
+        layout = self._layouts[self.counter_signal]
+        value = (self._raw[self.counter_signal] + 1) & layout.value_mask
+        self.set_raw(self.counter_signal, value)
+        return value
+
+    @property
+    def counter_modulus(self) -> int:
+        """Alive Counter 가 한 바퀴 도는 데 걸리는 주기 수 (카운터가 없으면 1)"""
+        if not self.counter_signal:
+            return 1
+        return self._layouts[self.counter_signal].value_mask + 1
+
+    # --- 프레임 생성 ---
+    def crc(self) -> int:
+        return self._crc_const ^ self._crc_acc
+
+    def payload(self) -> bytes:
+        """현재 신호 값으로 CRC 까지 채운 페이로드를 돌려줍니다."""
+        crc = self.crc()
+        self._raw[self.crc_signal] = crc
+        crc_place, _ = self._layouts[self.crc_signal].lookup(crc)
+        return (self._payload ^ crc_place).to_bytes(self.length, 'little')
+
+    def next_frame(self) -> bytes:
+        """카운터를 진행시키고 다음 주기 프레임의 페이로드를 돌려줍니다."""
+        if self.counter_signal:
+            self.advance_counter()
+        return self.payload()
+
+    def encode(self, signal_values: dict) -> bytes:
+        """message.encode(...) 와 같은 결과에 CRC 를 채워 돌려줍니다. (바뀐 신호만 다시 계산)"""
+        self.update(signal_values)
+        return self.payload()
+
+class E2EChecker:
+    """수신 측 E2E 검사. CRC 신호 비트를 0 으로 지운 페이로드의 CRC 를 받은 CRC 와 비교하고
+    Alive Counter 가 직전 값 + 1 (modulo) 인지 확인합니다. 첫 프레임과 reset() 직후에는 카운터를 그대로 받아들입니다.
+    """
+    def __init__(self, message, crc_signal: str, counter_signal: str = None, crc_func=GV80_CRC8):
+        self.crc_signal = crc_signal
+        self.counter_signal = counter_signal
+        self.crc_func = crc_func
+        zero = {s.name: 0 for s in message.signals}
+        crc_bits = (1 << message.get_signal_by_name(crc_signal).length) - 1
+        crc_place = int.from_bytes(message.encode(dict(zero, **{crc_signal: crc_bits}), scaling=False, strict=False),
+                                   'little')
+        self.length = message.length
+        self._keep = ~crc_place & ((1 << (8 * message.length)) - 1)
+        self.modulus = 1 << message.get_signal_by_name(counter_signal).length if counter_signal else 1
+        self.last_counter = None
+
+    def expected_crc(self, data: bytes) -> int:
+        return self.crc_func((int.from_bytes(data, 'little') & self._keep).to_bytes(self.length, 'little'))
+
+    def check_crc(self, data: bytes, received: int) -> bool:
+        return len(data) == self.length and self.expected_crc(data) == received
+
+    def check_counter(self, counter: int) -> bool:
+        last, self.last_counter = self.last_counter, counter
+        return last is None or counter == (last + 1) % self.modulus
+
+    def reset(self):
+        self.last_counter = None
@@ -0,0 +1,394 @@
+import multiprocessing
+import re
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import can
+
+import dbccache
+from canframe import CompiledFrame
+from e2e import E2EChecker, e2e_signals
+from scheduler import JitterStats
+
+# 램프 ECU 가 내보내는 상태 프레임
+STATUS_DBC = """VERSION ""
+
+BU_: LAMP BCM
+
+BO_ 1300 LAMP_STA_01_100ms: 8 LAMP
+ SG_ LampSta_LoBeam : 0|1@1+ (1,0) [0|1] "" BCM
+ SG_ LampSta_HiBeam : 1|1@1+ (1,0) [0|1] "" BCM
+ SG_ LampSta_TurnLft : 2|1@1+ (1,0) [0|1] "" BCM
+ SG_ LampSta_TurnRt : 3|1@1+ (1,0) [0|1] "" BCM
+ SG_ LampSta_IFSMod : 4|2@1+ (1,0) [0|3] "" BCM
+ SG_ LampSta_IgnOn : 6|1@1+ (1,0) [0|1] "" BCM
+ SG_ LampSta_Timeout : 8|8@1+ (1,0) [0|255] "" BCM
+ SG_ LampSta_E2EErrCnt : 16|8@1+ (1,0) [0|255] "" BCM
+ SG_ LampSta_AlvCnt : 24|4@1+ (1,0) [0|15] "" BCM
+"""
+STATUS_MESSAGE = 'LAMP_STA_01_100ms'
+
+# 명령 메시지 신호 -> (상태 신호, raw 값 변환). 순서대로 LampSta_Timeout 의 비트 0, 1, 2, 3 에 대응합니다.
+COMMAND_MAP = {
+    'BCM_07_200ms': {'Lamp_HdLmpLoOnReq': ('LampSta_LoBeam', bool),
+                     'Lamp_HdLmpHiOnReq': ('LampSta_HiBeam', bool)},
+    'BCM_08_200ms': {'Lamp_IFSCtrlModTyp': ('LampSta_IFSMod', int)},
+    'ICU_04_200ms': {'Lamp_TrnSigLmpLftOnReq': ('LampSta_TurnLft', bool),
+                     'Lamp_TrnSigLmpRtOnReq': ('LampSta_TurnRt', bool)},
+    'CGW1': {'CF_Gway_HeadLampLow': ('LampSta_LoBeam', bool),
+             'CF_Gway_HeadLampHigh': ('LampSta_HiBeam', bool),
+             'CF_Gway_TurnSigLh': ('LampSta_TurnLft', bool),
+             'CF_Gway_TurnSigRh': ('LampSta_TurnRt', bool),
+             'CF_Gway_IGNSw': ('LampSta_IgnOn', lambda v: v == 2)},
+}
+CYCLE_TIMES = {'CGW1': 0.1}     # 이름에 _200ms 같은 주기 표기가 없는 메시지
+
+def cycle_time(name: str, default: float = 0.1) -> float:
+    m = re.search(r'_(\d+)ms$', name)
+    return int(m.group(1)) / 1000 if m else CYCLE_TIMES.get(name, default)
+
+class MessageHealth:
+    """명령 메시지 하나의 수신 상태"""
+    def __init__(self, name: str, period: float):
+        self.name = name
+        self.period = period
+        self.frames = 0
+        self.crc_errors = 0
+        self.counter_errors = 0
+        self.timeouts = 0
+        self.timed_out = True           # 첫 프레임을 받기 전에는 타임아웃 상태
+        self.last_seen = None           # 프레임 타임스탬프 (도착 간격용)
+        self.last_rx = None             # 로컬 수신 시각 (타임아웃용)
+        self.interval = JitterStats()   # 도착 간격 - 주기
+
+    @property
+    def e2e_errors(self) -> int:
+        return self.crc_errors + self.counter_errors
+
+    def __repr__(self):
+        return (f"{self.name}: frames={self.frames}, crc_errors={self.crc_errors}, "
+                f"counter_errors={self.counter_errors}, timeouts={self.timeouts}, interval={self.interval}")
+
+# =========================== 가상 램프 ECU ===========================
+class LampEcu:
+    """BCM_07/BCM_08/ICU_04/CGW1 을 받아 E2E(CRC-8, Alive Counter)와 주기 타임아웃을 검사하고
+    램프 상태를 LAMP_STA 프레임으로 응답하는 시뮬레이터
+
+    E2E 오류 프레임은 실제 ECU 처럼 버리고, 주기 × timeout_factor 동안 못 받은 메시지는 타임아웃으로 보고
+    그 메시지가 켜던 램프를 끕니다. 상태가 바뀌면 바로, 아니면 status_period 마다 상태 프레임을 보냅니다.
+    reaction 은 명령 프레임 타임스탬프부터 그 변화를 담은 상태 프레임 전송까지의 지연입니다.
+    (virtual 처럼 타임스탬프가 time.time() 기준인 인터페이스에서 의미가 있습니다)
+    """
+    def __init__(self, bus, databases, status_period: float = 0.1, timeout_factor: float = 3.0,
+                 on_event: Callable[[str], None] = None):
+        self.bus = bus
+        self.status_period = status_period
+        self.timeout_factor = timeout_factor
+        self.on_event = on_event
+        status_db = dbccache.load_string(STATUS_DBC, label='lamp_status')
+        self.status = CompiledFrame(status_db.get_message_by_name(STATUS_MESSAGE))
+        self.status_id = self.status.frame_id
+        self.state = {name: 0 for targets in COMMAND_MAP.values() for name, _ in targets.values()}
+        self.health: Dict[str, MessageHealth] = {}
+        self.reaction = JitterStats()
+        self._handlers = {}
+        for bit, (name, mapping) in enumerate(COMMAND_MAP.items()):
+            message = self._find(databases, name)
+            if message is None:
+                continue
+            crc, counter = e2e_signals(message)
+            checker = E2EChecker(message, crc, counter) if crc else None
+            self.health[name] = MessageHealth(name, cycle_time(name))
+            self._handlers[message.frame_id] = (message, checker, crc, counter, mapping, bit)
+        self._e2e_errors = 0
+        self._alive = 0
+        self._lock = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _find(databases, name):
+        for db in databases:
+            try:
+                return db.get_message_by_name(name)
+            except KeyError:
+                continue
+        return None
+
+    def _event(self, text: str):
+        if self.on_event is not None:
+            self.on_event(text)
+
+    # --- 수신 처리 ---
+    def handle(self, msg: can.Message, now: float = None) -> bool:
+        """명령 프레임 하나를 처리하고 램프 상태가 바뀌었는지 돌려줍니다. now 는 수신 시각(타임아웃 판정용)"""
+        entry = self._handlers.get(msg.arbitration_id)
+        if entry is None or msg.is_error_frame or msg.is_remote_frame:
+            return False
+        message, checker, crc, counter, mapping, _ = entry
+        health = self.health[message.name]
+        data = bytes(msg.data)
+        try:
+            raw = message.decode(data, scaling=False, decode_choices=False)
+        except Exception:
+            health.crc_errors += 1
+            self._e2e_errors += 1
+            return False
+        health.frames += 1
+        if health.last_seen is not None and not health.timed_out:
+            health.interval.add(msg.timestamp - health.last_seen - health.period)
+        health.last_seen = msg.timestamp
+        health.last_rx = time.time() if now is None else now
+        if health.timed_out:
+            health.timed_out = False
+            if checker is not None:
+                checker.reset()
+        if checker is not None:
+            if not checker.check_crc(data, raw[crc]):
+                health.crc_errors += 1
+                self._e2e_errors += 1
+                self._event(f"{message.name}: CRC 오류 (받음 0x{raw[crc]:02X}, 기대 0x{checker.expected_crc(data):02X})")
+                return False
+            if counter and not checker.check_counter(raw[counter]):
+                health.counter_errors += 1
+                self._e2e_errors += 1
+                self._event(f"{message.name}: Alive Counter 불연속 ({raw[counter]})")
+                return False
+        changed = False
+        for signal, (target, convert) in mapping.items():
+            value = int(convert(raw[signal]))
+            if self.state[target] != value:
+                self.state[target] = value
+                changed = True
+        return changed
+
+    def _check_timeouts(self, now: float) -> bool:
+        changed = False
+        for name, health in self.health.items():
+            if health.timed_out or health.last_rx is None:
+                continue
+            if now - health.last_rx > health.period * self.timeout_factor:
+                health.timed_out = True
+                health.timeouts += 1
+                self._event(f"{name}: 수신 타임아웃 ({health.period * self.timeout_factor * 1e3:.0f}ms)")
+                for target, _ in COMMAND_MAP[name].values():
+                    if self.state[target]:
+                        self.state[target] = 0
+                        changed = True
+        return changed
+
+    # --- 상태 응답 ---
+    def _timeout_bits(self) -> int:
+        bits = 0
+        for message, _, _, _, _, bit in self._handlers.values():
+            health = self.health[message.name]
+            if health.timed_out and health.last_rx is not None:
+                bits |= 1 << bit
+        return bits
+
+    def send_status(self):
+        values = dict(self.state, LampSta_Timeout=self._timeout_bits(),
+                      LampSta_E2EErrCnt=min(self._e2e_errors, 255), LampSta_AlvCnt=self._alive)
+        for name, value in values.items():
+            self.status.set_raw(name, value)
+        self._alive = (self._alive + 1) & 0xF
+        self.bus.send(self.status.build())
+
+    def _run(self):
+        next_status = time.time()
+        while self._running:
+            msg = self.bus.recv(timeout=max(0.0, min(next_status - time.time(), 0.01)))
+            now = time.time()
+            reacted_to = msg.timestamp if msg is not None and self.handle(msg, now) else None
+            timed_out = self._check_timeouts(now)
+            if reacted_to is None and not timed_out and now < next_status:
+                continue
+            try:
+                self.send_status()
+                if reacted_to is not None:
+                    self.reaction.add(time.time() - reacted_to)
+            except can.CanError as e:
+                self._event(f"상태 프레임 전송 오류: {e}")
+            with self._lock:
+                self._lock.notify_all()
+            if now >= next_status:
+                next_status += self.status_period
+                if next_status < now:
+                    next_status = now + self.status_period
+
+    def wait_state(self, expected: dict, timeout: float = 1.0) -> bool:
+        """램프 상태가 expected 와 같아질 때까지 기다립니다. (같은 프로세스에서 돌릴 때 테스트용)"""
+        end = time.monotonic() + timeout
+        with self._lock:
+            while any(self.state.get(k) != v for k, v in expected.items()):
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._lock.wait(remaining)
+        return True
+
+    @property
+    def e2e_errors(self) -> int:
+        return self._e2e_errors
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def summary(self) -> str:
+        lines = [repr(h) for h in self.health.values()]
+        lines.append(f"reaction: {self.reaction}")
+        return '\n'.join(lines)
+
+# =========================== 테스터 쪽 도구 ===========================
+class StatusMonitor(can.Listener):
+    """테스터 버스에서 LAMP_STA 프레임을 받아 명령 -> 반응 지연을 잽니다.
+
+        since = time.perf_counter(); sender.update_cyclic(...); latency = monitor.expect({...}, since)
+    """
+    def __init__(self):
+        status_db = dbccache.load_string(STATUS_DBC, label='lamp_status')
+        self.message = status_db.get_message_by_name(STATUS_MESSAGE)
+        self.state = {}
+        self.latency = JitterStats()
+        self._updated = 0.0
+        self._cond = threading.Condition()
+
+    def on_message_received(self, msg: can.Message):
+        if msg.arbitration_id != self.message.frame_id:
+            return
+        state = self.message.decode(bytes(msg.data), decode_choices=False)
+        with self._cond:
+            self.state = state
+            self._updated = time.perf_counter()
+            self._cond.notify_all()
+
+    def expect(self, expected: dict, since: float, timeout: float = 1.0) -> Optional[float]:
+        """since(perf_counter) 이후 상태가 expected 가 될 때까지 기다리고 걸린 시간을 돌려줍니다. (실패 시 None)"""
+        end = since + timeout
+        with self._cond:
+            while self._updated < since or any(self.state.get(k) != v for k, v in expected.items()):
+                remaining = end - time.perf_counter()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            latency = self._updated - since
+        self.latency.add(latency)
+        return latency
+
+# =========================== 별도 프로세스 실행 ===========================
+def _command_databases(dbc_path: str):
+    from lightcandemo import DBC_STRING, MESSAGE_NAME
+    return [dbccache.load_file(dbc_path), dbccache.load_string(DBC_STRING, label=MESSAGE_NAME)]
+
+def serve(interface: str, channel, dbc_path: str, stop, results=None, bus_kwargs: dict = None):
+    """ECU 를 현재 프로세스에서 stop 이벤트가 설정될 때까지 돌리고 요약을 results 큐에 넣습니다."""
+    bus = can.interface.Bus(interface=interface, channel=channel, **(bus_kwargs or {}))
+    ecu = LampEcu(bus, _command_databases(dbc_path), on_event=lambda text: print(f"⚠️ [ECU] {text}"))
+    ecu.start()
+    try:
+        stop.wait()
+    finally:
+        ecu.stop()
+        bus.shutdown()
+        if results is not None:
+            results.put(ecu.summary())
+
+def start_process(interface: str, channel, dbc_path: str, **bus_kwargs):
+    """ECU 를 별도 프로세스로 띄웁니다. virtual 버스는 프로세스 안에서만 보이므로
+    프로세스를 나눌 때는 socketcan(vcan0) 이나 udp_multicast 처럼 프로세스 사이에 공유되는 인터페이스를 쓰세요.
+    돌려준 (process, stop, results) 에서 stop.set() 후 results.get() 으로 요약을 받습니다.
+    """
+    stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(interface, channel, dbc_path, stop, results, bus_kwargs),
+                                      daemon=True)
+    process.start()
+    return process, stop, results
+
+def main():
+    """nonifs2 전송 경로(TxWorker + 주기 전송)와 lightcandemo 깨우기 프레임을 가상 버스의 ECU 로 검사합니다.
+
+    E2E 오류나 기대한 반응이 없으면 종료 코드 1 로 끝나므로 CI 에서 그대로 쓸 수 있습니다.
+    """
+    # ============================ 사용자 설정 ============================
+    DBC_FILE_PATH = "Temp_DBC.dbc"
+    CHANNEL = "lamp_ecu_sim"
+    PERIOD = 0.2            # nonifs2.CYCLE_TIME 과 같은 주기
+    REACTION_TIMEOUT = 1.0
+    # =================================================================
+
+    import nonifs2
+    import lightcandemo
+
+    ecu_bus = can.Bus(interface='virtual', channel=CHANNEL)
+    ecu = LampEcu(ecu_bus, _command_databases(DBC_FILE_PATH), on_event=lambda text: print(f"⚠️ [ECU] {text}"))
+    monitor = StatusMonitor()
+    monitor_bus = can.Bus(interface='virtual', channel=CHANNEL)
+    notifier = can.Notifier(monitor_bus, [monitor])
+    ecu.start()
+    failures = []
+
+    def check(label: str, expected: dict, since: float):
+        latency = monitor.expect(expected, since, REACTION_TIMEOUT)
+        if latency is None:
+            failures.append(label)
+            print(f"❌ {label}: {REACTION_TIMEOUT}s 안에 반응 없음 (상태 {monitor.state})")
+        else:
+            print(f"✅ {label}: 명령 -> 반응 {latency * 1e3:.1f}ms")
+
+    sender = nonifs2.CANMessageSender(DBC_FILE_PATH, 'virtual', CHANNEL, 500000)
+    try:
+        since = time.perf_counter()
+        sender.start_cyclic('ICU_04_200ms', PERIOD)
+        sender.start_cyclic('BCM_07_200ms', PERIOD, 'BCM_Crc7Val', 'BCM_AlvCnt7Val', {'Lamp_HdLmpLoOnReq': 1})
+        sender.start_cyclic('BCM_08_200ms', PERIOD, 'BCM_Crc8Val', 'BCM_AlvCnt8Val', {'Lamp_IFSCtrlModTyp': 1})
+        check("하향등 + IFS 시작", {'LampSta_LoBeam': 1, 'LampSta_IFSMod': 1}, since)
+        for label, name, signals, expected in (
+                ("상향등 켜기", 'BCM_07_200ms', {'Lamp_HdLmpHiOnReq': 1}, {'LampSta_HiBeam': 1}),
+                ("우측 방향지시등", 'ICU_04_200ms', {'Lamp_TrnSigLmpRtOnReq': 2}, {'LampSta_TurnRt': 1}),
+                ("IFS 모드 3", 'BCM_08_200ms', {'Lamp_IFSCtrlModTyp': 3}, {'LampSta_IFSMod': 3}),
+                ("모든 조명 끄기", 'BCM_07_200ms', {'Lamp_HdLmpLoOnReq': 0, 'Lamp_HdLmpHiOnReq': 0},
+                 {'LampSta_LoBeam': 0, 'LampSta_HiBeam': 0})):
+            since = time.perf_counter()
+            sender.update_cyclic(name, signals)
+            check(label, expected, since)
+        since = time.perf_counter()
+        sender.cyclic.stop()
+        check("주기 전송 중단 -> 타임아웃", {'LampSta_TurnRt': 0, 'LampSta_IFSMod': 0}, since)
+    finally:
+        sender.close()
+
+    since = time.perf_counter()
+    controller = lightcandemo.BenchController('virtual', CHANNEL, 500000)
+    try:
+        check("CGW1 깨우기 (IGN ON)", {'LampSta_IgnOn': 1}, since)
+    finally:
+        controller.shutdown()
+
+    ecu.stop()
+    notifier.stop()
+    monitor_bus.shutdown()
+    ecu_bus.shutdown()
+    print("\n" + ecu.summary())
+    print(f"명령 -> 반응: {monitor.latency}")
+    if ecu.e2e_errors:
+        failures.append(f"E2E 오류 {ecu.e2e_errors}건")
+    if failures:
+        print(f"\n❌ 실패: {', '.join(failures)}")
+        sys.exit(1)
+    print("\n✅ 모든 검사 통과")
+
+if __name__ == "__main__":
+    main()
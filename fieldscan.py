@@ -0,0 +1,187 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from canlog import iter_frames
+
+# 비트 번호는 DBC Intel(little endian) 규칙을 따릅니다: bit = byte * 8 + (0 = LSB)
+
+# =========================== 분석 결과 ===========================
+class CounterField(NamedTuple):
+    start_bit: int
+    length: int
+    step: int
+    score: float        # 연속 프레임 중 (이전 값 + step) mod 2^length 를 만족하는 비율
+
+class ChecksumField(NamedTuple):
+    byte: int
+    entropy: float      # 나머지 페이로드 엔트로피 대비 값 분포 엔트로피 (0~1)
+    score: float        # '다른 바이트가 바뀔 때만 같이 바뀐다' 를 만족하는 비율
+
+class FieldReport(NamedTuple):
+    can_id: int
+    frames: int
+    length: int
+    flip_rates: np.ndarray      # 비트별 변화율 (length * 8)
+    constant_bits: np.ndarray   # 한 번도 바뀌지 않은 비트
+    counters: list
+    checksums: list
+    crc_candidates: list
+
+# =========================== 프레임 수집 ===========================
+def collect_frames(path: str, fmt: Optional[str] = None, ids=None, max_frames: int = 20000):
+    """ID 별 페이로드를 시간 순서 그대로 (N, L) uint8 배열로 모읍니다.
+
+    ID 마다 가장 흔한 길이의 프레임만, 최대 max_frames 개까지 보관합니다.
+    """
+    buffers = {}
+    counts = {}
+    for frame in iter_frames(path, fmt, ids):
+        key = (frame.arbitration_id, len(frame.data))
+        n = counts.get(key, 0)
+        if n >= max_frames or not frame.data:
+            continue
+        if n == 0:
+            buffers[key] = bytearray()
+        buffers[key] += frame.data
+        counts[key] = n + 1
+
+    result = {}
+    for (can_id, length), n in counts.items():
+        best = result.get(can_id)
+        if best is None or n > best.shape[0]:
+            result[can_id] = np.frombuffer(bytes(buffers[(can_id, length)]), dtype=np.uint8).reshape(n, length)
+    return result
+
+# =========================== 비트 통계 ===========================
+def bit_matrix(payloads: np.ndarray) -> np.ndarray:
+    return np.unpackbits(payloads, axis=1, bitorder='little')
+
+def flip_rates(bits: np.ndarray) -> np.ndarray:
+    if bits.shape[0] < 2:
+        return np.zeros(bits.shape[1])
+    return (bits[1:] != bits[:-1]).mean(axis=0)
+
+def field_values(bits: np.ndarray, start_bit: int, length: int) -> np.ndarray:
+    """Intel 배치 필드 값을 모든 프레임에 대해 한 번에 계산합니다."""
+    weights = (1 << np.arange(length, dtype=np.int64))
+    return bits[:, start_bit:start_bit + length].astype(np.int64) @ weights
+
+def find_counters(bits: np.ndarray, rates: np.ndarray, min_score: float = 0.9, max_length: int = 8):
+    """LSB 변화율이 ~1 이고 상위 비트로 갈수록 변화율이 절반씩 줄어드는 카운터를 찾습니다."""
+    counters = []
+    total_bits = bits.shape[1]
+    used = np.zeros(total_bits, dtype=bool)
+    # 변화율이 높은 비트부터 카운터 LSB 후보로 봅니다.
+    for start in np.argsort(-rates):
+        if rates[start] < min_score:
+            break
+        if used[start]:
+            continue
+        best = None
+        best_score = 0.0
+        byte_end = (start // 8 + 1) * 8
+        # 카운터는 보통 바이트 경계를 넘지 않습니다. (4비트 AlvCnt 등)
+        for length in range(2, min(max_length, byte_end - start) + 1):
+            values = field_values(bits, start, length)
+            modulo = 1 << length
+            steps = (values[1:] - values[:-1]) % modulo
+            if steps.size == 0:
+                break
+            step = int(np.bincount(steps).argmax())
+            if step == 0:
+                break
+            score = float((steps == step).mean())
+            # 상위 비트를 붙였을 때 점수가 떨어지면 카운터 밖의 신호가 섞인 것입니다.
+            if score < min_score or score < best_score - 0.01:
+                break
+            best = CounterField(int(start), length, step, score)
+            best_score = score
+        if best is not None:
+            counters.append(best)
+            used[best.start_bit:best.start_bit + best.length] = True
+    return counters
+
+def find_checksums(payloads: np.ndarray, counters, min_entropy: float = 0.85, min_score: float = 0.95):
+    """값 분포가 고르고, 다른 바이트가 바뀔 때만 같이 바뀌는 바이트를 체크섬 후보로 봅니다."""
+    n, length = payloads.shape
+    if n < 16:
+        return []
+    counter_bytes = {c.start_bit // 8 for c in counters}
+    changed = payloads[1:] != payloads[:-1]
+    result = []
+    for byte in range(length):
+        if byte in counter_bytes:
+            continue  # 카운터가 들어 있는 바이트는 체크섬 필드로 보지 않습니다.
+        # 체크섬은 나머지 바이트의 함수이므로 엔트로피가 나머지 페이로드 엔트로피(최대 8비트)에 가깝습니다.
+        others = np.ascontiguousarray(np.delete(payloads, byte, axis=1))
+        max_entropy = min(8.0, _entropy(np.unique(others.view(f'V{length - 1}').ravel(), return_counts=True)[1]))
+        if max_entropy < 2.0:
+            continue
+        entropy = _entropy(np.bincount(payloads[:, byte], minlength=256)) / max_entropy
+        if entropy < min_entropy:
+            continue
+        rest = np.delete(changed, byte, axis=1).any(axis=1)
+        score = float((changed[:, byte] == rest).mean())
+        if score >= min_score:
+            result.append(ChecksumField(byte, entropy, score))
+    return result
+
+def _entropy(counts) -> float:
+    p = counts[counts > 0] / counts.sum()
+    return float(-(p * np.log2(p)).sum())
+
+# =========================== ID 단위 / 로그 단위 분석 ===========================
+def analyze_payloads(can_id: int, payloads: np.ndarray, crc_search: bool = True, search_kwargs=None):
+    bits = bit_matrix(payloads)
+    rates = flip_rates(bits)
+    counters = find_counters(bits, rates)
+    checksums = find_checksums(payloads, counters)
+    crc_candidates = []
+    if crc_search and checksums:
+        from findcrc import search_crc
+        unique = list(dict.fromkeys(bytes(row) for row in payloads))
+        kwargs = dict(widths=(8,), subsets=False, extras=('none',), workers=1)
+        kwargs.update(search_kwargs or {})
+        for field in checksums:
+            if len(unique) < 2:
+                break
+            crc_candidates.extend(search_crc([(can_id, data) for data in unique[:64]],
+                                             crc_positions=(field.byte,), **kwargs))
+    return FieldReport(can_id, payloads.shape[0], payloads.shape[1], rates, rates == 0,
+                       counters, checksums, crc_candidates)
+
+def analyze_log(path: str, fmt: Optional[str] = None, ids=None, max_frames: int = 20000,
+                crc_search: bool = True, search_kwargs=None):
+    """로그 안의 모든 ID 에 대해 카운터/체크섬 필드를 찾고 CRC 후보까지 돌려줍니다."""
+    reports = {}
+    for can_id, payloads in sorted(collect_frames(path, fmt, ids, max_frames).items()):
+        reports[can_id] = analyze_payloads(can_id, payloads, crc_search, search_kwargs)
+    return reports
+
+def print_report(report: FieldReport):
+    print(f"0x{report.can_id:03X}  frames={report.frames}  len={report.length}  "
+          f"constant bits={int(report.constant_bits.sum())}/{report.length * 8}")
+    for c in report.counters:
+        print(f"  counter : start bit {c.start_bit:2d}, {c.length} bits, step {c.step} (score {c.score:.2f})")
+    for c in report.checksums:
+        print(f"  checksum: byte {c.byte} (entropy {c.entropy:.2f}, score {c.score:.2f})")
+    for c in report.crc_candidates[:3]:
+        print(f"  CRC     : CRC-{c.width} poly 0x{c.poly:02X} RefIn={c.reflect_in} RefOut={c.reflect_out} "
+              f"byte {c.crc_pos} offset 0x{c.offset:02X}")
+
+def main():
+    # ============================ 사용자 설정 ============================
+    LOG_FILE = "bench.log"
+    CRC_SEARCH = True
+    # =================================================================
+
+    reports = analyze_log(LOG_FILE, crc_search=CRC_SEARCH)
+    print(f"{LOG_FILE}: {len(reports)} IDs")
+    print("-" * 60)
+    for report in reports.values():
+        if report.counters or report.checksums:
+            print_report(report)
+
+if __name__ == "__main__":
+    main()
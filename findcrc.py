@@ -1,16 +1,13 @@
-import struct
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from crcengine import get_engine, reflect, reflect_array
 
 def calculate_crc8(data, poly, init, xor_out):
-    crc = init
-    for byte in data:
-        crc ^= byte
-        for _ in range(8):
-            if crc & 0x80:
-                crc = (crc << 1) ^ poly
-            else:
-                crc <<= 1
-            crc &= 0xFF
-    return crc ^ xor_out
+    return get_engine(8, poly, init, xor_out).compute(data)
 
 # 로그에서 확인된 0x413 샘플 데이터 (Byte 0: Target CRC, Byte 1~7: Payload)
 samples = [
@@ -21,79 +18,285 @@ samples = [
     [0xC6, 0xC0, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00]
 ]
 
-print("Analyzing CRC parameters for CAN ID 0x413...")
-print("-" * 60)
-
-found = False
-
-# 1. 다항식(Polynomial) 탐색 (0x00 ~ 0xFF)
-# CRC의 선형성(Linearity)을 이용: CRC(A) ^ CRC(B) == CRC(A ^ B) (Init=0, Xor=0일 때)
-for poly in range(256):
-    is_poly_valid = True
-    
-    # 샘플 간의 차이를 이용해 Poly 검증
-    for i in range(len(samples) - 1):
-        target_a = samples[i][0]
-        payload_a = samples[i][1:]
-        
-        target_b = samples[i+1][0]
-        payload_b = samples[i+1][1:]
-        
-        # 두 데이터의 XOR 차이 계산
-        payload_diff = [a ^ b for a, b in zip(payload_a, payload_b)]
-        target_diff = target_a ^ target_b
-        
-        # Init=0, Xor=0 상태에서 차이값에 대한 CRC 계산
-        calc_diff = calculate_crc8(payload_diff, poly, 0, 0)
-        
-        if calc_diff != target_diff:
-            is_poly_valid = False
-            break
-    
-    # 2. 다항식이 맞다면, 상수 오프셋(Init/Xor 조합) 찾기
-    if is_poly_valid:
-        # 첫 번째 샘플을 기준으로 오프셋 역산
-        # Target = CRC(Payload, Poly, 0, 0) ^ Offset
-        # Offset = Target ^ CRC(Payload, Poly, 0, 0)
-        
-        base_crc = calculate_crc8(samples[0][1:], poly, 0, 0)
-        offset = samples[0][0] ^ base_crc
-        
-        # 찾아낸 파라미터(Poly, Offset)로 모든 샘플 검증
-        all_match = True
-        for sample in samples:
-            target = sample[0]
-            payload = sample[1:]
-            # 여기서 offset은 Init이나 XOR Out 중 하나로 처리 가능합니다.
-            # 계산의 편의를 위해 Init=0, XorOut=offset 으로 가정하고 검증합니다.
-            if calculate_crc8(payload, poly, 0, offset) != target:
-                all_match = False
+# 자주 쓰이는 다항식은 같은 조건이라면 상위에 정렬합니다.
+KNOWN_POLYS = {
+    8: (0x1D, 0x2F, 0x07, 0x31, 0x9B),       # SAE J1850 / AUTOSAR E2E P1, 8H2F(P2), ...
+    16: (0x1021, 0x8005, 0x3D65, 0x0589),    # CCITT, IBM, ...
+}
+
+# CRC 입력 앞/뒤에 붙일 수 있는 추가 바이트 종류
+EXTRAS = ('none', 'can_id8', 'can_id16_be', 'can_id16_le', 'data_id')
+
+# 필터 단계에서 사용할 샘플 쌍의 최대 개수 (나머지는 후보 검증 단계에서 확인)
+FILTER_PAIRS = 8
+
+# ============================ 탐색 공간 정의 ============================
+class InputVariant(NamedTuple):
+    """CRC 필드를 제외한 페이로드에서 CRC 입력을 만드는 방법"""
+    start: int                 # 사용할 바이트 범위 [start, end)
+    end: int
+    reverse: bool = False      # 바이트 순서를 뒤집을지 여부
+    extra: str = 'none'        # EXTRAS 중 하나
+    extra_pos: str = 'prefix'  # 'prefix' 또는 'suffix'
+
+    def build(self, can_id: int, payload: bytes, data_id: int = 0) -> bytes:
+        body = payload[self.start:self.end]
+        if self.reverse:
+            body = body[::-1]
+        if self.extra == 'none':
+            return body
+        if self.extra == 'can_id8':
+            extra = bytes([can_id & 0xFF])
+        elif self.extra == 'can_id16_be':
+            extra = (can_id & 0xFFFF).to_bytes(2, 'big')
+        elif self.extra == 'can_id16_le':
+            extra = (can_id & 0xFFFF).to_bytes(2, 'little')
+        else:
+            extra = bytes([data_id & 0xFF])
+        return extra + body if self.extra_pos == 'prefix' else body + extra
+
+    def describe(self, length: int) -> str:
+        text = f"bytes[{self.start}:{self.end}]" if (self.start, self.end) != (0, length) else "all bytes"
+        if self.reverse:
+            text += " reversed"
+        if self.extra != 'none':
+            text += f" + {self.extra} ({self.extra_pos})"
+        return text
+
+class CrcCandidate(NamedTuple):
+    width: int
+    poly: int
+    reflect_in: bool
+    reflect_out: bool
+    crc_pos: int
+    crc_byteorder: str
+    variant: InputVariant
+    offset: int                # Init=0, XorOut=0 결과와 실제 CRC 사이의 상수 차이
+    init: Optional[int]        # offset 을 표준 Init/XorOut 조합으로 설명할 수 있을 때만 설정
+    xor_out: Optional[int]
+    data_id: Optional[int]
+
+    @property
+    def explained(self) -> bool:
+        return self.init is not None
+
+    def rank_key(self, payload_length: int):
+        full = (self.variant.start, self.variant.end) == (0, payload_length)
+        # 추가 바이트/부분 범위 없이 설명되는 후보가 가장 그럴듯합니다.
+        # (CRC-8 에서는 Data ID 256 개로 어떤 오프셋이든 설명되므로 explained 보다 먼저 봅니다.)
+        return (self.variant.extra != 'none', not full, self.variant.reverse, not self.explained,
+                self.poly not in KNOWN_POLYS.get(self.width, ()), self.width, self.poly)
+
+    def engine(self):
+        """찾아낸 파라미터로 바로 사용할 수 있는 CrcEngine 을 돌려줍니다."""
+        if self.explained:
+            return get_engine(self.width, self.poly, self.init, self.xor_out, self.reflect_in, self.reflect_out)
+        return get_engine(self.width, self.poly, 0, self.offset, self.reflect_in, self.reflect_out)
+
+# ============================ 샘플 전처리 ============================
+def normalize_samples(raw_samples, can_id: int):
+    """[CRC, payload...] 리스트 또는 (can_id, data) 튜플을 중복 없는 (can_id, bytes) 목록으로 바꿉니다."""
+    result = []
+    seen = set()
+    for sample in raw_samples:
+        if isinstance(sample, tuple) and len(sample) == 2 and not isinstance(sample[1], int):
+            item = (int(sample[0]), bytes(sample[1]))
+        else:
+            item = (can_id, bytes(sample))
+        if item not in seen:
+            seen.add(item)
+            result.append(item)
+    return result
+
+def split_crc_field(data: bytes, crc_pos: int, width: int, byteorder: str):
+    """프레임을 (목표 CRC 값, CRC 필드를 뺀 페이로드) 로 나눕니다."""
+    size = width // 8
+    target = int.from_bytes(data[crc_pos:crc_pos + size], byteorder)
+    return target, data[:crc_pos] + data[crc_pos + size:]
+
+def iter_variants(payload_length: int, subsets: bool = True, extras=EXTRAS):
+    ranges = [(s, e) for s in range(payload_length) for e in range(s + 1, payload_length + 1)] \
+        if subsets else [(0, payload_length)]
+    for start, end in ranges:
+        for reverse in ((False, True) if end - start > 1 else (False,)):
+            for extra in extras:
+                positions = ('prefix',) if extra == 'none' else ('prefix', 'suffix')
+                for extra_pos in positions:
+                    yield InputVariant(start, end, reverse, extra, extra_pos)
+
+# ============================ 다항식 벡터 필터 ============================
+def _diff_registers(diff: bytes, width: int, reflect_in: bool, polys):
+    """Init=0 일 때 diff 입력의 레지스터 값을 모든 다항식에 대해 동시에 계산합니다.
+
+    CRC 는 선형이므로 CRC(A) ^ CRC(B) == CRC0(A ^ B) 이고, 이 값은 Init/XorOut 과
+    무관합니다. 다항식 방향으로 벡터화해서 한 번의 루프로 전체 공간을 검사합니다.
+    """
+    mask = np.uint64((1 << width) - 1)
+    one = np.uint64(1)
+    reg = np.zeros(len(polys), dtype=np.uint64)
+    if reflect_in:
+        rpolys = reflect_array(polys, width)
+        for byte in diff:
+            reg ^= np.uint64(byte)
+            for _ in range(8):
+                reg = (reg >> one) ^ (rpolys * (reg & one))
+    else:
+        top = np.uint64(width - 1)
+        shift = np.uint64(width - 8)
+        for byte in diff:
+            reg ^= np.uint64(byte) << shift
+            for _ in range(8):
+                reg = ((reg << one) & mask) ^ (polys * ((reg >> top) & one))
+    return reg
+
+def _search_task(task):
+    """(width, reflect_in, crc_pos, byteorder, variant) 하나에 대한 전체 다항식 탐색"""
+    frames, width, reflect_in, crc_pos, byteorder, variant = task
+    split = [split_crc_field(data, crc_pos, width, byteorder) for _, data in frames]
+    targets = [target for target, _ in split]
+    inputs = [variant.build(can_id, payload) for (can_id, _), (_, payload) in zip(frames, split)]
+    # 입력 차이가 0 이 아닌 쌍만 필터에 의미가 있습니다.
+    pairs = [(bytes(a ^ b for a, b in zip(inputs[0], inputs[i])), targets[0] ^ targets[i])
+             for i in range(1, len(inputs)) if inputs[i] != inputs[0]]
+    if not pairs:
+        return []
+
+    polys = np.arange(1 << width, dtype=np.uint64)
+    first_reg = _diff_registers(pairs[0][0], width, reflect_in, polys)
+    results = []
+    for reflect_out in (False, True):
+        flip = reflect_in != reflect_out
+        survivors = polys
+        reg = first_reg
+        for index, (diff, target_diff) in enumerate(pairs[:FILTER_PAIRS]):
+            if index > 0:
+                reg = _diff_registers(diff, width, reflect_in, survivors)
+            expected = reflect(target_diff, width) if flip else target_diff
+            survivors = survivors[reg == np.uint64(expected)]
+            if len(survivors) == 0:
                 break
-        
-        if all_match:
-            print(f"[SUCCESS] MATCH FOUND!")
-            print(f"  Polynomial : 0x{poly:02X}")
-            print(f"  XOR Offset : 0x{offset:02X} (Combination of Init & Final XOR)")
-            print(f"  Formula    : CRC = CRC8(Data, Poly=0x{poly:02X}, Init=0x00) ^ 0x{offset:02X}")
-            print("-" * 60)
-            
-            # 파이썬 코드로 바로 쓸 수 있는 형태 출력
-            print("Python Implementation:")
-            print(f"def get_checksum_413(data):")
-            print(f"    crc = 0x00")
-            print(f"    poly = 0x{poly:02X}")
-            print(f"    for byte in data:")
-            print(f"        crc ^= byte")
-            print(f"        for _ in range(8):")
-            print(f"            if crc & 0x80: crc = (crc << 1) ^ poly")
-            print(f"            else: crc <<= 1")
-            print(f"            crc &= 0xFF")
-            print(f"    return crc ^ 0x{offset:02X}")
-            found = True
-            break # 하나 찾으면 종료
-
-if not found:
-    print("[FAIL] Could not find a matching CRC-8 algorithm.")
-    print("Possibilities:")
-    print("1. Not a standard CRC-8 (e.g., Sum, XOR, or includes CAN ID in calculation).")
-    print("2. Bit order is reversed (LSB First).")
+        for poly in survivors.tolist():
+            candidate = _verify(frames, inputs, targets, width, poly, reflect_in, reflect_out,
+                                crc_pos, byteorder, variant, split)
+            if candidate is not None:
+                results.append(candidate)
+    return results
+
+def _verify(frames, inputs, targets, width, poly, reflect_in, reflect_out, crc_pos, byteorder, variant, split):
+    """필터를 통과한 다항식을 모든 샘플로 검증하고 상수 오프셋을 해석합니다."""
+    engine = get_engine(width, poly, 0, 0, reflect_in, reflect_out)
+    offset = targets[0] ^ engine.compute(inputs[0])
+    for data, target in zip(inputs, targets):
+        if engine.compute(data) ^ offset != target:
+            return None
+
+    # 오프셋을 흔한 Init/XorOut 조합(+ Data ID) 으로 설명할 수 있는지 확인합니다.
+    mask = (1 << width) - 1
+    can_id, _ = frames[0]
+    payload = split[0][1]
+    data_ids = range(256) if variant.extra == 'data_id' else (None,)
+    for init in (0, mask):
+        for xor_out in (0, mask):
+            explain = get_engine(width, poly, init, xor_out, reflect_in, reflect_out)
+            for data_id in data_ids:
+                if explain.compute(variant.build(can_id, payload, data_id or 0)) == targets[0]:
+                    return CrcCandidate(width, poly, reflect_in, reflect_out, crc_pos, byteorder,
+                                        variant, offset, init, xor_out, data_id)
+    return CrcCandidate(width, poly, reflect_in, reflect_out, crc_pos, byteorder,
+                        variant, offset, None, None, None)
+
+# ============================ 병렬 탐색 엔진 ============================
+def search_crc(raw_samples, can_id: int = 0, widths=(8, 16), crc_positions=(0,),
+               subsets: bool = True, extras=EXTRAS, workers: Optional[int] = None):
+    """모든 조합을 프로세스 풀로 탐색하고 일치하는 후보 전체를 순위대로 돌려줍니다.
+
+    raw_samples 는 [CRC, payload...] 형태의 리스트(can_id 사용) 또는 (can_id, data) 튜플입니다.
+    """
+    frames = normalize_samples(raw_samples, can_id)
+    if len(frames) < 2:
+        raise ValueError("at least two distinct samples are required")
+    length = len(frames[0][1])
+    if any(len(data) != length for _, data in frames):
+        raise ValueError("all samples must have the same length")
+
+    tasks = []
+    for width in widths:
+        size = width // 8
+        byteorders = ('big',) if size == 1 else ('big', 'little')
+        for crc_pos in crc_positions:
+            if crc_pos + size > length:
+                continue
+            for byteorder in byteorders:
+                for variant in iter_variants(length - size, subsets, extras):
+                    for reflect_in in (False, True):
+                        tasks.append((frames, width, reflect_in, crc_pos, byteorder, variant))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        chunks = map(_search_task, tasks)
+        candidates = [c for chunk in chunks for c in chunk]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = pool.map(_search_task, tasks, chunksize=max(1, len(tasks) // (workers * 8)))
+            candidates = [c for chunk in chunks for c in chunk]
+    candidates.sort(key=lambda c: c.rank_key(length - c.width // 8))
+    return candidates
+
+def print_candidate(candidate: CrcCandidate, payload_length: int):
+    c = candidate
+    print(f"  Width/Poly : CRC-{c.width}  0x{c.poly:0{c.width // 4}X}  "
+          f"(RefIn={c.reflect_in}, RefOut={c.reflect_out})")
+    print(f"  CRC Field  : byte {c.crc_pos} ({c.crc_byteorder})  Input: {c.variant.describe(payload_length)}")
+    if c.explained:
+        text = f"Init=0x{c.init:0{c.width // 4}X}, XorOut=0x{c.xor_out:0{c.width // 4}X}"
+        if c.data_id is not None:
+            text += f", DataID=0x{c.data_id:02X}"
+        print(f"  Params     : {text}")
+    else:
+        print(f"  XOR Offset : 0x{c.offset:0{c.width // 4}X} (Combination of Init & Final XOR)")
+
+def main():
+    # ============================ 사용자 설정 ============================
+    CAN_ID = 0x413
+    WIDTHS = (8, 16)
+    CRC_POSITIONS = (0,)
+    MAX_PRINT = 10
+    LOG_FILE = None       # 예: "bench.log" / "drive.asc" / "drive.blf" (None 이면 아래 samples 사용)
+    # =================================================================
+
+    print(f"Analyzing CRC parameters for CAN ID 0x{CAN_ID:X}...")
+    print("-" * 60)
+
+    frames = samples
+    if LOG_FILE:
+        from canlog import crc_samples
+        frames = crc_samples(LOG_FILE, CAN_ID)
+        print(f"{LOG_FILE}: {len(frames)} distinct payloads for 0x{CAN_ID:X}")
+    length = len(frames[0][1]) if LOG_FILE else len(frames[0])
+
+    candidates = search_crc(frames, CAN_ID, widths=WIDTHS, crc_positions=CRC_POSITIONS)
+    if not candidates:
+        print("[FAIL] Could not find a matching CRC algorithm.")
+        print("Possibilities:")
+        print("1. Not a CRC (e.g., Sum or XOR checksum).")
+        print("2. CRC field is at a different byte position (check CRC_POSITIONS).")
+        print("3. Not enough distinct samples.")
+        return
+
+    print(f"[SUCCESS] {len(candidates)} MATCH(ES) FOUND! (best first)")
+    for rank, candidate in enumerate(candidates[:MAX_PRINT], 1):
+        print(f"#{rank}")
+        print_candidate(candidate, length - candidate.width // 8)
+    print("-" * 60)
+
+    best = candidates[0]
+    engine = best.engine()
+    print("Python Implementation:")
+    print("from crcengine import CrcEngine")
+    print(f"get_checksum_{CAN_ID:x} = CrcEngine({engine.width}, 0x{engine.poly:X}, init=0x{engine.init:X}, "
+          f"xor_out=0x{engine.xor_out:X}, reflect_in={engine.reflect_in}, reflect_out={engine.reflect_out})")
+    if best.variant.extra != 'none' or best.variant.reverse or best.variant.end - best.variant.start != length - best.width // 8:
+        print(f"# CRC 입력: {best.variant.describe(length - best.width // 8)}")
+
+if __name__ == "__main__":
+    main()
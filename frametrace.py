@@ -0,0 +1,94 @@
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+import can
+
+INTERVAL_ALPHA = 0.125     # 프레임 간격 EMA 가중치
+IDLE_FACTOR = 3.0          # 마지막 프레임 뒤 평균 간격의 몇 배가 지나면 멈춘 것으로 볼지
+IDLE_TIMEOUT = 1.0         # 간격을 아직 모를 때(프레임 1개) 멈춤 판단 시간(초)
+
+class TraceRow(NamedTuple):
+    is_rx: bool
+    arbitration_id: int
+    count: int
+    rate: float         # 초당 프레임 수 (프레임 간격의 지수 이동 평균으로 계산, 멈추면 0)
+    timestamp: float
+    data: bytes
+
+class _Entry:
+    __slots__ = ('count', 'timestamp', 'data', 'arrived', 'interval', 'last_count', 'idle')
+
+    def __init__(self):
+        self.count = 0
+        self.timestamp = 0.0
+        self.data = b''
+        self.arrived = 0.0      # 마지막 프레임을 집계한 perf_counter 시각 (TX 프레임은 timestamp 가 비어 있음)
+        self.interval = 0.0     # 프레임 간격 EMA(초)
+        self.last_count = 0     # 직전 스냅숏 때의 count (rate 계산용)
+        self.idle = False       # 멈춘 뒤 rate 0 을 이미 알렸는지
+
+# =========================== ID 별 TX/RX 집계 ===========================
+class FrameTrace(can.Listener):
+    """(방향, ID) 마다 프레임 수, 마지막 payload, 시각만 고정 크기로 집계합니다.
+
+    프레임이 올 때는 카운터와 마지막 값만 바꾸고, 표시 쪽은 changed() 로 그 사이 바뀐 ID 만 묶어서 가져갑니다.
+    프레임 하나하나를 쌓지 않으므로 몇 시간을 돌려도 메모리는 ID 수만큼만 씁니다.
+    Recorder 와 같이 Notifier 에 붙이면 RX, TxWorker on_sent 에서 append(msg, is_rx=False) 로 TX 를 넣습니다.
+    """
+    def __init__(self):
+        self._entries: Dict[tuple, _Entry] = {}
+        self._lock = threading.Lock()   # TX 워커와 Notifier 스레드가 함께 append 합니다.
+
+    def append(self, msg: can.Message, is_rx: Optional[bool] = None):
+        if msg.is_error_frame:
+            return
+        key = (msg.is_rx if is_rx is None else is_rx, msg.arbitration_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            now = time.perf_counter()
+            if entry.count:
+                gap = now - entry.arrived
+                entry.interval = gap if entry.count == 1 else entry.interval + (gap - entry.interval) * INTERVAL_ALPHA
+            entry.count += 1
+            entry.arrived = now
+            entry.timestamp = msg.timestamp or time.time()
+            entry.data = msg.data
+
+    def on_message_received(self, msg: can.Message):
+        self.append(msg, is_rx=True)
+
+    def changed(self) -> List[TraceRow]:
+        """직전 호출 이후 프레임이 온 (방향, ID) 와 새로 멈춘 ID(rate 0) 만 돌려줍니다.
+
+        멈춤은 스냅숏 사이에 프레임이 없었는지가 아니라 마지막 프레임 뒤로 IDLE_FACTOR 주기가 지났는지로 판단합니다.
+        (스냅숏 간격보다 느린 메시지가 0 Hz 와 실제 rate 를 번갈아 보이지 않도록)
+        """
+        now = time.perf_counter()
+        rows = []
+        with self._lock:
+            for (is_rx, frame_id), entry in self._entries.items():
+                delta = entry.count - entry.last_count
+                entry.last_count = entry.count
+                timeout = IDLE_FACTOR * entry.interval if entry.interval > 0 else IDLE_TIMEOUT
+                if now - entry.arrived > timeout:
+                    if entry.idle:
+                        continue
+                    entry.idle = True   # 멈춘 ID 는 rate 0 으로 한 번만 알려 줍니다.
+                    rate = 0.0
+                elif delta or entry.idle:
+                    entry.idle = False
+                    rate = 1.0 / entry.interval if entry.interval > 0 else 0.0
+                else:
+                    continue
+                rows.append(TraceRow(is_rx, frame_id, entry.count, rate, entry.timestamp, bytes(entry.data)))
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stop(self):
+        pass
@@ -0,0 +1,276 @@
+import json
+import multiprocessing
+import queue
+import random
+import time
+from typing import NamedTuple, Optional
+
+import can
+import numpy as np
+
+import dbccache
+from canframe import CompiledFrame
+from e2e import to_raw, e2e_signals
+
+# =========================== 설정/결과 ===========================
+class FuzzConfig(NamedTuple):
+    dbc_path: str
+    interface: str
+    channel: str
+    bitrate: int = 500000
+    messages: tuple = ()            # 퍼징할 메시지 이름 (비우면 DBC 의 모든 비멀티플렉스 메시지)
+    duration: float = 60.0
+    repeat: int = 3                 # 한 변이를 몇 프레임 연속 보낼지 (ECU 디바운스 대비)
+    period: float = 0.0             # 프레임 간격(초), 0 이면 버스가 받아 주는 만큼 빠르게
+    reaction_window: float = 0.05   # 변이의 마지막 프레임 뒤 ECU 반응을 기다리는 시간(초). 점수는 이 창까지 봅니다.
+    corpus_bias: float = 0.7        # 반응을 일으킨 변이를 다시 변형할 확률
+    warmup: float = 1.0             # 시작 전 평상시 RX 를 관찰하는 시간(초)
+    seed: Optional[int] = None
+    bus_kwargs: dict = {}
+
+class Finding(NamedTuple):
+    message: str
+    mutation: dict                  # {신호 이름: raw 값}
+    new_coverage: int               # 새로 관찰된 (ID, 바이트 위치, 값) 개수
+    rx_ids: tuple                   # 새 반응이 나온 수신 ID
+
+# =========================== 신호 단위 변이 ===========================
+class SignalMutator:
+    """DBC 범위 안쪽, 경계, 바로 바깥, VAL_ 테이블 값, 비트 폭 극값을 raw 값으로 만들어 냅니다."""
+    def __init__(self, signal):
+        self.name = signal.name
+        if signal.is_signed:
+            self.raw_min, self.raw_max = -(1 << (signal.length - 1)), (1 << (signal.length - 1)) - 1
+        else:
+            self.raw_min, self.raw_max = 0, (1 << signal.length) - 1
+        lo = to_raw(signal, signal.minimum) if signal.minimum is not None else self.raw_min
+        hi = to_raw(signal, signal.maximum) if signal.maximum is not None else self.raw_max
+        lo, hi = sorted((lo, hi))
+        self.lo = max(lo, self.raw_min)
+        self.hi = min(hi, self.raw_max)
+        choices = signal.choices or {}
+        self.choices = [int(v) for v in choices]
+        edges = {self.lo, self.hi, self.lo - 1, self.hi + 1, self.raw_min, self.raw_max}
+        self.edges = sorted(v for v in edges if self.raw_min <= v <= self.raw_max)
+
+    def initial(self) -> int:
+        return self.lo if self.lo <= 0 <= self.hi else min(max(0, self.lo), self.hi)
+
+    def mutate(self, rng: random.Random, current: int) -> int:
+        r = rng.random()
+        if r < 0.3:
+            return rng.randint(self.lo, self.hi)                 # 범위 안 임의 값
+        if r < 0.55:
+            return rng.choice(self.edges)                       # 경계 / 바로 바깥 / 극값
+        if r < 0.75 and self.choices:
+            return rng.choice(self.choices)
+        if r < 0.9:
+            step = rng.choice((-1, 1))
+            return min(max(current + step, self.raw_min), self.raw_max)
+        return rng.randint(self.raw_min, self.raw_max)          # 비트 폭 전체
+
+# =========================== 수신 반응 커버리지 ===========================
+class ReactionMap:
+    """수신 ID 별 (바이트 위치, 값) 관찰 여부. 처음 보는 조합이 나오면 새 반응으로 봅니다.
+
+    카운터/CRC 처럼 평소에도 바뀌는 바이트는 워밍업 동안 채워지므로 이후에는 점수에 거의 기여하지 않습니다.
+    """
+    def __init__(self, ignore_ids=()):
+        self.ignore = set(ignore_ids)
+        self.seen = {}
+
+    def observe(self, msg: can.Message) -> int:
+        if msg.arbitration_id in self.ignore or msg.is_error_frame:
+            return 0
+        table = self.seen.get(msg.arbitration_id)
+        new = 0
+        if table is None:
+            table = self.seen[msg.arbitration_id] = np.zeros((64, 256), dtype=bool)
+            new = 1
+        data = np.frombuffer(bytes(msg.data), dtype=np.uint8)
+        idx = np.arange(len(data))
+        fresh = ~table[idx, data]
+        if fresh.any():
+            table[idx, data] = True
+            new += int(fresh.sum())
+        return new
+
+    def drain(self, bus, until: float = 0.0) -> tuple:
+        """time.monotonic() 기준 until 까지 수신을 관찰합니다. (지났으면 이미 쌓인 프레임만 읽습니다)"""
+        new, ids = 0, set()
+        while True:
+            msg = bus.recv(timeout=max(until - time.monotonic(), 0.0))
+            if msg is None:
+                return new, ids
+            n = self.observe(msg)
+            if n:
+                new += n
+                ids.add(msg.arbitration_id)
+
+# =========================== 퍼저 ===========================
+class Fuzzer:
+    """CRC / Alive Counter 를 항상 올바르게 채우면서 신호 값을 변이하는 상태 유지 퍼저
+
+    새 반응을 일으킨 변이는 corpus 에 들어가고, 이후 corpus_bias 확률로 그 변이를 다시 변형해서 보냅니다.
+    """
+    def __init__(self, db, bus, names, config: FuzzConfig, ignore_ids=()):
+        self.bus = bus
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.targets = []
+        for name in names:
+            message = db.get_message_by_name(name)
+            crc, counter = e2e_signals(message)
+            frame = CompiledFrame(message, crc, counter, is_extended_id=message.is_extended_frame)
+            mutators = {s.name: SignalMutator(s) for s in message.signals if s.name not in (crc, counter)}
+            base = {name: m.initial() for name, m in mutators.items()}
+            for signal, raw in base.items():
+                frame.set_raw(signal, raw)
+            if mutators:
+                self.targets.append((name, frame, mutators, base))
+        self.reactions = ReactionMap(ignore_ids)
+        self.corpus = []            # (Finding, 점수)
+        self.sent = 0
+
+    def _next_mutation(self):
+        if self.corpus and self.rng.random() < self.config.corpus_bias:
+            weights = [score for _, score in self.corpus]
+            parent, _ = self.rng.choices(self.corpus, weights=weights)[0]
+            target = next(t for t in self.targets if t[0] == parent.message)
+            mutation = dict(parent.mutation)
+        else:
+            target = self.rng.choice(self.targets)
+            mutation = {}
+        _, _, mutators, base = target
+        for signal in self.rng.sample(list(mutators), k=min(len(mutators), self.rng.randint(1, 3))):
+            mutation[signal] = mutators[signal].mutate(self.rng, mutation.get(signal, base[signal]))
+        return target, mutation
+
+    def step(self) -> Optional[Finding]:
+        (name, frame, _, base), mutation = self._next_mutation()
+        for signal, raw in mutation.items():
+            frame.set_raw(signal, raw)
+        new, ids = 0, set()
+        for k in range(self.config.repeat):
+            self.bus.send(frame.build())
+            if frame.has_counter:
+                frame.advance_counter()
+            self.sent += 1
+            # 다음 프레임(또는 다음 변이)까지 수신을 관찰해서 ECU 반응이 뒤 변이에 잘못 매겨지지 않게 합니다.
+            wait = self.config.period
+            if k == self.config.repeat - 1:
+                wait = max(wait, self.config.reaction_window)
+            n, i = self.reactions.drain(self.bus, time.monotonic() + wait)
+            new += n
+            ids |= i
+        for signal in mutation:
+            frame.set_raw(signal, base[signal])
+        if not new:
+            return None
+        finding = Finding(name, mutation, new, tuple(sorted(ids)))
+        self.corpus.append((finding, new))
+        return finding
+
+    def warmup(self, seconds: float):
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            msg = self.bus.recv(timeout=0.05)
+            if msg is not None:
+                self.reactions.observe(msg)
+
+    def run(self, duration: float, on_finding=None):
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            finding = self.step()
+            if finding is not None and on_finding is not None:
+                on_finding(finding)
+
+# =========================== 다중 프로세스 실행 ===========================
+def _open_bus(config: FuzzConfig):
+    return can.interface.Bus(interface=config.interface, channel=config.channel, bitrate=config.bitrate,
+                             **config.bus_kwargs)
+
+def _select_messages(db, config: FuzzConfig):
+    if config.messages:
+        return list(config.messages)
+    return [m.name for m in db.messages if not m.is_multiplexed()]
+
+def _worker(config: FuzzConfig, names, ignore_ids, results):
+    bus = None
+    try:
+        db = dbccache.load_file(config.dbc_path)
+        bus = _open_bus(config)
+        fuzzer = Fuzzer(db, bus, names, config, ignore_ids)
+        fuzzer.warmup(config.warmup)
+        fuzzer.run(config.duration, on_finding=lambda f: results.put(('finding', f)))
+        results.put(('done', fuzzer.sent))
+    except Exception as e:
+        results.put(('error', f"{names}: {e}"))
+        results.put(('done', 0))
+    finally:
+        if bus:
+            bus.shutdown()
+
+def run_parallel(config: FuzzConfig, workers: int = 1, on_finding=None):
+    """메시지를 워커 프로세스에 나눠 퍼징합니다. 워커마다 버스를 따로 열므로
+
+    채널을 여러 번 열 수 있는 인터페이스(socketcan, virtual 등)에서 workers > 1 을 쓰세요.
+    (slcan 처럼 포트를 하나만 열 수 있는 장치는 workers=1)
+    """
+    db = dbccache.load_file(config.dbc_path)
+    names = _select_messages(db, config)
+    ignore_ids = [db.get_message_by_name(n).frame_id for n in names]
+    workers = max(1, min(workers, len(names)))
+    groups = [names[i::workers] for i in range(workers)]
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_worker, args=(config, group, ignore_ids, results), daemon=True)
+             for group in groups]
+    for p in procs:
+        p.start()
+    findings, sent, done = [], 0, 0
+    while done < len(procs):
+        try:
+            kind, value = results.get(timeout=0.5)
+        except queue.Empty:
+            # 'done' 을 보내지 못하고 죽은 워커(import 실패, 강제 종료 등)를 기다리느라 멈추지 않도록 합니다.
+            if not any(p.is_alive() for p in procs):
+                print(f"❌ 퍼저 워커 {len(procs) - done}개가 결과 없이 종료되었습니다.")
+                break
+            continue
+        if kind == 'finding':
+            findings.append(value)
+            if on_finding is not None:
+                on_finding(value)
+        elif kind == 'error':
+            print(f"❌ 퍼저 워커 오류: {value}")
+        else:
+            done += 1
+            sent += value
+    for p in procs:
+        p.join()
+    return findings, sent
+
+def main():
+    # ============================ 사용자 설정 ============================
+    DBC_FILE_PATH = "Temp_DBC.dbc"
+    CAN_INTERFACE = "slcan"
+    CHANNEL = "COM14"
+    BITRATE = 500000
+    MESSAGES = ('BCM_07_200ms', 'BCM_08_200ms', 'ICU_04_200ms')
+    DURATION = 60.0
+    REACTION_WINDOW = 0.05  # 변이마다 ECU 반응을 기다리는 시간(초)
+    WORKERS = 1
+    OUT_FILE = "fuzz_findings.json"
+    # =================================================================
+
+    config = FuzzConfig(DBC_FILE_PATH, CAN_INTERFACE, CHANNEL, BITRATE, MESSAGES, DURATION,
+                        reaction_window=REACTION_WINDOW)
+    findings, sent = run_parallel(
+        config, WORKERS,
+        on_finding=lambda f: print(f"🎯 {f.message} {f.mutation} -> 새 반응 {f.new_coverage} (RX {[hex(i) for i in f.rx_ids]})"))
+    with open(OUT_FILE, 'w', encoding='utf-8') as f:
+        json.dump([fd._asdict() for fd in findings], f, ensure_ascii=False, indent=2)
+    print(f"✅ {sent}개 프레임 전송, 반응 {len(findings)}건을 {OUT_FILE} 에 저장했습니다.")
+
+if __name__ == "__main__":
+    main()
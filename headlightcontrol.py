@@ -1,26 +1,49 @@
 import can
-import cantools
-import time
+import dbccache
 from typing import Dict, Any
+from canframe import CompiledFrame
+from cyclic import CyclicManager, CyclicTask
+from scenario import ScenarioRunner, load_scenarios, print_result
 
 class CANMessageSender:
     # (이전과 동일한 CANMessageSender 클래스 내용)
     def __init__(self, dbc_file_path: str, can_interface: str, channel: str, bitrate: int):
         try:
-            self.db = cantools.database.load_file(dbc_file_path)
+            self.db = dbccache.load_file(dbc_file_path)
             print(f"✅ DBC 파일 로드 성공: {dbc_file_path}")
             self.bus = can.interface.Bus(channel=channel, interface=can_interface, bitrate=bitrate)
             print(f"✅ CAN 버스 초기화 성공: {can_interface} on {channel} @ {bitrate}bps")
         except Exception as e:
             print(f"❌ 초기화 오류: {e}")
             raise
+        self._compiled: Dict[tuple, CompiledFrame] = {}
+        # 인터페이스가 지원하면 드라이버 주기 전송, 아니면 스케줄러 스레드로 보냅니다.
+        self.cyclic = CyclicManager(self.bus, on_error=lambda name, e: print(f"❌ '{name}' 주기 전송 중 오류: {e}"))
     
+    def compile(self, message_name: str, crc_signal: str = None, counter_signal: str = None) -> CompiledFrame:
+        """메시지를 한 번만 해석해서 재사용 가능한 전송 템플릿으로 만듭니다."""
+        key = (message_name, crc_signal, counter_signal)
+        frame = self._compiled.get(key)
+        if frame is None:
+            frame = CompiledFrame(self.db.get_message_by_name(message_name), crc_signal, counter_signal,
+                                  is_extended_id=False)
+            self._compiled[key] = frame
+        return frame
+
+    def send_compiled(self, frame: CompiledFrame) -> bool:
+        try:
+            self.bus.send(frame.build())
+            return True
+        except Exception as e:
+            print(f"❌ '{frame.name}' 전송 중 오류: {e}")
+            return False
+
     def send_message(self, message_name: str, signal_values: Dict[str, Any]) -> bool:
+        """signal_values 에 없는 신호는 이전 전송 값(처음에는 0)을 유지합니다."""
         try:
-            message = self.db.get_message_by_name(message_name)
-            data = message.encode(signal_values)
-            can_msg = can.Message(arbitration_id=message.frame_id, data=data, is_extended_id=False)
-            self.bus.send(can_msg)
+            frame = self.compile(message_name)
+            frame.update(signal_values)
+            self.bus.send(frame.build())
             return True
         except Exception as e:
             if isinstance(e, KeyError):
@@ -29,7 +52,20 @@ class CANMessageSender:
                 print(f"❌ '{message_name}' 전송 중 오류: {e}")
             return False
     
+    def start_cyclic(self, message_name: str, period: float, crc_signal: str = None, counter_signal: str = None,
+                     signal_values: Dict[str, Any] = None, modifier=None) -> CyclicTask:
+        """메시지를 주기 전송으로 등록합니다. modifier(frame) 은 주기마다 호출되어 신호를 바꿀 수 있습니다."""
+        frame = self.compile(message_name, crc_signal, counter_signal)
+        if signal_values:
+            frame.update(signal_values)
+        return self.cyclic.add(message_name, frame, period, modifier)
+
+    def update_cyclic(self, message_name: str, signal_values: Dict[str, Any]) -> None:
+        self.cyclic.update(message_name, signal_values)
+
     def close(self) -> None:
+        if hasattr(self, 'cyclic'):
+            self.cyclic.stop()
         if hasattr(self, 'bus') and self.bus is not None:
             self.bus.shutdown()
             print("✅ CAN 버스 연결이 안전하게 종료되었습니다.")
@@ -42,16 +78,38 @@ class CANMessageSender:
 
 def main():
     """
-    메인 실행 함수: 여러 필수 메시지를 함께 전송하여 버스를 활성화하고,
+    메인 실행 함수: 여러 필수 메시지를 함께 주기 전송하여 버스를 활성화하고,
     '최종 수정된 신호 이름'으로 오른쪽 방향지시등 점등을 테스트합니다.
+    SCENARIO_FILES 를 주면 기본 시나리오 대신 파일의 시나리오들을 DBC/버스를 다시 열지 않고 연달아 실행합니다.
     """
     # ============================ 사용자 설정 ============================
     DBC_FILE_PATH = "Temp_DBC.dbc"
     CAN_INTERFACE = "slcan"
     CHANNEL = "COM14"
     BITRATE = 500000
+    SCENARIO_FILES = []     # JSON/YAML 시나리오 파일 (비우면 아래 기본 시나리오)
+    DURATION = 3600.0       # 기본 시나리오 주기 전송 시간(초)
     # =================================================================
 
+    # Alive Counter/CRC 는 시나리오 컴파일 때 카운터 한 바퀴 분량을 미리 계산해 둡니다.
+    default_scenario = {
+        "name": "right_turn_default",
+        "duration": DURATION,
+        "cyclic": [
+            {"message": "BCM_07_200ms", "period": 0.2, "signals": {
+                'Lamp_DedicatedDrlOnReq': 0, 'Lamp_HiPrioHzrdReq': 0, 'Lamp_LoPrioHzrdReq': 0,
+                'Lamp_IntTailLmpOnReq': 0, 'Lamp_ExtrnlTailLmpOnReq': 0, 'Lamp_HdLmpLoOnReq': 0,
+                'Lamp_HdLmpHiOnReq': 0, 'Lamp_AvTailLmpSta': 0, 'Lamp_ExtrnlLpWlcmSta': 0}},
+            {"message": "ICU_04_200ms", "period": 0.2, "signals": {
+                'ExtLamp_TrnSigLmpLftBlnkngSta': 0, 'ExtLamp_TrnSigLmpRtBlnkngSta': 0,
+                'ExtLamp_ExtrnlTailLmpSta': 0, 'ExtLamp_HzrdSwSta': 0, 'ExtLamp_RrFgLmpSta': 0,
+                'IntLamp_InlTailLmpSta': 0, 'Lamp_TrnSigLmpLftOnReq': 0, 'Lamp_TrnSigLmpRtOnReq': 0}},
+            {"message": "BCM_08_200ms", "period": 0.2, "signals": {
+                'Lamp_HbaCtrlModTyp': 0, 'Lamp_IFSCtrlModTyp': 3, 'Lamp_RrFogLmpOnReq': 0,
+                'Lamp_TailLmpWlcmCmd': 0, 'Lamp_HdLmpWlcmCmd': 0, 'Lamp_PuddleLmpOnReq': 0}},
+        ],
+    }
+
     try:
         with CANMessageSender(DBC_FILE_PATH, CAN_INTERFACE, CHANNEL, BITRATE) as sender:
             print("\n" + "="*50)
@@ -59,44 +117,13 @@ def main():
             print("프로그램을 중지하려면 Ctrl+C를 누르세요.")
             print("="*50 + "\n")
 
-            bcm_07_signals = {
-                'BCM_Crc7Val': 171, 'BCM_AlvCnt7Val': 3, 'Lamp_DedicatedDrlOnReq': 0,
-                'Lamp_HiPrioHzrdReq': 0, 'Lamp_LoPrioHzrdReq': 0, 'Lamp_IntTailLmpOnReq': 0,
-                'Lamp_ExtrnlTailLmpOnReq': 0, 'Lamp_HdLmpLoOnReq': 0, 'Lamp_HdLmpHiOnReq': 0,
-                'Lamp_AvTailLmpSta': 0, 'Lamp_ExtrnlLpWlcmSta': 0
-            }
-            
-            icu_04_signals = {
-                'ExtLamp_TrnSigLmpLftBlnkngSta': 0,
-                'ExtLamp_TrnSigLmpRtBlnkngSta': 0,
-                'ExtLamp_ExtrnlTailLmpSta': 0,
-                'ExtLamp_HzrdSwSta': 0,
-                'ExtLamp_RrFgLmpSta': 0,
-                'IntLamp_InlTailLmpSta': 0,
-                'Lamp_TrnSigLmpLftOnReq': 0,      
-                'Lamp_TrnSigLmpRtOnReq': 0      
-            }
-
-            bcm_08_signals = {
-                'BCM_Crc8Val': 0, 'BCM_AlvCnt8Val': 0, 'Lamp_HbaCtrlModTyp': 0,
-                'Lamp_IFSCtrlModTyp': 3, 'Lamp_RrFogLmpOnReq': 0, 'Lamp_TailLmpWlcmCmd': 0,
-                'Lamp_HdLmpWlcmCmd': 0, 'Lamp_PuddleLmpOnReq': 0
-            }
-
-            counter = 3
-            while True:
-                bcm_07_signals['BCM_AlvCnt7Val'] = counter
-                sender.send_message('BCM_07_200ms', bcm_07_signals)
-                
-                sender.send_message('ICU_04_200ms', icu_04_signals)
-                
-                bcm_08_signals['BCM_AlvCnt8Val'] = counter % 8
-                sender.send_message('BCM_08_200ms', bcm_08_signals)
-
-                print(f"\r✅ 3개 메시지 동시 전송 성공! | RightTurnReq: {icu_04_signals['Lamp_TrnSigLmpRtOnReq']}", end="")
-                
-                counter = (counter + 1) % 16
-                time.sleep(0.2)
+            scenarios = [s for path in SCENARIO_FILES for s in load_scenarios(path)] or [default_scenario]
+            runner = ScenarioRunner(sender.db, sender.bus.send, sender.bus)
+            try:
+                results = runner.run_all(scenarios, on_result=print_result)
+                print(f"\n🏁 {sum(r.passed for r in results)}/{len(results)} 시나리오 통과")
+            finally:
+                runner.close()
                 
     except KeyboardInterrupt:
         print("\n\n⏹️ 사용자가 전송을 중단했습니다.")
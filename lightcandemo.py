@@ -1,7 +1,8 @@
 import can
-import cantools
-import time
-import threading
+import dbccache
+from scheduler import PeriodicScheduler
+from txqueue import TxWorker
+from scenario import ScenarioRunner, load_scenarios, print_result
 
 CAN_CHANNEL = 'COM14'  #장치관리자 확인하고 수정하세요 탄지로군
 CAN_BITRATE = 500000
@@ -33,31 +34,34 @@ class BenchController:
             channel=channel,
             bitrate=bitrate,
         )
-        self.db = cantools.database.load_string(DBC_STRING)
-        self.run_wakeup_thread = True
-        
-        self.wakeup_thread = threading.Thread(target=self._send_wakeup_messages, daemon=True)
-        self.wakeup_thread.start()
+        self.db = dbccache.load_string(DBC_STRING, label=MESSAGE_NAME)
+
+        # 깨우기 작업과 메인 스레드가 버스를 동시에 쓰지 않도록 전송은 모두 TxWorker 큐를 거칩니다.
+        self.tx = TxWorker(self.bus, on_error=lambda msg, e: print(f"메시지 전송 실패: {e}"))
+        self.tx.start()
+
+        # IGN ON 신호는 절대 목표 시각 기준 100ms 주기로 전송합니다.
+        self.scheduler = PeriodicScheduler(on_error=lambda name, e: print(f"메시지 전송 실패 ({name}): {e}"))
+        self._send_wakeup_messages()
+        self.scheduler.start()
         
         print(f"컨트롤러가 '{channel}' 채널({interface} 타입)에서 초기화되었습니다.")
 
     def _send_wakeup_messages(self):
-        print("⚡️ ECU 깨우기 스레드 시작 (IGN ON 신호 주기적 전송)")
+        print("⚡️ ECU 깨우기 작업 등록 (IGN ON 신호 주기적 전송)")
         msg = self.db.get_message_by_name(MESSAGE_NAME)
-        signals = {'CF_Gway_IGNSw': 2}
+        signals = {s.name: 0 for s in msg.signals}     # encode 는 모든 신호 값을 요구합니다.
+        signals['CF_Gway_IGNSw'] = 2
         data = msg.encode(signals)
-        message = can.Message(arbitration_id=msg.frame_id, data=data)
-        
-        while self.run_wakeup_thread:
-            self.bus.send(message)
-            time.sleep(0.1)
+        message = can.Message(arbitration_id=msg.frame_id, is_extended_id=msg.is_extended_frame, data=data)
+        self.scheduler.add('CGW1_wakeup', 0.1, lambda: self.tx.submit(message))
 
     def _send_control_message(self, signals):
         try:
             msg = self.db.get_message_by_name(MESSAGE_NAME)
             data = msg.encode(signals)
-            message = can.Message(arbitration_id=msg.frame_id, data=data)
-            self.bus.send(message)
+            message = can.Message(arbitration_id=msg.frame_id, is_extended_id=msg.is_extended_frame, data=data)
+            self.tx.submit(message)
         except Exception as e:
             print(f"메시지 전송 실패: {e}")
 
@@ -88,12 +92,40 @@ class BenchController:
         self._send_control_message(signals)
 
     def shutdown(self):
-        self.run_wakeup_thread = False
-        self.wakeup_thread.join()
+        self.scheduler.stop()
+        print(f"⏱️ 깨우기 주기 지터: {self.scheduler.stats().get('CGW1_wakeup')}")
+        self.tx.stop()
+        print(f"📤 전송 큐: {self.tx.stats}")
         self.bus.shutdown()
         print("CAN 버스 연결 종료")
 
+def _lights(light_state="Off", turn_signal="Off"):
+    """set_lights 와 같은 규칙으로 CGW1 신호 값을 만듭니다. (시나리오 step 용)"""
+    low, high = {"Low_Beam": (1, 0), "High_Beam": (1, 1)}.get(light_state, (0, 0))
+    left, right = {"Left": (1, 0), "Right": (0, 2)}.get(turn_signal, (0, 0))
+    return {'CF_Gway_IGNSw': 2, 'CF_Gway_HeadLampLow': low, 'CF_Gway_HeadLampHigh': high,
+            'CF_Gway_TurnSigLh': left, 'CF_Gway_TurnSigRh': right}
+
+DEMO_SCENARIO = {
+    "name": "lightcandemo",
+    "duration": 13.0,
+    "steps": [
+        {"at": 0.0, "log": "[1단계] 하향등 켜기"},
+        {"at": 0.0, "message": MESSAGE_NAME, "signals": _lights("Low_Beam")},
+        {"at": 3.0, "log": "[2단계] 좌측 방향지시등 추가"},
+        {"at": 3.0, "message": MESSAGE_NAME, "signals": _lights("Low_Beam", "Left")},
+        {"at": 6.0, "log": "[3단계] 우측 방향지시등으로 변경"},
+        {"at": 6.0, "message": MESSAGE_NAME, "signals": _lights("Low_Beam", "Right")},
+        {"at": 9.0, "log": "[4단계] 상향등 켜기"},
+        {"at": 9.0, "message": MESSAGE_NAME, "signals": _lights("High_Beam", "Off")},
+        {"at": 12.0, "log": "[5단계] 모든 조명 끄기"},
+        {"at": 12.0, "message": MESSAGE_NAME, "signals": _lights("Off", "Off")},
+    ],
+}
+
 if __name__ == "__main__":
+    # 다른 시퀀스는 JSON/YAML 시나리오 파일로 만들어 scenario.load_scenarios() 로 읽어 넘기면 됩니다.
+    SCENARIO_FILE = None
     controller = None
     try:
         controller = BenchController(
@@ -102,27 +134,12 @@ if __name__ == "__main__":
             bitrate=CAN_BITRATE
         )
 
-        
-        print("\n[1단계] 하향등 켜기")
-        controller.set_lights(light_state="Low_Beam")
-        time.sleep(3)
-
-        print("\n[2단계] 좌측 방향지시등 추가")
-        controller.set_lights(light_state="Low_Beam", turn_signal="Left")
-        time.sleep(3)
-        
-        print("\n[3단계] 우측 방향지시등으로 변경")
-        controller.set_lights(light_state="Low_Beam", turn_signal="Right")
-        time.sleep(3)
-        
-        print("\n[4단계] 상향등 켜기")
-        controller.set_lights(light_state="High_Beam", turn_signal="Off")
-        time.sleep(3)
-        
-        print("\n[5단계] 모든 조명 끄기")
-        controller.set_lights(light_state="Off", turn_signal="Off")
+        scenarios = load_scenarios(SCENARIO_FILE) if SCENARIO_FILE else [DEMO_SCENARIO]
+        # 깨우기 주기 전송과 같은 버스를 쓰므로 시나리오 프레임도 TxWorker 큐로 보냅니다.
+        runner = ScenarioRunner(controller.db, controller.tx.submit)
+        for result in runner.run_all(scenarios):
+            print_result(result)
         print("\n--- 시퀀스 종료 ---")
-        time.sleep(1)
 
     except Exception as e:
         print(f"\n스크립트 실행 중 오류 발생: {e}")
@@ -1,70 +1,273 @@
 import tkinter as tk
-from tkinter import ttk, filedialog, scrolledtext
+from tkinter import ttk, filedialog
 import can
-import cantools
-import time
-import threading
-import crcmod
-
-# =========================== CRC-8 계산 함수 ===========================
-try:
-    crc8_func = crcmod.mkCrcFun(0x11D, initCrc=0xFF, rev=True, xorOut=0xFF)
-except NameError:
-    print("WARNING: crcmod is not installed. CRC calculations will fail.")
-    crc8_func = lambda data: 0
-
-def calculate_message_crc(message: cantools.database.can.Message, signal_values: dict, crc_signal_name: str) -> int:
-    temp_signals = signal_values.copy()
-    if crc_signal_name in temp_signals:
-        temp_signals[crc_signal_name] = 0
-    try:
-        encoded_data = message.encode(temp_signals)
-    except Exception as e:
-        print(f"CRC 인코딩 오류 ({message.name}): {e}")
-        encoded_data = b'\x00' * message.length
-    return crc8_func(encoded_data)
+import dbccache
+from e2e import GV80_CRC8
+from canframe import CompiledFrame
+from cyclic import CyclicManager, CyclicTask
+from txqueue import TxWorker
+from recorder import Recorder
+from frametrace import FrameTrace
+import canengine
+from channels import open_bus
+from tkviews import LogView, TraceTable
+
+CYCLE_TIME = 0.2  # ICU_04 / BCM_07 / BCM_08 전송 주기 (200ms)
+RECORD_DIR = None  # TX/RX 프레임을 기록할 디렉터리 (None: 기록 안 함)
+MIN_GAP = 0.005  # 버튼으로 즉시 보낼 때 같은 메시지 프레임 사이 최소 간격 (5ms)
+ENGINE_POLL_MS = 50  # GUI 가 엔진 프로세스의 로그/통계를 가져오는 간격
+STATS_INTERVAL = 0.25  # 엔진이 통계와 프레임 표 변경분을 보내는 간격 (프레임 표 갱신 주기)
+LOG_MAX_LINES = 2000  # 로그 창에 남겨 둘 최대 줄 수
+LOG_FLUSH_MS = 100  # 로그를 모아서 화면에 그리는 간격
+KEEP_ENGINE_ON_CLOSE = False  # True: 창을 닫아도 엔진 프로세스는 마지막 상태로 계속 전송 (SIGTERM 으로 종료)
 
 # ============================ CAN 메시지 클래스 ============================
 class CANMessageSender:
-    def __init__(self, dbc_file_path: str, can_interface: str, channel: str, bitrate: int):
-        self.db = cantools.database.load_file(dbc_file_path)
-        
-        if can_interface == 'gs_usb':
-            try:
-                final_channel = int(channel)
-            except ValueError:
-                print(f"Warning: gs_usb channel '{channel}' is not an integer. Defaulting to 0.")
-                final_channel = 0
-        else:
-            final_channel = channel
-
-        self.bus = can.interface.Bus(channel=final_channel, interface=can_interface, bitrate=bitrate)
+    def __init__(self, dbc_file_path: str, can_interface: str, channel: str, bitrate: int, record_dir: str = None,
+                 trace: bool = False):
+        self.db = dbccache.load_file(dbc_file_path)
+        # gs_usb 채널 인덱스 처리 등 인터페이스별 차이는 channels.open_bus 가 맞춥니다.
+        self.bus = open_bus(can_interface, channel, bitrate)
+        self._compiled = {}
+        # record_dir 을 주면 보낸 프레임(TX 워커)과 받은 프레임(Notifier)을 컬럼 파일로 기록합니다.
+        self.recorder = Recorder(record_dir) if record_dir else None
+        # trace=True 이면 ID 별 TX/RX 개수와 마지막 값을 집계합니다. (GUI 프레임 표용)
+        self.trace = FrameTrace() if trace else None
+        listeners = [listener for listener in (self.recorder, self.trace) if listener is not None]
+        self.notifier = can.Notifier(self.bus, listeners) if listeners else None
+        def on_sent(msg):
+            for listener in listeners:
+                listener.append(msg, is_rx=False)
+        # 버스에는 TxWorker 스레드만 bus.send 를 호출하고, 나머지는 모두 전송 큐에 넣습니다.
+        self.tx = TxWorker(self.bus, on_sent=on_sent if listeners else None)
+        self.tx.start()
+        # 인터페이스가 지원하면 드라이버 주기 전송, 아니면 스케줄러 스레드로 보냅니다.
+        self.cyclic = CyclicManager(self.bus, send=lambda msg: self.tx.submit(msg, copy=True))
     
+    def compile(self, message_name: str, crc_signal: str = None, counter_signal: str = None) -> CompiledFrame:
+        """메시지를 한 번만 해석해서 재사용 가능한 전송 템플릿으로 만듭니다."""
+        key = (message_name, crc_signal, counter_signal)
+        frame = self._compiled.get(key)
+        if frame is None:
+            frame = CompiledFrame(self.db.get_message_by_name(message_name), crc_signal, counter_signal,
+                                  is_extended_id=False, crc_func=GV80_CRC8)
+            self._compiled[key] = frame
+        return frame
+
+    def send_compiled(self, frame: CompiledFrame, priority: int = None):
+        self.tx.submit(frame.build(), priority, copy=True)
+
     def send_message(self, message_name: str, signal_values: dict):
-        message = self.db.get_message_by_name(message_name)
-        data = message.encode(signal_values)
-        can_msg = can.Message(arbitration_id=message.frame_id, data=data, is_extended_id=False)
-        self.bus.send(can_msg)
-    
+        """signal_values 에 없는 신호는 이전 전송 값(처음에는 0)을 유지합니다."""
+        frame = self.compile(message_name)
+        frame.update(signal_values)
+        self.tx.submit(frame.build(), copy=True)
+
+    def start_cyclic(self, message_name: str, period: float, crc_signal: str = None, counter_signal: str = None,
+                     signal_values: dict = None, modifier=None, on_change: bool = False,
+                     min_gap: float = MIN_GAP) -> CyclicTask:
+        """메시지를 주기 전송으로 등록합니다. modifier(frame) 은 주기마다 호출되어 신호를 바꿀 수 있습니다.
+        on_change=True 이면 trigger_cyclic() 으로 주기를 기다리지 않고 바로 보낼 수 있습니다."""
+        frame = self.compile(message_name, crc_signal, counter_signal)
+        if signal_values:
+            frame.update(signal_values)
+        return self.cyclic.add(message_name, frame, period, modifier, on_change, min_gap)
+
+    def update_cyclic(self, message_name: str, signal_values: dict):
+        self.cyclic.update(message_name, signal_values)
+
+    def trigger_cyclic(self, message_name: str, signal_values: dict = None) -> float:
+        """신호를 바꾸고 바로 한 프레임을 보낸 뒤 주기 위상을 다시 맞춥니다. (cyclic + on-change)"""
+        return self.cyclic.trigger(message_name, signal_values)
+
     def close(self):
+        self.cyclic.stop()
+        self.tx.stop()
+        if self.notifier is not None:
+            self.notifier.stop()    # recorder/trace 도 함께 닫힙니다.
         if self.bus is not None:
             self.bus.shutdown()
 
+# ============================ 램프 제어 엔진 ============================
+class LampEngine:
+    """버스 연결, ICU_04 / BCM_07 / BCM_08 주기 전송, 램프 상태를 가진 송신 엔진
+
+    GUI 는 canengine.EngineProcess(LampEngine) 로 이 엔진을 별도 프로세스에서 돌리고 메서드 이름으로 명령만 보냅니다.
+    (GUI 없이 같은 프로세스에서 직접 만들어 써도 됩니다. 예: bench.py)
+    log(text) 는 엔진 프로세스에서 GUI 로그로 보내는 함수입니다.
+    """
+    def __init__(self, log=print):
+        self.log = log
+        self.sender = None
+        self.is_sending = False
+
+        self.turn_signal_state = None
+        self.blink_state = False
+
+        self.is_low_beam_on = False
+        self.is_high_beam_on = False
+
+        self.is_ifs_on = False
+
+        self._failing = set()   # 전송 오류를 이미 알린 메시지. 다시 성공할 때까지 같은 오류는 로그에 남기지 않습니다.
+
+    # --- 연결 ---
+    def connect(self, dbc_file_path: str, can_interface: str, channel: str, bitrate: int, record_dir: str = None):
+        self.sender = CANMessageSender(dbc_file_path, can_interface, channel, bitrate, record_dir, trace=True)
+        self._failing.clear()
+        on_sent = self.sender.tx.on_sent
+        def on_sent_checked(msg):
+            if on_sent is not None:
+                on_sent(msg)
+            if self._failing:
+                self._on_send_ok(msg)
+        self.sender.tx.on_sent = on_sent_checked
+
+    def disconnect(self):
+        self.stop_sending()
+        if self.sender:
+            self.sender.close()
+            self.sender = None
+
+    # --- 주기 전송 ---
+    def start_sending(self, period: float = CYCLE_TIME) -> dict:
+        """세 메시지를 주기 전송으로 등록하고 메시지별 전송 방식(offload/scheduler)을 돌려줍니다."""
+        if self.is_sending:
+            return self.sender.cyclic.modes()
+        self._setup_cyclic_messages()
+        self.is_sending = True
+        # 버튼을 누르면 다음 200ms 주기를 기다리지 않고 바로 보내도록 세 메시지 모두 cyclic + on-change 로 등록합니다.
+        self.sender.cyclic.on_error = self._on_send_error
+        self.sender.tx.on_error = lambda msg, e: self._on_send_error(f"0x{msg.arbitration_id:X}", e)
+        self.sender.start_cyclic('ICU_04_200ms', period, modifier=self._modify_icu_04, on_change=True)
+        self.sender.start_cyclic('BCM_07_200ms', period, 'BCM_Crc7Val', 'BCM_AlvCnt7Val', self._bcm_07_signals(),
+                                 on_change=True)
+        self.sender.start_cyclic('BCM_08_200ms', period, 'BCM_Crc8Val', 'BCM_AlvCnt8Val', self._bcm_08_signals(),
+                                 on_change=True)
+        return self.sender.cyclic.modes()
+
+    def stop_sending(self):
+        if not self.is_sending:
+            return
+        self.is_sending = False
+        if self.sender:
+            self.sender.cyclic.stop()
+            for name, stats in self.sender.cyclic.stats().items():
+                self.log(f"⏱️ {name}: {stats}")
+            self.log(f"📤 전송 큐: {self.sender.tx.stats}")
+        self.log("⏹️ 주기적 메시지 전송을 중단했습니다.")
+
+    # --- 상태 변경 명령 ---
+    def set_turn_signal(self, state):
+        """state: None / 'right_blink' / 'right_solid_on'"""
+        self.turn_signal_state = state
+        # 깜빡임은 '켜짐' 위상부터 시작해서, 버튼을 누르자마자 나가는 즉시 전송 프레임이 점등 요청(2)이 되게 합니다.
+        self.blink_state = True
+        self._apply_cyclic('ICU_04_200ms')
+
+    def set_headlights(self, low: bool, high: bool):
+        self.is_low_beam_on = low
+        self.is_high_beam_on = high
+        self._apply_cyclic('BCM_07_200ms', self._bcm_07_signals())
+
+    def set_ifs(self, on: bool):
+        self.is_ifs_on = on
+        self._apply_cyclic('BCM_08_200ms', self._bcm_08_signals())
+
+    def stats(self) -> dict:
+        """GUI 상태 표시줄용 요약과 프레임 표 변경분 (프로세스 사이로 보내므로 숫자/TraceRow 만 담습니다)"""
+        if self.sender is None:
+            return {}
+        tx = self.sender.tx.stats
+        jitter = [s.max for s in self.sender.cyclic.stats().values() if s.count]
+        return {'sent': tx.sent, 'errors': tx.errors, 'max_depth': tx.max_depth,
+                'jitter_max': max(jitter) if jitter else 0.0, 'trace': self.sender.trace.changed()}
+
+    def close(self):
+        self.disconnect()
+
+    # --- 핵심 전송 루프 ---
+    def _setup_cyclic_messages(self):
+        # 메시지는 한 번만 컴파일하고, CRC 는 신호별 기여분 테이블로 바뀐 신호만큼만 갱신합니다.
+        self.icu_04 = self.sender.compile('ICU_04_200ms')
+        self.bcm_07 = self.sender.compile('BCM_07_200ms', 'BCM_Crc7Val', 'BCM_AlvCnt7Val')
+        self.bcm_08 = self.sender.compile('BCM_08_200ms', 'BCM_Crc8Val', 'BCM_AlvCnt8Val')
+        self.icu_04.update({
+            'Lamp_TrnSigLmpRtOnReq': 0, 'Lamp_TrnSigLmpLftOnReq': 0,
+            'ExtLamp_TrnSigLmpLftBlnkngSta': 0, 'ExtLamp_TrnSigLmpRtBlnkngSta': 0,
+            'ExtLamp_ExtrnlTailLmpSta': 0, 'ExtLamp_HzrdSwSta': 0,
+            'ExtLamp_RrFgLmpSta': 0, 'IntLamp_InlTailLmpSta': 0
+        })
+        self.bcm_07.update({
+            'Lamp_DedicatedDrlOnReq': 0, 'Lamp_HiPrioHzrdReq': 0,
+            'Lamp_LoPrioHzrdReq': 0, 'Lamp_IntTailLmpOnReq': 0,
+            'Lamp_ExtrnlTailLmpOnReq': 0, 'Lamp_AvTailLmpSta': 0,
+            'Lamp_ExtrnlLpWlcmSta': 0
+        })
+        self.bcm_08.update({
+            'Lamp_HbaCtrlModTyp': 0, 'Lamp_RrFogLmpOnReq': 0,
+            'Lamp_TailLmpWlcmCmd': 0, 'Lamp_HdLmpWlcmCmd': 0,
+            'Lamp_PuddleLmpOnReq': 0
+        })
+
+    def _on_send_error(self, name, e):
+        # 어댑터가 빠지면 200ms 마다 메시지마다 실패하므로 메시지별로 처음 한 번만 남깁니다.
+        if name in self._failing:
+            return
+        self._failing.add(name)
+        self.log(f"❌ 전송 루프 오류 ({name}): {e} (복구될 때까지 같은 오류는 표시하지 않습니다)")
+
+    def _on_send_ok(self, msg):
+        """실패했던 메시지가 다시 나가면 복구를 알리고 다음 오류를 다시 로그에 남기도록 합니다."""
+        names = {f"0x{msg.arbitration_id:X}"}
+        try:
+            names.add(self.sender.db.get_message_by_frame_id(msg.arbitration_id).name)
+        except KeyError:
+            pass
+        recovered = names & self._failing
+        if recovered:
+            self._failing -= recovered
+            self.log(f"✅ 전송 복구 ({', '.join(sorted(recovered))})")
+
+    def _apply_cyclic(self, message_name, signal_values=None):
+        """전송 중이면 바뀐 신호로 즉시 한 프레임을 보내고 주기 위상을 다시 맞춥니다. (카운터/CRC 는 이어서 진행)"""
+        if not self.is_sending:
+            return
+        try:
+            self.sender.trigger_cyclic(message_name, signal_values)
+        except Exception as e:
+            self.log(f"❌ {message_name} 갱신 실패: {e}")
+
+    # --- 1. 방향지시등(ICU_04_200ms): 주기마다 깜빡임 상태를 바꾸는 modifier ---
+    def _modify_icu_04(self, frame):
+        right_req = 0
+        if self.turn_signal_state == 'right_blink':
+            if self.blink_state: right_req = 2
+            self.blink_state = not self.blink_state
+        elif self.turn_signal_state == 'right_solid_on':
+            right_req = 2
+        frame.set('Lamp_TrnSigLmpRtOnReq', right_req)
+
+    # --- 2. 전조등(BCM_07_200ms) ---
+    def _bcm_07_signals(self):
+        return {
+            'Lamp_HdLmpLoOnReq': int(self.is_low_beam_on),
+            'Lamp_HdLmpHiOnReq': int(self.is_high_beam_on)
+        }
+
+    # --- 3. IFS 제어(BCM_08_200ms) ---
+    def _bcm_08_signals(self):
+        return {'Lamp_IFSCtrlModTyp': int(self.is_ifs_on)}
+
 # =============================== Tkinter GUI 애플리케이션 ===============================
 class CanControlApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("GV80 헤드램프 제어 (gs_usb Mode)")
-        self.geometry("600x720") 
+        self.geometry("760x820") 
 
-        # --- 상태 변수 ---
-        self.sender = None
-        self.is_sending = False
-        self.sending_thread = None
-        self.counter = 0
-        
-        self.turn_signal_state = None 
-        self.blink_state = False 
+        # --- 상태 변수 (실제 전송 상태는 엔진 프로세스의 LampEngine 이 가지고, 여기는 버튼 상태용) ---
+        self.engine = None
         
         self.is_low_beam_on = False
         self.is_high_beam_on = False
@@ -136,11 +339,20 @@ class CanControlApp(tk.Tk):
         self.headlights_off_button = ttk.Button(self.headlight_frame, text="끄기", command=self.set_headlights_off, state=tk.DISABLED)
         self.headlights_off_button.pack(side=tk.LEFT, padx=5, pady=5, expand=True)
 
-        # --- 5. 로그 프레임 ---
-        log_frame = ttk.LabelFrame(main_frame, text="로그", padding="10")
-        log_frame.pack(fill=tk.BOTH, expand=True, pady=5)
-        self.log_text = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, height=10)
-        self.log_text.pack(fill=tk.BOTH, expand=True)
+        # --- 5. 로그 / 프레임 표 ---
+        notebook = ttk.Notebook(main_frame)
+        notebook.pack(fill=tk.BOTH, expand=True, pady=5)
+        log_frame = ttk.Frame(notebook, padding="10")
+        notebook.add(log_frame, text="로그")
+        self.log_view = LogView(log_frame, LOG_MAX_LINES, LOG_FLUSH_MS, height=10)
+        self.log_view.pack(fill=tk.BOTH, expand=True)
+        trace_frame = ttk.Frame(notebook, padding="10")
+        notebook.add(trace_frame, text="TX/RX 프레임")
+        self.trace_db = None
+        self.trace_table = TraceTable(trace_frame, self._decode_frame)
+        self.trace_table.pack(fill=tk.BOTH, expand=True)
+        self.status_var = tk.StringVar(value="엔진: 연결 안 됨")
+        ttk.Label(main_frame, textvariable=self.status_var).pack(fill=tk.X)
         self.log("프로그램이 시작되었습니다.")
         self.log("TIP: gs_usb 모드 사용 시 채널은 보통 0 입니다.")
 
@@ -168,49 +380,93 @@ class CanControlApp(tk.Tk):
             self.headlights_off_button.config(state=tk.DISABLED)
 
     # --- 연결 및 상태 관리 ---
+    # 버스와 전송 스레드는 엔진 프로세스(LampEngine)에 있고, GUI 는 명령만 보내고 로그/결과/통계는 _poll_engine 으로 받습니다.
     def connect_can(self):
+        self.trace_db = None        # DBC 파일이 바뀌었을 수 있으므로 다시 읽습니다.
+        self.trace_table.clear()
         try:
-            self.sender = CANMessageSender(self.dbc_path.get(), self.interface.get(), self.channel.get(), self.bitrate.get())
-            self.log(f"✅ CAN 연결 성공: {self.interface.get()} (Ch: {self.channel.get()})")
-            self.connect_button.config(state=tk.DISABLED)
-            self.disconnect_button.config(state=tk.NORMAL)
-            self.set_control_buttons_state(True)
-            self.manage_sending_loop()
+            self.engine = canengine.EngineProcess(LampEngine, STATS_INTERVAL, keep_alive=KEEP_ENGINE_ON_CLOSE)
         except Exception as e:
-            self.log(f"❌ CAN 연결 실패: {e}")
-            self.log("TIP: 'pip install gs_usb'를 했는지 확인하세요.")
+            self.log(f"❌ CAN 엔진 프로세스 시작 실패: {e}")
+            return
+        self.engine.call('connect', self.dbc_path.get(), self.interface.get(), self.channel.get(), self.bitrate.get(),
+                         RECORD_DIR)
+        # 새 엔진은 모든 상태가 꺼진 채로 시작하므로, 재연결이어도 GUI 에 남아 있는 IFS/전조등 상태를 먼저 넘깁니다.
+        # (방향지시등은 set_control_buttons_state 가 버튼을 '꺼짐' 상태로 되돌리므로 엔진 기본값과 같습니다)
+        self.engine.post('set_ifs', self.is_ifs_on)
+        self.engine.post('set_headlights', self.is_low_beam_on, self.is_high_beam_on)
+        self.engine.call('start_sending')
+        self.connect_button.config(state=tk.DISABLED)
+        self.log(f"⏳ CAN 엔진에 연결 요청: {self.interface.get()} (Ch: {self.channel.get()})")
+        self.after(ENGINE_POLL_MS, self._poll_engine)
 
     def disconnect_can(self):
-        self.stop_sending_loop()
-        if self.sender:
-            self.sender.close()
-            self.sender = None
+        if self.engine:
+            engine, self.engine = self.engine, None
+            self._handle_events(engine.shutdown())
             self.log("✅ CAN 연결이 안전하게 해제되었습니다.")
+        self.status_var.set("엔진: 연결 안 됨")
         self.connect_button.config(state=tk.NORMAL)
         self.disconnect_button.config(state=tk.DISABLED)
         self.set_control_buttons_state(False)
 
-    def manage_sending_loop(self):
-        should_be_sending = True 
-        
-        if should_be_sending and not self.is_sending:
-            self.is_sending = True
-            self.sending_thread = threading.Thread(target=self._sending_loop, daemon=True)
-            self.sending_thread.start()
-            self.log("▶️ 주기적 메시지 전송을 시작합니다.")
-        elif not should_be_sending and self.is_sending:
-            self.stop_sending_loop()
-    
-    def stop_sending_loop(self):
-        if not self.is_sending: return
-        self.is_sending = False
-        if self.sending_thread:
-            self.sending_thread.join(timeout=0.5)
-        self.log("⏹️ 주기적 메시지 전송을 중단했습니다.")
+    def _poll_engine(self):
+        if self.engine is None:
+            return
+        self._handle_events(self.engine.poll())
+        if self.engine is not None and not self.engine.is_alive:
+            self.log("❌ CAN 엔진 프로세스가 종료되었습니다.")
+            self.disconnect_can()
+            return
+        if self.engine is not None:
+            self.after(ENGINE_POLL_MS, self._poll_engine)
+
+    def _handle_events(self, events):
+        for event in events:
+            kind = event[0]
+            if kind == canengine.LOG:
+                self.log(event[1])
+            elif kind == canengine.STATS:
+                self._show_stats(event[1])
+            elif kind == canengine.RESULT:
+                self._on_result(event[2], event[3])
+            elif kind == canengine.ERROR:
+                self._on_error(event[2], event[3])
+
+    def _on_result(self, method, value):
+        if method == 'connect':
+            self.log(f"✅ CAN 연결 성공: {self.interface.get()} (Ch: {self.channel.get()})")
+            self.disconnect_button.config(state=tk.NORMAL)
+            self.set_control_buttons_state(True)
+        elif method == 'start_sending':
+            modes = ', '.join(f"{name}={mode}" for name, mode in value.items())
+            self.log(f"▶️ 주기적 메시지 전송을 시작합니다. ({modes})")
+
+    def _on_error(self, method, error):
+        if method == 'connect':
+            self.log(f"❌ CAN 연결 실패: {error}")
+            self.log("TIP: 'pip install gs_usb'를 했는지 확인하세요.")
+            self.disconnect_can()
+        elif method == 'start_sending':
+            if self.engine is not None:     # 연결 실패 뒤에 오는 오류는 이미 위에서 정리했습니다.
+                self.log(f"❌ DBC 메시지 로드 실패: {error}")
+        else:
+            self.log(f"❌ {method} 실패: {error}")
+
+    def _show_stats(self, stats):
+        if stats:
+            self.trace_table.update(stats['trace'])
+            self.status_var.set(f"엔진: TX {stats['sent']}프레임 · 오류 {stats['errors']} · "
+                                f"큐 최대 {stats['max_depth']} · 지터 최대 {stats['jitter_max'] * 1e3:.2f}ms")
+
+    def _command(self, method, *args):
+        """버튼 명령은 결과가 필요 없으므로 post 로 보냅니다. (엔진이 죽었으면 ERROR 이벤트로 한 번만 알려 줍니다)"""
+        if self.engine is not None:
+            self.engine.post(method, *args)
 
     # --- 버튼 콜백 함수 ---
     def start_blinking(self):
-        self.turn_signal_state = 'right_blink'
+        self._command('set_turn_signal', 'right_blink')
         self.log("▶️ 우측 방향지시등 깜빡임을 시작합니다.")
         self.blink_start_button.config(state=tk.DISABLED)
         self.solid_on_button.config(state=tk.DISABLED)
@@ -218,7 +474,7 @@ class CanControlApp(tk.Tk):
         self.blink_stop_button.config(state=tk.NORMAL)
 
     def stop_blinking(self):
-        self.turn_signal_state = None
+        self._command('set_turn_signal', None)
         self.log("⏹️ 깜빡임을 중단했습니다.")
         self.blink_start_button.config(state=tk.NORMAL)
         self.solid_on_button.config(state=tk.NORMAL)
@@ -226,7 +482,7 @@ class CanControlApp(tk.Tk):
         self.blink_stop_button.config(state=tk.DISABLED)
 
     def send_solid_on(self):
-        self.turn_signal_state = 'right_solid_on'
+        self._command('set_turn_signal', 'right_solid_on')
         self.log("🔼 '켜기' 상태를 유지합니다.")
         self.blink_start_button.config(state=tk.DISABLED)
         self.solid_on_button.config(state=tk.DISABLED)
@@ -234,7 +490,7 @@ class CanControlApp(tk.Tk):
         self.blink_stop_button.config(state=tk.DISABLED)
 
     def send_solid_off(self):
-        self.turn_signal_state = None
+        self._command('set_turn_signal', None)
         self.log("🔽 '끄기' 상태로 변경합니다.")
         self.blink_start_button.config(state=tk.NORMAL)
         self.solid_on_button.config(state=tk.NORMAL)
@@ -244,11 +500,12 @@ class CanControlApp(tk.Tk):
     # --- IFS 토글 ---
     def toggle_ifs(self):
         self.is_ifs_on = not self.is_ifs_on
-        
+        self._command('set_ifs', self.is_ifs_on)
+
         if self.is_ifs_on:
             self.ifs_toggle_button.config(text="IFS 끄기 (BCM 수동 제어)")
             self.log("💡 IFS 켜기 요청됨. (H/Lamp High control Mode by IFS)")
-            
+
             self.set_headlights_off()
             self.low_beam_button.config(state=tk.NORMAL)
             self.high_beam_button.config(state=tk.NORMAL)
@@ -257,7 +514,7 @@ class CanControlApp(tk.Tk):
         else:
             self.ifs_toggle_button.config(text="IFS 켜기 (자동 제어)")
             self.log(" manual BCM 수동 제어 모드로 전환합니다.")
-            
+
             self.low_beam_button.config(state=tk.NORMAL)
             self.high_beam_button.config(state=tk.NORMAL)
             self.headlights_off_button.config(state=tk.NORMAL)
@@ -267,94 +524,45 @@ class CanControlApp(tk.Tk):
     def set_low_beam(self):
         self.is_low_beam_on = True
         self.is_high_beam_on = False
+        self._command('set_headlights', True, False)
         self.log("하향등 켜기 요청됨.")
 
     def set_high_beam(self):
-        self.is_low_beam_on = True 
+        self.is_low_beam_on = True
         self.is_high_beam_on = True
+        self._command('set_headlights', True, True)
         self.log("상향등 켜기 요청됨.")
-        
+
     def set_headlights_off(self):
         self.is_low_beam_on = False
         self.is_high_beam_on = False
+        self._command('set_headlights', False, False)
         self.log("전조등 끄기 요청됨.")
 
-    # --- 핵심 전송 루프 ---
-    def _sending_loop(self):
-        try:
-            bcm_07_msg = self.sender.db.get_message_by_name('BCM_07_200ms')
-            bcm_08_msg = self.sender.db.get_message_by_name('BCM_08_200ms')
-        except Exception as e:
-            self.after(0, self.log, f"❌ DBC 메시지 로드 실패: {e}")
-            self.after(0, self.stop_sending_loop)
-            return
-
-        while self.is_sending:
-            try:
-                # --- 1. 방향지시등(ICU_04_200ms) ---
-                right_req = 0
-                if self.turn_signal_state == 'right_blink':
-                    if self.blink_state: right_req = 2
-                    self.blink_state = not self.blink_state
-                elif self.turn_signal_state == 'right_solid_on':
-                    right_req = 2
-                
-                icu_04_signals = {
-                    'Lamp_TrnSigLmpRtOnReq': right_req, 'Lamp_TrnSigLmpLftOnReq': 0,
-                    'ExtLamp_TrnSigLmpLftBlnkngSta': 0, 'ExtLamp_TrnSigLmpRtBlnkngSta': 0,
-                    'ExtLamp_ExtrnlTailLmpSta': 0, 'ExtLamp_HzrdSwSta': 0,
-                    'ExtLamp_RrFgLmpSta': 0, 'IntLamp_InlTailLmpSta': 0
-                }
-                
-                # --- 2. 전조등(BCM_07_200ms) ---
-                bcm_07_signals = {
-                    'Lamp_HdLmpLoOnReq': int(self.is_low_beam_on),
-                    'Lamp_HdLmpHiOnReq': int(self.is_high_beam_on),
-                    'BCM_AlvCnt7Val': self.counter % 16, 'BCM_Crc7Val': 0,
-                    'Lamp_DedicatedDrlOnReq': 0, 'Lamp_HiPrioHzrdReq': 0,
-                    'Lamp_LoPrioHzrdReq': 0, 'Lamp_IntTailLmpOnReq': 0,
-                    'Lamp_ExtrnlTailLmpOnReq': 0, 'Lamp_AvTailLmpSta': 0,
-                    'Lamp_ExtrnlLpWlcmSta': 0
-                }
-                bcm_07_signals['BCM_Crc7Val'] = calculate_message_crc(bcm_07_msg, bcm_07_signals, 'BCM_Crc7Val')
-                
-                # --- 3. IFS 제어(BCM_08_200ms) ---
-                bcm_08_signals = {
-                    'Lamp_IFSCtrlModTyp': int(self.is_ifs_on), 
-                    'BCM_Crc8Val': 0,
-                    'BCM_AlvCnt8Val': self.counter % 16,
-                    'Lamp_HbaCtrlModTyp': 0, 'Lamp_RrFogLmpOnReq': 0,
-                    'Lamp_TailLmpWlcmCmd': 0, 'Lamp_HdLmpWlcmCmd': 0,
-                    'Lamp_PuddleLmpOnReq': 0
-                }
-                bcm_08_signals['BCM_Crc8Val'] = calculate_message_crc(bcm_08_msg, bcm_08_signals, 'BCM_Crc8Val')
-
-                # --- 메시지 전송 ---
-                self.sender.send_message('ICU_04_200ms', icu_04_signals)
-                self.sender.send_message('BCM_07_200ms', bcm_07_signals)
-                self.sender.send_message('BCM_08_200ms', bcm_08_signals)
-                
-                self.counter += 1
-                time.sleep(0.2)
-
-            except Exception as e:
-                self.after(0, self.log, f"❌ 전송 루프 오류: {e}")
-                time.sleep(1)
-    
     # --- 유틸리티 함수 ---
     def browse_dbc(self):
         filepath = filedialog.askopenfilename(filetypes=(("DBC Files", "*.dbc"), ("All files", "*.*")))
         if filepath: self.dbc_path.set(filepath)
     def on_closing(self):
         self.log("프로그램을 종료합니다...")
+        if self.engine is not None and KEEP_ENGINE_ON_CLOSE:
+            self.engine.detach()    # 엔진은 마지막 상태 그대로 계속 전송합니다.
+            self.engine = None
         self.disconnect_can()
         self.destroy()
 
+    def _decode_frame(self, frame_id, data):
+        """프레임 표의 마지막 값 표시용. 엔진과 같은 DBC 를 GUI 쪽에서 캐시로 읽어 바뀐 줄만 디코딩합니다."""
+        try:
+            if self.trace_db is None:
+                self.trace_db = dbccache.load_file(self.dbc_path.get())
+            message = self.trace_db.get_message_by_frame_id(frame_id)
+            return message.name, message.decode(data, decode_choices=False)
+        except Exception:
+            return None
+
     def log(self, message):
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.config(state=tk.DISABLED)
-        self.log_text.see(tk.END)
+        self.log_view.log(message)
 
 if __name__ == "__main__":
     app = CanControlApp()
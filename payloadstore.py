@@ -0,0 +1,181 @@
+import hashlib
+import math
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+def open_database(db_name: str = "sent_data.db") -> sqlite3.Connection:
+    """WAL 모드로 DB 를 열고 canfdmacrowdb 와 같은 sent_payloads 테이블을 준비합니다."""
+    conn = sqlite3.connect(db_name)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")   # WAL 에서는 커밋마다 fsync 하지 않고 체크포인트 때만 동기화
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sent_payloads (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            payload BLOB NOT NULL UNIQUE,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS generator_state (
+            name TEXT PRIMARY KEY,
+            key BLOB NOT NULL,
+            next_counter INTEGER NOT NULL
+        )
+    """)
+    conn.commit()
+    return conn
+
+# =========================== Bloom 필터 ===========================
+class BloomFilter:
+    """capacity 개를 넣었을 때 오탐률이 error_rate 가 되도록 크기를 잡은 Bloom 필터
+
+    오탐(새 payload 를 이미 보낸 것으로 판단)은 그 payload 를 건너뛸 뿐이라 중복 전송은 생기지 않습니다.
+    """
+    def __init__(self, capacity: int, error_rate: float = 1e-6):
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self.count = 0
+
+    def _positions(self, item: bytes):
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def __contains__(self, item: bytes) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def add(self, item: bytes) -> bool:
+        """새로 넣었으면 True, 이미 있는 것으로 판단되면 False"""
+        bits = self.bits
+        new = False
+        for p in self._positions(item):
+            byte, mask = p >> 3, 1 << (p & 7)
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+class _DigestSet:
+    """payload 대신 16 바이트 digest 를 담는 메모리 집합 (BloomFilter 와 같은 인터페이스)"""
+    def __init__(self):
+        self._items = set()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item: bytes) -> bool:
+        return hashlib.blake2b(item, digest_size=16).digest() in self._items
+
+    def add(self, item: bytes) -> bool:
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        if digest in self._items:
+            return False
+        self._items.add(digest)
+        return True
+
+# =========================== 중복 제거 저장소 ===========================
+class PayloadStore:
+    """보낸 payload 를 메모리(집합 또는 Bloom 필터)에서 중복 검사하고, SQLite 에는 모아서 한 번에 기록합니다.
+
+    시작할 때 sent_payloads 를 읽어 메모리 인덱스를 다시 만들므로 재시작해도 이어서 중복 없이 보냅니다.
+    기록은 batch 개 또는 flush_interval 초마다 INSERT OR IGNORE + commit 한 번입니다.
+    """
+    def __init__(self, conn: sqlite3.Connection, bloom_capacity: int = None, error_rate: float = 1e-6,
+                 batch: int = 1000, flush_interval: float = 1.0):
+        self.conn = conn
+        self.batch = batch
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._last_flush = time.monotonic()
+        if bloom_capacity:
+            self.index = BloomFilter(bloom_capacity, error_rate)
+        else:
+            self.index = _DigestSet()
+        self.loaded = 0
+        for (payload,) in conn.execute("SELECT payload FROM sent_payloads"):
+            self.index.add(payload)
+            self.loaded += 1
+
+    def add(self, payload: bytes) -> bool:
+        """처음 보는 payload 면 기록 대기열에 넣고 True, 이미 보낸 것이면 False"""
+        if not self.index.add(payload):
+            return False
+        self._pending.append((payload,))
+        if len(self._pending) >= self.batch or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return True
+
+    def flush(self):
+        if self._pending:
+            self.conn.executemany("INSERT OR IGNORE INTO sent_payloads (payload) VALUES (?)", self._pending)
+            self.conn.commit()
+            self._pending.clear()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+
+# =========================== 구성상 중복 없는 생성기 ===========================
+class PermutationGenerator:
+    """카운터를 키 기반 Feistel 순열에 통과시켜 payload 를 만듭니다. (counter mode)
+
+    Feistel 구조는 라운드 함수와 무관하게 전단사이므로 카운터가 다르면 payload 도 반드시 다르고,
+    중복 검사 조회가 필요 없습니다. 출력은 키를 모르면 랜덤과 구분되지 않습니다.
+    재시작 시 이미 썼을 수 있는 카운터를 다시 쓰지 않도록 reserve 개씩 미리 DB 에 예약합니다.
+    """
+    ROUNDS = 4
+
+    def __init__(self, conn: sqlite3.Connection, length: int = 64, name: str = "default", reserve: int = 1000):
+        if length < 2 or length % 2 or length > 128:
+            raise ValueError(f"length must be an even number in [2, 128] (got {length})")
+        self.conn = conn
+        self.length = length
+        self.half = length // 2
+        self.name = name
+        self.reserve = reserve
+        row = conn.execute("SELECT key, next_counter FROM generator_state WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            self.key, self.counter = os.urandom(32), 0
+        else:
+            self.key, self.counter = bytes(row[0]), row[1]
+        self._reserved = self.counter
+        self._reserve_more()
+
+    def _reserve_more(self):
+        self._reserved = self.counter + self.reserve
+        self.conn.execute("INSERT OR REPLACE INTO generator_state (name, key, next_counter) VALUES (?, ?, ?)",
+                          (self.name, self.key, self._reserved))
+        self.conn.commit()
+
+    def _round(self, data: bytes, r: int) -> int:
+        digest = hashlib.blake2b(data, digest_size=self.half, key=self.key, person=bytes([r]) * 16).digest()
+        return int.from_bytes(digest, 'big')
+
+    def encode(self, counter: int) -> bytes:
+        """카운터 -> payload 순열 (같은 키, 같은 카운터면 항상 같은 결과)"""
+        block = counter.to_bytes(self.length, 'big')
+        left = int.from_bytes(block[:self.half], 'big')
+        right = int.from_bytes(block[self.half:], 'big')
+        for r in range(self.ROUNDS):
+            left, right = right, left ^ self._round(right.to_bytes(self.half, 'big'), r)
+        return left.to_bytes(self.half, 'big') + right.to_bytes(self.half, 'big')
+
+    def next(self) -> bytes:
+        if self.counter >= self._reserved:
+            self._reserve_more()
+        payload = self.encode(self.counter)
+        self.counter += 1
+        return payload
+
+    def close(self):
+        """다음 실행이 예약된 카운터를 건너뛰지 않도록 실제 사용한 위치를 기록합니다."""
+        self.conn.execute("UPDATE generator_state SET next_counter = ? WHERE name = ?", (self.counter, self.name))
+        self.conn.commit()
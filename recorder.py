@@ -0,0 +1,328 @@
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+import can
+import numpy as np
+
+# 플래그 비트
+FLAG_EXTENDED = 0x01
+FLAG_FD = 0x02
+FLAG_BRS = 0x04
+FLAG_ESI = 0x08
+FLAG_RX = 0x10
+FLAG_ERROR = 0x20
+FLAG_REMOTE = 0x40
+
+# 고정 폭 컬럼: (이름, dtype). data 는 (N, data_width) uint8
+COLUMNS = (
+    ('timestamp', np.float64),
+    ('channel', np.uint8),          # meta.json 의 channels 목록 인덱스
+    ('arbitration_id', np.uint32),
+    ('dlc', np.uint8),
+    ('length', np.uint8),
+    ('flags', np.uint8),
+)
+
+def _column_path(root: str, chunk: str, column: str) -> str:
+    return os.path.join(root, f"{chunk}.{column}")
+
+# =========================== 기록기 ===========================
+class Recorder(can.Listener):
+    """TX/RX 프레임을 청크 단위의 고정 폭 컬럼 파일(np.memmap)에 이어 씁니다.
+
+    청크가 가득 차면 ID 별 인덱스(정렬된 행 번호)를 만들어 두고 다음 청크로 넘어갑니다.
+    meta.json 에는 청크마다 프레임 수, 시간 범위, 포함된 ID 가 있어 조회 시 필요한 청크만 엽니다.
+    can.Listener 이므로 can.Notifier 에 바로 붙일 수 있고, TX 는 append(msg, is_rx=False) 로 넣습니다.
+    """
+    def __init__(self, root: str, chunk_size: int = 1 << 20, data_width: int = 64, flush_every: int = 65536):
+        os.makedirs(root, exist_ok=True)
+        self.root = root
+        self.meta_path = os.path.join(root, 'meta.json')
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, encoding='utf-8') as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {'chunk_size': chunk_size, 'data_width': data_width, 'channels': [], 'chunks': []}
+        self.chunk_size = self.meta['chunk_size']
+        self.data_width = self.meta['data_width']
+        self.flush_every = flush_every
+        self._channels = {name: i for i, name in enumerate(self.meta['channels'])}
+        self._cols = None
+        self._count = 0
+        self._since_flush = 0
+        self._chunk = None
+        self._lock = threading.Lock()   # TX 워커와 Notifier 스레드가 함께 append 합니다.
+        self._open_chunk()
+
+    # --- 청크 관리 ---
+    def _open_chunk(self):
+        chunks = self.meta['chunks']
+        if chunks and not chunks[-1].get('closed'):
+            self._chunk = chunks[-1]            # 이전 실행이 닫지 못한 청크에 이어 씁니다.
+            mode = 'r+'
+        else:
+            self._chunk = {'name': f"{len(chunks):06d}", 'count': 0, 't_min': None, 't_max': None, 'closed': False}
+            chunks.append(self._chunk)
+            mode = 'w+'
+        name = self._chunk['name']
+        self._cols = {col: np.memmap(_column_path(self.root, name, col), dtype=dtype, mode=mode,
+                                     shape=(self.chunk_size,))
+                      for col, dtype in COLUMNS}
+        self._cols['data'] = np.memmap(_column_path(self.root, name, 'data'), dtype=np.uint8, mode=mode,
+                                       shape=(self.chunk_size, self.data_width))
+        self._count = self._chunk['count']
+
+    def _close_chunk(self):
+        count = self._count
+        ids = np.array(self._cols['arbitration_id'][:count], copy=True)
+        rows = np.argsort(ids, kind='stable').astype(np.uint32)
+        unique, starts = np.unique(ids[rows], return_index=True)
+        np.savez(os.path.join(self.root, f"{self._chunk['name']}.index.npz"),
+                 ids=unique, starts=starts, rows=rows)
+        self._unmap()
+        # 마지막 청크처럼 덜 찬 청크는 파일 크기를 실제 프레임 수에 맞춰 줄입니다.
+        # (Windows 는 매핑이 남아 있는 파일을 truncate 할 수 없으므로 위에서 매핑을 모두 닫은 뒤에 합니다)
+        for col, dtype in COLUMNS:
+            os.truncate(_column_path(self.root, self._chunk['name'], col), count * np.dtype(dtype).itemsize)
+        os.truncate(_column_path(self.root, self._chunk['name'], 'data'), count * self.data_width)
+        self._chunk['count'] = count
+        self._chunk['ids'] = [int(i) for i in unique]
+        self._chunk['closed'] = True
+        self._write_meta()
+
+    def _unmap(self):
+        """컬럼 memmap 을 flush 하고 매핑을 닫습니다. (memmap 을 가리키는 참조가 이것뿐이어야 합니다)"""
+        cols, self._cols = self._cols, None
+        for col in cols.values():
+            col.flush()
+        while cols:
+            _, col = cols.popitem()
+            mm = col._mmap
+            del col
+            if mm is not None:
+                mm.close()
+
+    def _write_meta(self):
+        tmp = self.meta_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self.meta_path)
+
+    def _channel_index(self, channel) -> int:
+        name = str(channel if channel is not None else '')
+        index = self._channels.get(name)
+        if index is None:
+            index = self._channels[name] = len(self.meta['channels'])
+            self.meta['channels'].append(name)
+        return index
+
+    # --- 기록 ---
+    def append(self, msg: can.Message, is_rx: Optional[bool] = None):
+        with self._lock:
+            self._append(msg, is_rx)
+
+    def _append(self, msg: can.Message, is_rx: Optional[bool]):
+        if self._cols is None:
+            self._open_chunk()
+        i = self._count
+        cols = self._cols
+        timestamp = msg.timestamp or time.time()
+        length = min(len(msg.data), self.data_width)
+        flags = ((FLAG_EXTENDED if msg.is_extended_id else 0) | (FLAG_FD if msg.is_fd else 0)
+                 | (FLAG_BRS if msg.bitrate_switch else 0) | (FLAG_ESI if msg.error_state_indicator else 0)
+                 | (FLAG_RX if (msg.is_rx if is_rx is None else is_rx) else 0)
+                 | (FLAG_ERROR if msg.is_error_frame else 0) | (FLAG_REMOTE if msg.is_remote_frame else 0))
+        cols['timestamp'][i] = timestamp
+        cols['channel'][i] = self._channel_index(msg.channel)
+        cols['arbitration_id'][i] = msg.arbitration_id
+        cols['dlc'][i] = msg.dlc
+        cols['length'][i] = length
+        cols['flags'][i] = flags
+        cols['data'][i, :length] = np.frombuffer(bytes(msg.data[:length]), dtype=np.uint8)
+
+        # TX(time.time) 와 RX(인터페이스 시각) 가 섞여 들어오므로 시각 순서가 보장되지 않습니다. 범위는 min/max 로 둡니다.
+        chunk = self._chunk
+        if chunk['t_min'] is None or timestamp < chunk['t_min']:
+            chunk['t_min'] = timestamp
+        if chunk['t_max'] is None or timestamp > chunk['t_max']:
+            chunk['t_max'] = timestamp
+        self._count = i + 1
+        self._since_flush += 1
+        if self._count >= self.chunk_size:
+            self._close_chunk()
+            self._since_flush = 0
+        elif self._since_flush >= self.flush_every:
+            self._flush()
+
+    def on_message_received(self, msg: can.Message):
+        self.append(msg)
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if self._cols is not None:
+            for col in self._cols.values():
+                col.flush()
+            self._chunk['count'] = self._count
+            self._write_meta()
+        self._since_flush = 0
+
+    def stop(self):
+        """기록을 마치고 마지막 청크를 닫습니다. (Notifier.stop() 에서도 호출됩니다)"""
+        with self._lock:
+            self._stop()
+
+    def _stop(self):
+        if self._cols is not None:
+            if self._count:
+                self._close_chunk()
+            else:
+                self._unmap()
+                self.meta['chunks'].pop()
+                self._write_meta()
+
+    close = stop
+
+# =========================== 조회 ===========================
+def _normalize_ids(ids):
+    return np.unique(np.asarray(list(ids), dtype=np.int64)) if ids is not None else None
+
+class RecordingReader:
+    """기록 디렉터리를 필요한 청크만 memmap 으로 열어 시간 구간 / ID 단위로 NumPy 배열을 잘라 줍니다."""
+    def __init__(self, root: str):
+        self.root = root
+        with open(os.path.join(root, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.data_width = self.meta['data_width']
+        self.channels = self.meta['channels']
+        self.chunks = [c for c in self.meta['chunks'] if c['count']]
+
+    def __len__(self):
+        return sum(c['count'] for c in self.chunks)
+
+    def _open(self, chunk, column):
+        path = _column_path(self.root, chunk['name'], column)
+        count = chunk['count']
+        if column == 'data':
+            return np.memmap(path, dtype=np.uint8, mode='r')[:count * self.data_width].reshape(count, self.data_width)
+        dtype = dict(COLUMNS)[column]
+        return np.memmap(path, dtype=dtype, mode='r')[:count]
+
+    def _rows_for_ids(self, chunk, ids) -> np.ndarray:
+        index_path = os.path.join(self.root, f"{chunk['name']}.index.npz")
+        if os.path.exists(index_path):
+            index = np.load(index_path)
+            unique, starts, rows = index['ids'], index['starts'], index['rows']
+        else:   # 아직 기록 중인 청크는 인덱스를 즉석에서 만듭니다.
+            arb = np.asarray(self._open(chunk, 'arbitration_id'))
+            rows = np.argsort(arb, kind='stable')
+            unique, starts = np.unique(arb[rows], return_index=True)
+        ends = np.append(starts[1:], len(rows))
+        pos = np.searchsorted(unique, ids)
+        parts = [rows[starts[p]:ends[p]] for p, i in zip(pos, ids) if p < len(unique) and unique[p] == i]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(parts))
+
+    def slice(self, start: float = None, end: float = None, ids=None, columns=None) -> dict:
+        """[start, end) 시간 구간, ids 에 해당하는 프레임을 컬럼별 NumPy 배열로 돌려줍니다."""
+        ids = _normalize_ids(ids)
+        return self._slice_chunks(self._select_chunks(start, end, ids), start, end, ids, columns)
+
+    def _slice_chunks(self, chunks, start, end, ids, columns=None) -> dict:
+        columns = columns or [c for c, _ in COLUMNS] + ['data']
+        parts = {c: [] for c in columns}
+        for chunk in chunks:
+            rows = self._rows_for_ids(chunk, ids) if ids is not None else None
+            if start is None and end is None:
+                sel = slice(None) if rows is None else rows
+            else:
+                # 청크 안의 timestamp 는 정렬돼 있지 않으므로(TX/RX 가 섞임) searchsorted 대신 마스크로 고릅니다.
+                ts = np.asarray(self._open(chunk, 'timestamp'))
+                if rows is not None:
+                    ts = ts[rows]
+                mask = np.ones(len(ts), dtype=bool)
+                if start is not None:
+                    mask &= ts >= start
+                if end is not None:
+                    mask &= ts < end
+                sel = np.flatnonzero(mask) if rows is None else rows[mask]
+            for c in columns:
+                parts[c].append(np.asarray(self._open(chunk, c)[sel]))
+        result = {}
+        for c in columns:
+            if parts[c]:
+                result[c] = np.concatenate(parts[c])
+            elif c == 'data':
+                result[c] = np.empty((0, self.data_width), dtype=np.uint8)
+            else:
+                result[c] = np.empty(0, dtype=dict(COLUMNS)[c])
+        return result
+
+    def _select_chunks(self, start, end, ids):
+        for chunk in self.chunks:
+            if start is not None and chunk['t_max'] is not None and chunk['t_max'] < start:
+                continue
+            if end is not None and chunk['t_min'] is not None and chunk['t_min'] >= end:
+                continue
+            if ids is not None and 'ids' in chunk and not set(chunk['ids']).intersection(ids.tolist()):
+                continue
+            yield chunk
+
+    def iter_messages(self, start: float = None, end: float = None, ids=None, batch: int = 65536):
+        """slice 결과를 can.Message 로 돌려줍니다. (청크 단위로 읽어 메모리 사용을 제한)"""
+        ids = _normalize_ids(ids)
+        for chunk in self._select_chunks(start, end, ids):
+            cols = self._slice_chunks([chunk], start, end, ids)
+            for k in range(0, len(cols['timestamp']), batch):
+                for ts, ch, arb, dlc, length, flags, data in zip(
+                        cols['timestamp'][k:k + batch].tolist(), cols['channel'][k:k + batch].tolist(),
+                        cols['arbitration_id'][k:k + batch].tolist(), cols['dlc'][k:k + batch].tolist(),
+                        cols['length'][k:k + batch].tolist(), cols['flags'][k:k + batch].tolist(),
+                        cols['data'][k:k + batch]):
+                    yield can.Message(timestamp=ts, arbitration_id=arb, dlc=dlc, data=data[:length].tobytes(),
+                                      channel=self.channels[ch] or None,
+                                      is_extended_id=bool(flags & FLAG_EXTENDED), is_fd=bool(flags & FLAG_FD),
+                                      bitrate_switch=bool(flags & FLAG_BRS),
+                                      error_state_indicator=bool(flags & FLAG_ESI), is_rx=bool(flags & FLAG_RX),
+                                      is_error_frame=bool(flags & FLAG_ERROR),
+                                      is_remote_frame=bool(flags & FLAG_REMOTE))
+
+    def export(self, out_path: str, start: float = None, end: float = None, ids=None) -> int:
+        """ASC / BLF 등 python-can 이 지원하는 형식으로 내보냅니다. (확장자로 형식 결정)"""
+        count = 0
+        with can.Logger(out_path) as writer:
+            for msg in self.iter_messages(start, end, ids):
+                writer.on_message_received(msg)
+                count += 1
+        return count
+
+def main():
+    # ============================ 사용자 설정 ============================
+    CAN_INTERFACE = "slcan"
+    CHANNEL = "COM14"
+    BITRATE = 500000
+    RECORD_DIR = "recording"
+    # =================================================================
+
+    bus = can.interface.Bus(interface=CAN_INTERFACE, channel=CHANNEL, bitrate=BITRATE)
+    recorder = Recorder(RECORD_DIR)
+    notifier = can.Notifier(bus, [recorder])
+    print(f"⏺️ {RECORD_DIR} 에 기록 중입니다. (Ctrl+C 로 중지)")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        notifier.stop()     # recorder.stop() 도 함께 호출됩니다.
+        bus.shutdown()
+        print(f"\n✅ 기록 종료: {len(RecordingReader(RECORD_DIR))}개 프레임")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import time
+from typing import Callable, Iterable, NamedTuple
+
+import can
+import numpy as np
+
+from canframe import CompiledFrame
+from canlog import LogFrame, iter_frames
+from e2e import e2e_signals
+
+# =========================== 타이밍 오차 통계 ===========================
+class TimingHistogram:
+    """전송 지연(실제 - 목표)을 1us 단위 히스토그램으로 모읍니다. (프레임 수와 무관하게 고정 메모리)"""
+    def __init__(self, resolution: float = 1e-6, limit: float = 0.1):
+        self.resolution = resolution
+        self.bins = np.zeros(int(limit / resolution) + 1, dtype=np.int64)
+        self.max = 0.0
+        self.count = 0
+
+    def add(self, error: float):
+        if error < 0:
+            error = 0.0
+        self.bins[min(int(error / self.resolution), len(self.bins) - 1)] += 1
+        if error > self.max:
+            self.max = error
+        self.count += 1
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = q / 100 * self.count
+        index = int(np.searchsorted(np.cumsum(self.bins), target))
+        return min(index * self.resolution, self.max)
+
+class ReplayReport(NamedTuple):
+    frames: int
+    filtered: int
+    errors: int
+    duration: float
+    p50: float              # 타이밍 오차(초) 백분위수
+    p90: float
+    p99: float
+    max: float
+
+    def __str__(self):
+        return (f"{self.frames} frames in {self.duration:.2f}s (filtered {self.filtered}, errors {self.errors}) | "
+                f"timing error p50 {self.p50 * 1e6:.0f}us p90 {self.p90 * 1e6:.0f}us "
+                f"p99 {self.p99 * 1e6:.0f}us max {self.max * 1e6:.0f}us")
+
+# =========================== 재생기 ===========================
+class LogReplayer:
+    """기록된 로그를 원래 타임스탬프 간격대로 다시 보냅니다.
+
+    목표 시각 = 시작 시각 + (ts - ts0) / speed. 목표 시각 직전까지 잠들고 마지막 spin 구간만 바쁜 대기합니다.
+    다음 프레임 파싱은 대기 전에 끝내 두므로 로그 읽기가 전송 타이밍에 끼어들지 않습니다.
+    db 와 recompute_e2e 를 주면 CRC/Alive Counter 신호가 있는 메시지는 카운터를 연속으로 다시 매기고
+    CRC 를 다시 계산합니다. (필터로 프레임을 빼거나 로그를 반복 재생해도 ECU 가 받아들이도록)
+    """
+    def __init__(self, send: Callable[[can.Message], None], db=None, speed: float = 1.0,
+                 include=None, exclude=None, recompute_e2e: bool = False, spin: float = 0.002):
+        if speed <= 0:
+            raise ValueError(f"speed must be positive (got {speed})")
+        self.send = send
+        self.speed = speed
+        self.include = set(include) if include else None
+        self.exclude = set(exclude or ())
+        self.spin = spin
+        self._e2e = {}
+        if db is not None and recompute_e2e:
+            for message in db.messages:
+                crc, counter = e2e_signals(message)
+                if (crc or counter) and not message.is_multiplexed():
+                    self._e2e[message.frame_id] = (message, CompiledFrame(message, crc, counter), crc, counter)
+        self._started = set()
+
+    def _wanted(self, frame: LogFrame) -> bool:
+        if self.include is not None and frame.arbitration_id not in self.include:
+            return False
+        return frame.arbitration_id not in self.exclude
+
+    def _payload(self, frame: LogFrame) -> bytes:
+        entry = self._e2e.get(frame.arbitration_id)
+        if entry is None or len(frame.data) != entry[0].length:
+            return frame.data
+        message, compiled, crc, counter = entry
+        raw = message.decode(frame.data, decode_choices=False, scaling=False)
+        for name, value in raw.items():
+            if name != crc and (name != counter or frame.arbitration_id not in self._started):
+                compiled.set_raw(name, int(value))
+        if counter and frame.arbitration_id in self._started:
+            compiled.advance_counter()
+        self._started.add(frame.arbitration_id)
+        return compiled.payload()
+
+    def _message(self, frame: LogFrame) -> can.Message:
+        return can.Message(arbitration_id=frame.arbitration_id, data=self._payload(frame),
+                           is_extended_id=frame.is_extended_id, is_fd=frame.is_fd,
+                           bitrate_switch=frame.bitrate_switch)
+
+    def run(self, frames: Iterable[LogFrame], progress: Callable[[int], None] = None) -> ReplayReport:
+        clock = time.perf_counter
+        histogram = TimingHistogram()
+        sent = filtered = errors = 0
+        start = first_ts = None
+        for frame in frames:
+            if not self._wanted(frame):
+                filtered += 1
+                continue
+            msg = self._message(frame)
+            if start is None:
+                start, first_ts = clock(), frame.timestamp
+            deadline = start + (frame.timestamp - first_ts) / self.speed
+            remaining = deadline - clock()
+            if remaining > self.spin:
+                time.sleep(remaining - self.spin)
+            while clock() < deadline:
+                pass
+            histogram.add(clock() - deadline)
+            try:
+                self.send(msg)
+            except can.CanError:
+                errors += 1
+                continue
+            sent += 1
+            # 실제로 보낸 프레임이 1000개 늘 때마다 한 번만 알립니다. (0 이나 오류가 이어질 때 반복 호출하지 않도록)
+            if progress is not None and not sent % 1000:
+                progress(sent)
+        duration = clock() - start if start is not None else 0.0
+        return ReplayReport(sent, filtered, errors, duration, histogram.percentile(50), histogram.percentile(90),
+                            histogram.percentile(99), histogram.max)
+
+    def replay_file(self, path: str, fmt: str = None, **kwargs) -> ReplayReport:
+        return self.run(iter_frames(path, fmt), **kwargs)
+
+def main():
+    # ============================ 사용자 설정 ============================
+    LOG_FILE = "vehicle.asc"
+    DBC_FILE_PATH = "Temp_DBC.dbc"
+    CAN_INTERFACE = "slcan"
+    CHANNEL = "COM14"
+    BITRATE = 500000
+    SPEED = 1.0             # 0.5 ~ 10 배속
+    INCLUDE_IDS = None      # 이 ID 만 재생 (None: 전체)
+    EXCLUDE_IDS = ()        # 재생하지 않을 ID
+    RECOMPUTE_E2E = True    # BCM_Crc*/BCM_AlvCnt* 를 다시 계산
+    # =================================================================
+
+    from headlightcontrol import CANMessageSender
+    with CANMessageSender(DBC_FILE_PATH, CAN_INTERFACE, CHANNEL, BITRATE) as sender:
+        replayer = LogReplayer(sender.bus.send, sender.db, SPEED, INCLUDE_IDS, EXCLUDE_IDS, RECOMPUTE_E2E)
+        print(f"▶️ {LOG_FILE} 재생 시작 ({SPEED}x)")
+        try:
+            report = replayer.replay_file(LOG_FILE, progress=lambda n: print(f"\r전송 {n}개", end=""))
+            print(f"\n✅ {report}")
+        except KeyboardInterrupt:
+            print("\n⏹️ 사용자가 재생을 중단했습니다.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import itertools
+import threading
+from collections import deque
+from typing import Callable, Dict, NamedTuple, Optional
+
+import can
+
+# =========================== 수신 결과 ===========================
+class DecodedFrame(NamedTuple):
+    seq: int
+    timestamp: float
+    arbitration_id: int
+    name: Optional[str]             # DBC 에 없는 ID 면 None
+    signals: Optional[dict]         # 디코딩 실패/DBC 없음이면 None (캐시와 공유되므로 읽기 전용)
+    data: bytes
+
+class RxStats:
+    def __init__(self):
+        self.received = 0
+        self.decoded = 0
+        self.unknown = 0
+        self.errors = 0
+        self.cache_hits = 0
+
+    def __repr__(self):
+        return (f"RxStats(received={self.received}, decoded={self.decoded}, unknown={self.unknown}, "
+                f"errors={self.errors}, cache_hits={self.cache_hits})")
+
+# =========================== 링 버퍼 ===========================
+class RingBuffer:
+    """크기가 고정된 디코딩 결과 버퍼. 항목마다 증가하는 seq 로 구독자가 어디까지 읽었는지 추적합니다."""
+    def __init__(self, maxlen: int = 4096):
+        self._items = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self.next_seq = 0
+
+    def append(self, item: DecodedFrame):
+        with self._lock:
+            self._items.append(item)
+            self.next_seq = item.seq + 1
+
+    def read_since(self, seq: int):
+        """seq 이후 항목과 (버퍼가 넘쳐) 놓친 개수를 돌려줍니다."""
+        with self._lock:
+            if not self._items:
+                return [], 0
+            first = self._items[0].seq
+            start = max(seq, first)
+            items = list(itertools.islice(self._items, start - first, None))
+        return items, start - seq
+
+class Subscription:
+    """RingBuffer 를 자기 위치부터 읽는 구독자. ids 를 주면 해당 ID 만 돌려줍니다."""
+    def __init__(self, buffer: RingBuffer, ids=None):
+        self.buffer = buffer
+        self.ids = set(ids) if ids else None
+        self.position = buffer.next_seq
+        self.dropped = 0
+
+    def poll(self):
+        items, dropped = self.buffer.read_since(self.position)
+        self.dropped += dropped
+        if items:
+            self.position = items[-1].seq + 1
+        if self.ids is not None:
+            items = [f for f in items if f.arbitration_id in self.ids]
+        return items
+
+# =========================== 하드웨어 필터 ===========================
+def build_filters(db, names=None, ids=None):
+    """DBC 메시지(또는 ID 목록)로 python-can 수신 필터를 만듭니다.
+
+    bus.set_filters() 는 인터페이스가 지원하면 하드웨어/드라이버 acceptance filter 로,
+    아니면 python-can 소프트웨어 필터로 적용됩니다.
+    """
+    filters = []
+    if db is not None and (names or not ids):
+        messages = [db.get_message_by_name(n) for n in names] if names else db.messages
+        ids = list(ids or []) + [(m.frame_id, m.is_extended_frame) for m in messages]
+    for item in ids or []:
+        frame_id, extended = item if isinstance(item, tuple) else (item, item > 0x7FF)
+        mask = 0x1FFFFFFF if extended else 0x7FF
+        filters.append({"can_id": frame_id, "can_mask": mask, "extended": extended})
+    return filters
+
+# =========================== 수신 파이프라인 ===========================
+class RxPipeline:
+    """can.Notifier 스레드에서 프레임을 받아 ID -> 디코더 dict 로 바로 찾아 디코딩하고 RingBuffer 에 넣습니다.
+
+    디코더는 ID 별로 한 번만 만들어 두고, 같은 ID 에 직전과 같은 payload 가 오면(주기 메시지에서 흔함)
+    이전 디코딩 결과를 그대로 씁니다. 프레임마다 print 하지 않고, 표시/분석은 구독자가 묶어서 읽습니다.
+    """
+    def __init__(self, bus, db=None, names=None, ids=None, buffer_size: int = 4096,
+                 decode_choices: bool = False, apply_filters: bool = True):
+        self.bus = bus
+        self.buffer = RingBuffer(buffer_size)
+        self.stats = RxStats()
+        self._seq = itertools.count()
+        self._decoders: Dict[int, tuple] = {}
+        self._last: Dict[int, tuple] = {}
+        self._callbacks = []
+        if db is not None:
+            messages = [db.get_message_by_name(n) for n in names] if names else db.messages
+            for message in messages:
+                self._decoders[message.frame_id] = (message.name, self._make_decoder(message, decode_choices))
+        if apply_filters and (names or ids):
+            bus.set_filters(build_filters(db, names, ids))
+        self.notifier = None
+
+    @staticmethod
+    def _make_decoder(message, decode_choices: bool) -> Callable[[bytes], dict]:
+        decode = message.decode
+        return lambda data: decode(data, decode_choices=decode_choices)
+
+    def subscribe(self, ids=None, callback: Callable[[DecodedFrame], None] = None) -> Subscription:
+        """폴링용 Subscription 을 돌려줍니다. callback 을 주면 수신 스레드에서 바로 호출도 합니다. (가볍게 유지할 것)"""
+        if callback is not None:
+            self._callbacks.append((set(ids) if ids else None, callback))
+        return Subscription(self.buffer, ids)
+
+    def on_message(self, msg: can.Message):
+        if msg.is_error_frame or msg.is_remote_frame:
+            return
+        stats = self.stats
+        stats.received += 1
+        frame_id = msg.arbitration_id
+        data = bytes(msg.data)
+        entry = self._decoders.get(frame_id)
+        name = signals = None
+        if entry is None:
+            stats.unknown += 1
+        else:
+            name, decode = entry
+            last = self._last.get(frame_id)
+            if last is not None and last[0] == data:
+                signals = last[1]
+                stats.cache_hits += 1
+            else:
+                try:
+                    signals = decode(data)
+                    self._last[frame_id] = (data, signals)
+                except Exception:
+                    stats.errors += 1
+            if signals is not None:
+                stats.decoded += 1
+        frame = DecodedFrame(next(self._seq), msg.timestamp, frame_id, name, signals, data)
+        self.buffer.append(frame)
+        for ids, callback in self._callbacks:
+            if ids is None or frame_id in ids:
+                callback(frame)
+
+    def start(self):
+        if self.notifier is None:
+            self.notifier = can.Notifier(self.bus, [self.on_message])
+
+    def stop(self, timeout: float = 1.0):
+        if self.notifier is not None:
+            self.notifier.stop(timeout)
+            self.notifier = None
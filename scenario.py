@@ -0,0 +1,345 @@
+import heapq
+import itertools
+import json
+import os
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+import can
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+from canframe import CompiledFrame
+from e2e import e2e_signals, to_raw
+from rxpipeline import RxPipeline
+from scheduler import JitterStats
+
+# 시나리오 형식 (JSON / YAML)
+#
+#   name: turn_right
+#   duration: 6.0                     # 마지막 이벤트 이후까지 주기 전송을 유지할 시각 (생략 시 마지막 이벤트 시각)
+#   cyclic:                           # 시작과 동시에 주기 전송할 메시지 (CRC/Alive Counter 는 신호 이름으로 자동 인식)
+#     - {message: BCM_07_200ms, period: 0.2, signals: {Lamp_HdLmpLoOnReq: 1}}
+#   steps:                            # at: 시나리오 시작 기준 시각(초). wait 동안은 시간이 멈춥니다.
+#     - {at: 1.0, message: ICU_04_200ms, signals: {Lamp_TrnSigLmpRtOnReq: 1}}
+#     - {at: 1.0, wait: {message: LAMP_01, signal: TurnRtSta, equals: 1, timeout: 2.0}}
+#     - {at: 3.0, log: "우측 방향지시등 확인"}
+#     - {at: 5.0, stop: BCM_07_200ms}
+#
+# 주기 메시지의 신호를 바꾸는 step 은 다음 주기부터 반영되고, immediate: true 이면 즉시 한 번 더 보냅니다.
+# 주기 전송이 아닌 메시지의 step 은 그 시각에 한 번 보냅니다.
+# wait 조건: equals / not_equals / min / max (물리 값 또는 VAL_ 이름)
+
+_SET, _START, _STOP, _WAIT, _LOG = range(5)
+
+def load_scenarios(path: str) -> List[dict]:
+    """JSON/YAML 파일에서 시나리오 목록을 읽습니다. (단일 시나리오, 목록, {scenarios: [...]} 모두 허용)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            if yaml is None:
+                raise ImportError("YAML 시나리오를 읽으려면 PyYAML 이 필요합니다 (pip install pyyaml)")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('scenarios', [data])
+    return list(data)
+
+# =========================== 컴파일 결과 ===========================
+class Condition(NamedTuple):
+    message: str
+    frame_id: int
+    signal: str
+    op: str
+    value: float
+    timeout: float
+
+    def check(self, value) -> bool:
+        if self.op == 'equals':
+            return value == self.value
+        if self.op == 'not_equals':
+            return value != self.value
+        if self.op == 'min':
+            return value >= self.value
+        return value <= self.value
+
+    def __str__(self):
+        return f"{self.message}.{self.signal} {self.op} {self.value}"
+
+class CompiledScenario(NamedTuple):
+    name: str
+    duration: float
+    events: tuple                   # (at, seq, kind, arg) 시각순 정렬
+    has_waits: bool
+
+class ScenarioResult(NamedTuple):
+    name: str
+    passed: bool
+    elapsed: float
+    frames: int
+    jitter: JitterStats             # 주기/이벤트 전송 시각 오차
+    failures: tuple
+
+class _Stream:
+    """메시지 하나의 전송 상태. 신호 상태마다 Alive Counter 한 바퀴 분량 페이로드 표를 미리 만들어 둡니다."""
+    def __init__(self, message):
+        self.name = message.name
+        self.message = message
+        crc, counter = e2e_signals(message)
+        self.frame = CompiledFrame(message, crc, counter)
+        self.counter = counter
+        self.signals = {s.name: s for s in message.signals if s.name not in (crc, counter)}
+        self.is_extended_id = message.is_extended_frame
+        self.is_fd = message.is_fd
+        self.tables: Dict[tuple, tuple] = {}
+        self.index = 0              # 런타임 Alive Counter 위치 (시나리오가 바뀌어도 이어집니다)
+
+    def table(self, raw: dict) -> tuple:
+        key = tuple(sorted(raw.items()))
+        table = self.tables.get(key)
+        if table is None:
+            for name in self.signals:
+                self.frame.set_raw(name, raw.get(name, 0))
+            if self.counter:
+                self.frame.set_raw(self.counter, 0)
+            table = self.tables[key] = tuple(bytes(m.data) for m in self.frame.cycle_messages())
+        return table
+
+# =========================== 시나리오 실행기 ===========================
+class ScenarioRunner:
+    """시나리오를 미리 정렬된 이벤트 표로 컴파일하고 한 스레드에서 절대 목표 시각 기준으로 실행합니다.
+
+    DBC 와 버스는 한 번만 열고 여러 시나리오를 연달아 실행하며, 신호 상태별 페이로드(CRC 포함) 표는
+    시나리오 사이에도 재사용됩니다. 실행 중에는 표에서 꺼내 보내기만 하므로 인코딩 비용이 없습니다.
+    wait 조건을 쓰려면 bus 를 넘겨 수신 파이프라인을 켜세요.
+    """
+    def __init__(self, db, send: Callable[[can.Message], None], bus=None, spin: float = 0.002,
+                 poll_interval: float = 0.001):
+        self.db = db
+        self.send = send
+        self.spin = spin
+        self.poll_interval = poll_interval
+        self._streams: Dict[str, _Stream] = {}
+        self.rx = None
+        if bus is not None:
+            self.rx = RxPipeline(bus, db, apply_filters=False)
+            self.rx.start()
+
+    def _stream(self, name: str) -> _Stream:
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = self._streams[name] = _Stream(self.db.get_message_by_name(name))
+        return stream
+
+    def _condition(self, spec: dict) -> Condition:
+        message = self.db.get_message_by_name(spec['message'])
+        signal = message.get_signal_by_name(spec['signal'])
+        ops = [op for op in ('equals', 'not_equals', 'min', 'max') if op in spec]
+        if len(ops) != 1:
+            raise ValueError(f"wait 조건에는 equals/not_equals/min/max 중 하나만 지정하세요: {spec}")
+        value = spec[ops[0]]
+        if isinstance(value, str):
+            value = to_raw(signal, value) * signal.scale + signal.offset
+        return Condition(message.name, message.frame_id, signal.name, ops[0], value, float(spec.get('timeout', 1.0)))
+
+    def compile(self, scenario: dict) -> CompiledScenario:
+        name = scenario.get('name', 'scenario')
+        seq = itertools.count()
+        events = []
+        state: Dict[str, dict] = {}
+        cyclic = set()
+
+        def set_signals(stream: _Stream, signals: dict):
+            raw = state.setdefault(stream.name, {})
+            for signal, value in signals.items():
+                if signal not in stream.signals:
+                    raise ValueError(f"{stream.name}: '{signal}' 신호가 없거나 CRC/Alive Counter 신호입니다")
+                raw[signal] = to_raw(stream.signals[signal], value)
+            return stream.table(raw)
+
+        try:
+            for entry in scenario.get('cyclic', ()):
+                stream = self._stream(entry['message'])
+                table = set_signals(stream, entry.get('signals', {}))
+                cyclic.add(stream.name)
+                events.append((0.0, next(seq), _SET, (stream, table, False)))
+                events.append((float(entry.get('phase', 0.0)), next(seq), _START, (stream, float(entry['period']))))
+            for step in sorted(scenario.get('steps', ()), key=lambda s: s.get('at', 0.0)):
+                at = float(step.get('at', 0.0))
+                if 'wait' in step:
+                    if self.rx is None:
+                        raise ValueError("wait 를 쓰려면 ScenarioRunner 에 bus 를 넘기세요")
+                    events.append((at, next(seq), _WAIT, self._condition(step['wait'])))
+                elif 'log' in step:
+                    events.append((at, next(seq), _LOG, str(step['log'])))
+                elif 'stop' in step:
+                    events.append((at, next(seq), _STOP, self._stream(step['stop'])))
+                else:
+                    stream = self._stream(step['message'])
+                    table = set_signals(stream, step.get('signals', {}))
+                    immediate = stream.name not in cyclic or bool(step.get('immediate', False))
+                    events.append((at, next(seq), _SET, (stream, table, immediate)))
+        except (KeyError, ValueError) as e:
+            raise ValueError(f"시나리오 '{name}' 컴파일 오류: {e}") from e
+
+        events.sort(key=lambda e: (e[0], e[1]))
+        last = events[-1][0] if events else 0.0
+        duration = float(scenario.get('duration', last))
+        return CompiledScenario(name, max(duration, last), tuple(events), any(e[2] == _WAIT for e in events))
+
+    def _sleep_until(self, deadline: float):
+        remaining = deadline - time.perf_counter()
+        if remaining > self.spin:
+            time.sleep(remaining - self.spin)
+        while time.perf_counter() < deadline:
+            pass
+
+    def _emit(self, stream: _Stream, table: tuple):
+        self.send(can.Message(arbitration_id=stream.message.frame_id, data=table[stream.index % len(table)],
+                              is_extended_id=stream.is_extended_id, is_fd=stream.is_fd))
+        stream.index += 1
+
+    def execute(self, compiled: CompiledScenario) -> ScenarioResult:
+        clock = time.perf_counter
+        events = compiled.events
+        jitter = JitterStats()
+        failures = []
+        current: Dict[str, tuple] = {}
+        periods: Dict[str, float] = {}
+        generations: Dict[str, int] = {}    # start/stop 마다 늘립니다. 세대가 다른 heap 항목은 버립니다.
+        heap = []                   # (목표 시각, seq, 세대, stream)
+        seq = itertools.count()
+        frames = 0
+        i = 0
+        waiting = None              # (조건, 구독, 시작 시각)
+        start = clock()
+        shift = 0.0                 # wait 로 멈춘 시간만큼 이후 이벤트를 미룹니다.
+
+        while True:
+            if waiting is not None:
+                condition, subscription, began = waiting
+                if any(f.arbitration_id == condition.frame_id and f.signals is not None
+                       and condition.signal in f.signals and condition.check(f.signals[condition.signal]) for f in subscription.poll()):
+                    shift += clock() - began
+                    waiting = None
+                    continue
+                if clock() - began >= condition.timeout:
+                    failures.append(f"wait 시간 초과 ({condition.timeout}s): {condition}")
+                    break
+                next_event = clock() + self.poll_interval
+            elif i < len(events):
+                next_event = start + shift + events[i][0]
+            else:
+                next_event = start + shift + compiled.duration
+
+            if heap and heap[0][0] <= next_event:
+                deadline, _, generation, stream = heapq.heappop(heap)
+                if generations.get(stream.name) != generation:
+                    continue    # stop 되었거나 다시 start 된 스트림의 예전 항목 (두 배 속도로 나가지 않도록)
+                self._sleep_until(deadline)
+                jitter.add(clock() - deadline)
+                try:
+                    self._emit(stream, current[stream.name])
+                    frames += 1
+                except can.CanError as e:
+                    failures.append(f"{stream.name} 전송 오류: {e}")
+                period = periods[stream.name]
+                deadline += period
+                now = clock()
+                if deadline < now:
+                    skipped = int((now - deadline) // period) + 1
+                    jitter.missed += skipped
+                    deadline += skipped * period
+                heapq.heappush(heap, (deadline, next(seq), generation, stream))
+                continue
+
+            if waiting is not None:
+                time.sleep(max(0.0, next_event - clock()))     # 수신 폴링은 spin 없이
+                continue
+            self._sleep_until(next_event)
+            if i >= len(events):
+                break
+            _, _, kind, arg = events[i]
+            i += 1
+            if kind == _SET:
+                stream, table, immediate = arg
+                current[stream.name] = table
+                if immediate:
+                    jitter.add(clock() - next_event)
+                    try:
+                        self._emit(stream, table)
+                        frames += 1
+                    except can.CanError as e:
+                        failures.append(f"{stream.name} 전송 오류: {e}")
+            elif kind == _START:
+                stream, period = arg
+                periods[stream.name] = period
+                generation = generations[stream.name] = generations.get(stream.name, 0) + 1
+                heapq.heappush(heap, (next_event, next(seq), generation, stream))
+            elif kind == _STOP:
+                periods.pop(arg.name, None)
+                generations[arg.name] = generations.get(arg.name, 0) + 1
+            elif kind == _WAIT:
+                waiting = (arg, self.rx.subscribe([arg.frame_id]), clock())
+            else:
+                print(f"📝 [{compiled.name}] {arg}")
+
+        return ScenarioResult(compiled.name, not failures, clock() - start, frames, jitter, tuple(failures))
+
+    def run(self, scenario: dict) -> ScenarioResult:
+        return self.execute(self.compile(scenario))
+
+    def run_all(self, scenarios, stop_on_failure: bool = False,
+                on_result: Callable[[ScenarioResult], None] = None) -> List[ScenarioResult]:
+        """모든 시나리오를 먼저 컴파일(오류를 실행 전에 발견)한 뒤 순서대로 실행합니다."""
+        compiled = [self.compile(s) for s in scenarios]
+        results = []
+        for c in compiled:
+            result = self.execute(c)
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+            if stop_on_failure and not result.passed:
+                break
+        return results
+
+    def close(self):
+        if self.rx is not None:
+            self.rx.stop()
+            self.rx = None
+
+def print_result(result: ScenarioResult):
+    mark = "✅" if result.passed else "❌"
+    print(f"{mark} {result.name}: {result.frames} frames, {result.elapsed:.2f}s, "
+          f"최대 지터 {max(result.jitter.max, 0.0) * 1e3:.2f}ms")
+    for failure in result.failures:
+        print(f"   - {failure}")
+
+def main():
+    # ============================ 사용자 설정 ============================
+    SCENARIO_FILES = ["scenarios.json"]
+    DBC_FILE_PATH = "Temp_DBC.dbc"
+    CAN_INTERFACE = "slcan"
+    CHANNEL = "COM14"
+    BITRATE = 500000
+    STOP_ON_FAILURE = False
+    # =================================================================
+
+    from headlightcontrol import CANMessageSender
+    scenarios = [s for path in SCENARIO_FILES for s in load_scenarios(path)]
+    with CANMessageSender(DBC_FILE_PATH, CAN_INTERFACE, CHANNEL, BITRATE) as sender:
+        runner = ScenarioRunner(sender.db, sender.bus.send, sender.bus)
+        try:
+            results = runner.run_all(scenarios, STOP_ON_FAILURE, on_result=print_result)
+            passed = sum(r.passed for r in results)
+            print(f"\n🏁 {passed}/{len(results)} 시나리오 통과")
+        except KeyboardInterrupt:
+            print("\n⏹️ 사용자가 실행을 중단했습니다.")
+        finally:
+            runner.close()
+
+if __name__ == "__main__":
+    main()
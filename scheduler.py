@@ -0,0 +1,155 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# =========================== 지터 통계 ===========================
+class JitterStats:
+    """실제 실행 시각 - 목표 시각(초) 의 통계 (Welford 누적)"""
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.missed = 0     # 너무 늦어서 건너뛴 주기 수
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def __repr__(self):
+        if not self.count:
+            return "JitterStats(count=0)"
+        return (f"JitterStats(count={self.count}, mean={self.mean * 1e3:.3f}ms, std={self.std * 1e3:.3f}ms, "
+                f"min={self.min * 1e3:.3f}ms, max={self.max * 1e3:.3f}ms, missed={self.missed})")
+
+class PeriodicTask:
+    def __init__(self, name: str, period: float, callback: Callable[[], None]):
+        self.name = name
+        self.period = period
+        self.callback = callback
+        self.active = True
+        self.generation = 0     # reschedule 될 때마다 증가, 힙에 남은 이전 목표 시각은 무시됩니다.
+        self.stats = JitterStats()
+
+# =========================== 다중 주기 스케줄러 ===========================
+class PeriodicScheduler:
+    """절대 목표 시각(start + k * period) 기준으로 여러 주기 작업을 하나의 힙에서 실행합니다.
+
+    작업 시간이나 GIL 대기로 늦어져도 다음 목표 시각이 밀리지 않으므로 주기가 누적 drift 되지 않습니다.
+    목표 시각 직전까지는 잠들고, 마지막 spin 구간만 바쁜 대기로 맞춥니다.
+    """
+    def __init__(self, spin: float = 0.002, on_error: Callable[[str, Exception], None] = None,
+                 clock: Callable[[], float] = time.perf_counter):
+        self.spin = spin
+        self.on_error = on_error
+        self.clock = clock
+        self._heap = []
+        self._tasks: Dict[str, PeriodicTask] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, name: str, period: float, callback: Callable[[], None], phase: float = 0.0) -> PeriodicTask:
+        """period 초마다 callback 을 실행합니다. phase 는 첫 실행까지의 지연(초)입니다."""
+        task = PeriodicTask(name, period, callback)
+        with self._cond:
+            old = self._tasks.get(name)
+            if old is not None:
+                old.active = False
+            self._tasks[name] = task
+            heapq.heappush(self._heap, (self.clock() + phase, next(self._seq), task, 0))
+            self._cond.notify()
+        return task
+
+    def reschedule(self, name: str, delay: float):
+        """다음 실행을 지금부터 delay 초 뒤로 옮기고 그 시각을 기준으로 주기를 다시 맞춥니다. (통계는 유지)"""
+        with self._cond:
+            task = self._tasks.get(name)
+            if task is None:
+                return
+            task.generation += 1
+            heapq.heappush(self._heap, (self.clock() + delay, next(self._seq), task, task.generation))
+            self._cond.notify()
+
+    def remove(self, name: str):
+        with self._cond:
+            task = self._tasks.pop(name, None)
+            if task is not None:
+                task.active = False
+
+    def stats(self) -> Dict[str, JitterStats]:
+        return {name: task.stats for name, task in self._tasks.items()}
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def _run(self):
+        clock = self.clock
+        while True:
+            with self._cond:
+                while self._running and not self._heap:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                deadline, _, task, generation = self._heap[0]
+                if not task.active or generation != task.generation:
+                    heapq.heappop(self._heap)
+                    continue
+                remaining = deadline - clock() - self.spin
+                if remaining > 0:
+                    # 더 이른 작업이 추가되면 notify 로 깨어나 다시 확인합니다.
+                    self._cond.wait(remaining)
+                    continue
+                heapq.heappop(self._heap)
+
+            while clock() < deadline:
+                pass
+            started = clock()
+            task.stats.add(started - deadline)
+            try:
+                task.callback()
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(task.name, e)
+
+            # 다음 목표 시각은 이전 목표 시각 기준으로 잡고, 이미 지난 주기는 건너뜁니다.
+            next_deadline = deadline + task.period
+            now = clock()
+            if next_deadline < now:
+                skipped = int((now - next_deadline) // task.period) + 1
+                task.stats.missed += skipped
+                next_deadline += skipped * task.period
+            with self._cond:
+                if task.active and generation == task.generation:
+                    heapq.heappush(self._heap, (next_deadline, next(self._seq), task, generation))
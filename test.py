@@ -1,23 +1,47 @@
 import can
+import time
+from rxpipeline import RxPipeline
+
+# ============================ 사용자 설정 ============================
+DBC_FILE_PATH = None    # 수신 프레임을 디코딩할 DBC (None: hex 로만 표시)
+RX_NAMES = None         # 이 메시지만 수신 (하드웨어 필터로 내려감, None: 전체)
+# =================================================================
 
 bus = can.interface.Bus(bustype="slcan", channel="COM14", bitrate=500000)
 
+db = None
+if DBC_FILE_PATH:
+    import dbccache
+    db = dbccache.load_file(DBC_FILE_PATH)
+pipeline = RxPipeline(bus, db, names=RX_NAMES)
+subscription = pipeline.subscribe()
+
 try:
+    pipeline.start()
 
     msg = can.Message(arbitration_id=0x123, data=[0x11, 0x22, 0x33], is_extended_id=False)
     bus.send(msg)
     print("✅ 메시지 송신 완료")
 
     print("📡 수신 대기 중...")
+    idle_since = time.monotonic()
     while True:
-        message = bus.recv(timeout=5.0)  
-        if message is None:
-            print("⚠️ 수신된 메시지가 없습니다.")
-            break
-        else:
-            print(f"📥 수신: ID=0x{message.arbitration_id:X}, Data={message.data.hex().upper()}")
+        # 프레임마다 출력하지 않고 0.5초마다 ID 별 마지막 값만 모아서 출력합니다.
+        time.sleep(0.5)
+        frames = subscription.poll()
+        if not frames:
+            if time.monotonic() - idle_since > 5.0:
+                print("⚠️ 수신된 메시지가 없습니다.")
+                break
+            continue
+        idle_since = time.monotonic()
+        latest = {f.arbitration_id: f for f in frames}
+        print(f"📥 {len(frames)}개 수신 (누락 {subscription.dropped}) | {pipeline.stats}")
+        for frame_id, f in sorted(latest.items()):
+            shown = f.signals if f.signals is not None else f.data.hex().upper()
+            print(f"   ID=0x{frame_id:X} {f.name or ''} {shown}")
 
 finally:
-
+    pipeline.stop()
     bus.shutdown()
     print("🔌 CAN Bus 종료 완료")
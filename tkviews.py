@@ -0,0 +1,124 @@
+import tkinter as tk
+from collections import deque
+from tkinter import ttk, scrolledtext
+from typing import Callable, Dict, Iterable, Optional
+
+# =========================== 로그 패널 ===========================
+class LogView:
+    """ScrolledText 로그를 고정 크기 링 버퍼처럼 씁니다.
+
+    log() 는 줄을 대기열(deque)에 넣기만 하고, 화면에는 flush_ms 마다 한 번 모아서 insert 합니다.
+    위젯은 max_lines 줄을 넘으면 앞부분을 지우므로 몇 시간을 돌려도 느려지지 않습니다.
+    한 번에 max_lines 보다 많이 쌓이면 오래된 줄은 버리고 몇 줄을 건너뛰었는지만 남깁니다.
+    사용자가 위로 스크롤해 보고 있을 때는 끝으로 끌어내리지 않습니다.
+    """
+    def __init__(self, parent, max_lines: int = 2000, flush_ms: int = 100, **kwargs):
+        self.text = scrolledtext.ScrolledText(parent, wrap=tk.WORD, state=tk.DISABLED, **kwargs)
+        self.max_lines = max_lines
+        self.flush_ms = flush_ms
+        self._pending = deque(maxlen=max_lines)
+        self._skipped = 0
+        self._scheduled = False
+
+    def pack(self, **kwargs):
+        self.text.pack(**kwargs)
+
+    def log(self, message: str):
+        if len(self._pending) == self.max_lines:
+            self._skipped += 1
+        self._pending.append(message)
+        if not self._scheduled:
+            self._scheduled = True
+            self.text.after(self.flush_ms, self.flush)
+
+    def flush(self):
+        self._scheduled = False
+        if not self._pending:
+            return
+        lines = list(self._pending)
+        self._pending.clear()
+        if self._skipped:
+            lines.insert(0, f"... 로그 {self._skipped}줄 생략 ...")
+            self._skipped = 0
+        at_bottom = self.text.yview()[1] >= 1.0
+        text = self.text
+        text.config(state=tk.NORMAL)
+        text.insert(tk.END, '\n'.join(lines) + '\n')
+        excess = int(text.index('end-1c').split('.')[0]) - 1 - self.max_lines
+        if excess > 0:
+            text.delete('1.0', f'{excess + 1}.0')
+        text.config(state=tk.DISABLED)
+        if at_bottom:
+            text.see(tk.END)
+
+# =========================== 실시간 프레임 표 ===========================
+class TraceTable:
+    """(방향, ID) 마다 한 줄인 TX/RX 프레임 표 (개수, 초당 프레임 수, 마지막 디코딩 값)
+
+    프레임마다 줄을 추가하지 않고 ID 별 한 줄만 두므로 줄 수는 ID 수를 넘지 않습니다.
+    update() 에는 frametrace.FrameTrace.changed() 처럼 바뀐 ID 의 TraceRow 만 넘기고,
+    그중에서도 표시 값이 실제로 달라진 줄만 item() 으로 다시 그립니다.
+    decode(frame_id, data) 는 (메시지 이름, 신호 dict) 또는 None 을 돌려주는 함수입니다.
+    """
+    COLUMNS = (('dir', "방향", 50), ('id', "ID", 70), ('name', "메시지", 150), ('count', "개수", 80),
+               ('rate', "Hz", 60), ('value', "마지막 값", 400))
+
+    def __init__(self, parent, decode: Optional[Callable[[int, bytes], Optional[tuple]]] = None, height: int = 10):
+        frame = ttk.Frame(parent)
+        self.frame = frame
+        self.tree = ttk.Treeview(frame, columns=[c[0] for c in self.COLUMNS], show='headings', height=height)
+        for key, title, width in self.COLUMNS:
+            self.tree.heading(key, text=title)
+            self.tree.column(key, width=width, stretch=(key == 'value'),
+                             anchor=tk.W if key in ('name', 'value') else tk.E)
+        scroll = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scroll.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.decode = decode
+        self._values: Dict[str, tuple] = {}
+        self._decoded: Dict[str, tuple] = {}    # iid -> (data, 이름, 값 문자열) 같은 payload 는 다시 디코딩하지 않습니다.
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def _describe(self, iid: str, frame_id: int, data: bytes):
+        cached = self._decoded.get(iid)
+        if cached is not None and cached[0] == data:
+            return cached[1], cached[2]
+        decoded = self.decode(frame_id, data) if self.decode is not None else None
+        if decoded is None:
+            name, value = '', data.hex(' ').upper()
+        else:
+            name, signals = decoded
+            value = ' '.join(f"{k}={v}" for k, v in signals.items())
+        self._decoded[iid] = (data, name, value)
+        return name, value
+
+    def update(self, rows: Iterable):
+        for row in rows:
+            direction = 'RX' if row.is_rx else 'TX'
+            iid = f"{direction}{row.arbitration_id:X}"
+            name, value = self._describe(iid, row.arbitration_id, row.data)
+            values = (direction, f"0x{row.arbitration_id:X}", name, row.count, f"{row.rate:.1f}", value)
+            old = self._values.get(iid)
+            if old == values:
+                continue
+            self._values[iid] = values
+            if old is None:
+                # ID 순으로 들어갈 자리를 찾아 넣습니다. (줄 수가 ID 수뿐이라 선형 탐색으로 충분)
+                key = (row.arbitration_id, direction)
+                index = 0
+                for other in self.tree.get_children():
+                    other_values = self._values[other]
+                    if (int(other_values[1], 16), other_values[0]) > key:
+                        break
+                    index += 1
+                self.tree.insert('', index, iid=iid, values=values)
+            else:
+                self.tree.item(iid, values=values)
+
+    def clear(self):
+        self.tree.delete(*self.tree.get_children())
+        self._values.clear()
+        self._decoded.clear()
@@ -0,0 +1,101 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Optional
+
+import can
+
+from scheduler import JitterStats
+
+class TxStats:
+    """전송 큐 지표: 큐 깊이, 큐 대기 지연(submit -> bus.send), 배치 수"""
+    def __init__(self):
+        self.sent = 0
+        self.errors = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.latency = JitterStats()
+
+    def __repr__(self):
+        return (f"TxStats(sent={self.sent}, errors={self.errors}, batches={self.batches}, "
+                f"max_depth={self.max_depth}, latency={self.latency})")
+
+# =========================== 단일 전송 워커 ===========================
+class TxWorker:
+    """버스를 혼자 소유하고 우선순위 큐에서 프레임을 꺼내 보내는 전송 스레드
+
+    여러 스레드(주기 전송, GUI 콜백)가 같은 버스에 bus.send 를 동시에 부르지 않도록
+    모든 전송을 submit() 으로 넘깁니다. 우선순위는 기본으로 arbitration ID 이며
+    (버스 중재와 같이 낮은 ID 가 먼저), priority 를 주면 그 값을 씁니다.
+    한 번 깨어날 때 쌓여 있는 프레임을 batch_size 개까지 한꺼번에 꺼내 락 밖에서 보냅니다.
+    """
+    def __init__(self, bus, batch_size: int = 32, on_error: Callable[[can.Message, Exception], None] = None,
+                 on_sent: Callable[[can.Message], None] = None):
+        self.bus = bus
+        self.batch_size = batch_size
+        self.on_error = on_error
+        self.on_sent = on_sent      # 전송 성공한 프레임 기록용 (예: Recorder.append(msg, is_rx=False))
+        self.stats = TxStats()
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, msg: can.Message, priority: int = None, copy: bool = False):
+        """msg 를 전송 큐에 넣습니다. 재사용되는 메시지(CompiledFrame.build 결과 등)는 copy=True 로 넘기세요."""
+        if copy:
+            msg = msg.__copy__()
+        if priority is None:
+            priority = msg.arbitration_id
+        with self._cond:
+            heapq.heappush(self._heap, (priority, next(self._seq), time.perf_counter(), msg))
+            depth = len(self._heap)
+            if depth > self.stats.max_depth:
+                self.stats.max_depth = depth
+            self._cond.notify()
+
+    @property
+    def depth(self) -> int:
+        return len(self._heap)
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, flush: bool = True, timeout: float = 1.0):
+        """워커를 멈춥니다. flush=True 이면 큐에 남은 프레임을 먼저 보냅니다."""
+        with self._cond:
+            self._running = False
+            if not flush:
+                self._heap.clear()
+            self._cond.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def _run(self):
+        stats = self.stats
+        while True:
+            with self._cond:
+                while self._running and not self._heap:
+                    self._cond.wait()
+                if not self._heap:
+                    return
+                batch = [heapq.heappop(self._heap) for _ in range(min(self.batch_size, len(self._heap)))]
+            stats.batches += 1
+            for _, _, queued, msg in batch:
+                try:
+                    self.bus.send(msg)
+                    stats.sent += 1
+                    if self.on_sent is not None:
+                        self.on_sent(msg)
+                except Exception as e:
+                    stats.errors += 1
+                    if self.on_error is not None:
+                        self.on_error(msg, e)
+                stats.latency.add(time.perf_counter() - queued)